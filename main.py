@@ -1,4 +1,29 @@
-from src.district_9_personal_assistant.core import run_personal_assistant
+import asyncio
+import sys
+
+from src.district_9_personal_assistant.core import (
+    run_personal_assistant,
+    run_personal_assistant_async,
+)
+from src.district_9_personal_assistant.api_server import run_api_server
+from src.district_9_personal_assistant.storage_benchmark import print_storage_benchmark
+from src.district_9_personal_assistant.session_server import (
+    DEFAULT_SOCKET_PATH,
+    connect_to_session_server,
+    run_session_server,
+)
 
 if __name__ == "__main__":
-    run_personal_assistant()
+    mode = sys.argv[1] if len(sys.argv) > 1 else ""
+    if mode == "serve":
+        run_api_server(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8080)
+    elif mode == "share":
+        run_session_server(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SOCKET_PATH)
+    elif mode == "connect":
+        connect_to_session_server(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SOCKET_PATH)
+    elif mode == "async":
+        asyncio.run(run_personal_assistant_async())
+    elif mode == "benchmark":
+        print_storage_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
+    else:
+        run_personal_assistant(background_load=True)
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 import re
+import threading
 import urllib.parse
 import webbrowser
+from typing import Callable, Optional, Tuple
 
 from src.district_9_personal_assistant.field import BaseField
 
@@ -23,6 +25,25 @@ def _clean_text(value: str) -> str:
     return " ".join(value.strip().split())
 
 
+def normalize_locality(country: str = "", city: str = "", zip_code: str = "") -> tuple:
+    """
+    Normalize locality parts the same way Address stores them.
+
+    Args:
+        country: Country name.
+        city: City name.
+        zip_code: Zip code.
+
+    Returns:
+        Tuple (country, city, zip_code); missing parts are empty strings.
+    """
+    return (
+        _clean_text(country).upper(),
+        _clean_text(city).title(),
+        _clean_text(zip_code).upper(),
+    )
+
+
 @dataclass
 class Address(BaseField):
     """
@@ -37,17 +58,24 @@ class Address(BaseField):
     city: str
     street_address: str
     zip_code: str
+    is_main: bool = False
 
     def __post_init__(self) -> None:
         """
         Clean and validate fields.
         """
-        self.country = _clean_text(self.country).upper()
-        self.city = _clean_text(self.city).title()
+        self.country, self.city, self.zip_code = normalize_locality(
+            self.country, self.city, self.zip_code)
         self.street_address = _clean_text(self.street_address).title()
-        self.zip_code = _clean_text(self.zip_code).upper()
         super().__post_init__()
 
+    @property
+    def locality(self) -> tuple:
+        """
+        The (country, city, zip_code) of the address.
+        """
+        return self.country, self.city, self.zip_code
+
     def validate(self) -> None:
         """
         Validate the zip_code format.
@@ -74,14 +102,27 @@ class Address(BaseField):
         ]
         return ", ".join(p for p in parts if p)
 
+    def map_url(self, coordinates: Optional[Tuple[float, float]] = None) -> str:
+        """
+        Build a Google Maps link for the address.
+
+        Args:
+            coordinates: Optional (latitude, longitude) to link to instead of the address text.
+
+        Returns:
+            The URL.
+        """
+        base = "https://www.google.com/maps/search/?api=1&query="
+        if coordinates is not None:
+            return base + urllib.parse.quote(f"{coordinates[0]},{coordinates[1]}")
+        return base + urllib.parse.quote(self.full_address())
+
     def open_in_google_maps(self) -> None:
         """
         Open the address in Google Maps (default browser).
+        The browser is started in the background, so the caller does not wait for it.
         """
-        base = "https://www.google.com/maps/search/?api=1&query="
-        query = urllib.parse.quote(self.full_address())
-        url = base + query
-        webbrowser.open(url)
+        threading.Thread(target=webbrowser.open, args=(self.map_url(),), daemon=True).start()
 
     @classmethod
     def from_dict(cls, data: dict) -> "Address":
@@ -99,18 +140,41 @@ class Address(BaseField):
             city=data.get("city", ""),
             street_address=data.get("street_address", ""),
             zip_code=data.get("zip_code", ""),
+            is_main=bool(data.get("is_main", False)),
         )
 
-    def update(self, data: dict) -> None:
+    def update(
+            self,
+            data: dict,
+            check: Optional[Callable[[BaseField], None]] = None,
+    ) -> dict:
         """
         Update Address fields from a dict.
+        If the new data is invalid, the old values are restored.
 
         Args:
             data: Dictionary with new address data.
+            check: Optional callable run on the updated address, as in BaseField.update.
+
+        Returns:
+            The old values of the fields that changed.
+
+        Raises:
+            ValueError: If the new data is invalid.
         """
+        old_values = {key: getattr(self, key) for key in data}
         for key, value in data.items():
             setattr(self, key, value)
-        self.__post_init__()
+        try:
+            self.__post_init__()
+            if check is not None:
+                check(self)
+        except ValueError:
+            for key, value in old_values.items():
+                setattr(self, key, value)
+            raise
+        self._touch()
+        return {key: old for key, old in old_values.items() if getattr(self, key) != old}
 
     def __str__(self) -> str:
         return self.full_address()
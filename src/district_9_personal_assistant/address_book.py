@@ -1,15 +1,71 @@
+import copy
 import os
-import random
-from typing import Optional
-from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+from datetime import date, datetime, time, timedelta
 from dataclasses import dataclass, field
 
 import questionary
-import pickle
 
-from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.birthday import Birthday, occurrence_in_year
+from src.district_9_personal_assistant.birthday_index import BirthdayIndex, UpcomingBirthday
+from src.district_9_personal_assistant.completion import CompletionIndex
+from src.district_9_personal_assistant.concurrency import ReadWriteLock
+from src.district_9_personal_assistant.contact import Contact, ContactChange
+from src.district_9_personal_assistant.contact_index import ContactIndexes, tag_keys
+from src.district_9_personal_assistant.geocoding import (
+    Coordinates,
+    get_geocoder,
+    main_address,
+    write_geojson,
+    write_map_links,
+)
+from src.district_9_personal_assistant.locality_index import RegionCount
+from src.district_9_personal_assistant.dedup import DuplicateCandidate, find_duplicates
+from src.district_9_personal_assistant.encryption import BookKey
+from src.district_9_personal_assistant.history import History, Operation
+from src.district_9_personal_assistant.greetings import (
+    DEFAULT_GREETINGS_FILE,
+    get_greetings_provider,
+)
 from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.parallel_query import ParallelQueryExecutor
+from src.district_9_personal_assistant.query import (
+    QueryPlan,
+    QueryPlanner,
+    execute_plan,
+    parse_query,
+)
+from src.district_9_personal_assistant.reminders import BirthdayScheduler, ReminderSink
 from src.district_9_personal_assistant.selection import Selection
+from src.district_9_personal_assistant.snapshots import (
+    Snapshot,
+    SnapshotDiff,
+    SnapshotStore,
+    take_snapshot,
+)
+from src.district_9_personal_assistant.spatial_index import NearbyContact, SpatialIndex
+from src.district_9_personal_assistant.storage import (
+    COMPRESSION_LZMA,
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    COMPRESSIONS,
+    SaveResult,
+    ShardedStore,
+    ShardManifest,
+    build_dictionary,
+    file_lock,
+    new_stamp,
+    read_book,
+    read_header,
+    shard_of,
+    write_book,
+)
+from src.district_9_personal_assistant.session import (
+    Session,
+    current_session,
+    current_session_uid,
+)
 from src.district_9_personal_assistant.helpers.message import fail_message, success_message
 
 
@@ -17,9 +73,224 @@ from src.district_9_personal_assistant.helpers.message import fail_message, succ
 class AddressBook(Selection):
     """
     Represents an address book containing contacts.
+
+    The contact list is guarded by a reader/writer lock, and the active contact
+    belongs to the current Session, so the book can be shared between threads.
     """
     contacts: list = field(default_factory=list)
-    _active_contact: Optional[Contact] = None
+    _birthday_index: Optional[BirthdayIndex] = field(
+        default=None, init=False, repr=False, compare=False)
+    _indexes: Optional[ContactIndexes] = field(
+        default=None, init=False, repr=False, compare=False)
+    _spatial_index: Optional[SpatialIndex] = field(
+        default=None, init=False, repr=False, compare=False)
+    _completion_index: Optional[CompletionIndex] = field(
+        default=None, init=False, repr=False, compare=False)
+    _reminders: Optional[BirthdayScheduler] = field(
+        default=None, init=False, repr=False, compare=False)
+    _session: Optional[Session] = field(default=None, init=False, repr=False, compare=False)
+    _lock: ReadWriteLock = field(
+        default_factory=ReadWriteLock, init=False, repr=False, compare=False)
+    # Undo/redo log, with separate stacks for each session working on the book.
+    _history: History = field(
+        default_factory=lambda: History(owner=current_session_uid),
+        init=False, repr=False, compare=False)
+    # The latest snapshot, shared with the next one.
+    _last_snapshot: Optional[Snapshot] = field(
+        default=None, init=False, repr=False, compare=False)
+    # Contacts added or changed since the book was loaded or saved, by id.
+    _dirty_contacts: Dict[int, Contact] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    # Bumped on every change of the book or its contacts; kept across saves.
+    _version = 0
+    # The version last loaded or saved.
+    _saved_version = 0
+    # Stamp of the file state last loaded or saved, and the contact versions in it by uid;
+    # used to merge changes saved meanwhile by another process.
+    _base_stamp: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _base_versions: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    # Compression of the book file, kept in its header rather than in the book.
+    _compression: str = field(default=COMPRESSION_NONE, init=False, repr=False, compare=False)
+    # Whether the book is saved as shards. The shard files last loaded or saved (None
+    # to rewrite them all on the next save) and the shard of each contact in them by uid.
+    _sharded: bool = field(default=False, init=False, repr=False, compare=False)
+    _shard_files: Optional[List[Optional[str]]] = field(
+        default=None, init=False, repr=False, compare=False)
+    _base_shards: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    # Key the book files are encrypted with, derived from the passphrase once per session,
+    # and the key of the file this book was loaded from or last saved to.
+    _key: Optional[BookKey] = field(default=None, init=False, repr=False, compare=False)
+    _base_key: Optional[BookKey] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """
+        Listen to changes of the contacts to keep the indexes up to date.
+        Contacts passed to a new book count as unsaved changes.
+        """
+        self._subscribe_contacts()
+        self._dirty_contacts = {id(contact): contact for contact in self.contacts}
+        if self.contacts:
+            self._version += 1
+
+    def __getstate__(self) -> dict:
+        """
+        Drop derived indexes, session state, unsaved-change tracking, the undo history,
+        the latest snapshot and the lock from the pickled state; they are rebuilt on demand.
+        """
+        with self._lock.read():
+            state = self.__dict__.copy()
+        state["_birthday_index"] = None
+        state["_indexes"] = None
+        state["_spatial_index"] = None
+        state["_completion_index"] = None
+        state["_reminders"] = None
+        state["_session"] = None
+        state.pop("_lock", None)
+        state.pop("_dirty_contacts", None)
+        state.pop("_saved_version", None)
+        state.pop("_base_stamp", None)
+        state.pop("_base_versions", None)
+        state.pop("_compression", None)
+        state.pop("_sharded", None)
+        state.pop("_shard_files", None)
+        state.pop("_base_shards", None)
+        state.pop("_key", None)
+        state.pop("_base_key", None)
+        state.pop("_history", None)
+        state["_last_snapshot"] = None
+        state.pop("_active_contact", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the pickled state with a fresh lock and listen to the contacts again.
+        Books saved before sessions existed carry an ``_active_contact`` entry, which is dropped.
+        """
+        state.pop("_active_contact", None)
+        self.__dict__.update(state)
+        self._lock = ReadWriteLock()
+        self._dirty_contacts = {}
+        self._history = History(owner=current_session_uid)
+        self._base_stamp = None
+        self._subscribe_contacts()
+        self._mark_saved(self._version, {c.uid: c.version for c in self.contacts})
+
+    def _subscribe_contacts(self) -> None:
+        """
+        Listen to changes of the contacts to keep the indexes up to date,
+        and have them record their changes in the book's history.
+        """
+        for contact in self.contacts:
+            contact._history = self._history
+            contact.subscribe(self._on_contact_changed)
+
+    def _record(self, description: str, undo: Callable[[], None],
+                redo: Callable[[], None]) -> None:
+        """
+        Add a change of the book to its undo/redo log.
+        """
+        self._history.record(Operation(description, undo, redo))
+
+    @property
+    def version(self) -> int:
+        """
+        Number of changes made to the book and its contacts, kept across saves.
+        """
+        return self._version
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the book changed since it was loaded or last saved.
+        """
+        return self._version != self._saved_version
+
+    def dirty_contacts(self) -> list:
+        """
+        Get the contacts of the book added or changed since it was loaded or last saved,
+        e.g. for savers that only write what changed.
+        """
+        with self._lock.read():
+            return list(self._dirty_contacts.values())
+
+    def _touch(self, contact: Optional[Contact] = None) -> None:
+        """
+        Record that the book changed, and that a contact is unsaved.
+        Call with the write lock held.
+        """
+        self._version += 1
+        if contact is not None:
+            self._dirty_contacts[id(contact)] = contact
+
+    def _mark_saved(
+            self,
+            version: int,
+            contact_versions: Dict[str, int],
+            stamp: Optional[str] = None,
+    ) -> None:
+        """
+        Record that the book was loaded or saved at a version. Changes made since then
+        stay dirty.
+
+        Args:
+            version: Version of the book that was saved.
+            contact_versions: Versions of the saved contacts by uid.
+            stamp: Stamp of the saved file.
+        """
+        with self._lock.write():
+            self._saved_version = version
+            self._base_versions = contact_versions
+            self._base_stamp = stamp
+            if version == self._version:
+                self._dirty_contacts.clear()
+
+    def _on_contact_changed(self, contact: Contact, change: ContactChange) -> None:
+        """
+        Update the indexes after a contact of this book changed.
+        """
+        with self._lock.write():
+            self._touch(contact)
+            if change is ContactChange.BIRTHDAY and self._birthday_index is not None:
+                self._birthday_index.update(contact)
+            if change is ContactChange.BIRTHDAY and self._reminders is not None:
+                self._reminders.schedule(contact)
+            if self._indexes is not None:
+                self._indexes.update(contact, change)
+            if change is ContactChange.ADDRESSES and self._spatial_index is not None:
+                self._spatial_index.update(contact)
+            if self._completion_index is not None:
+                self._completion_index.update(contact, change)
+
+    @property
+    def session(self) -> Session:
+        """
+        The session in use: the one activated in the current thread or task,
+        or the book's default session.
+        """
+        session = current_session()
+        if session is not None:
+            return session
+        if self._session is None:
+            self._session = Session()
+        return self._session
+
+    @property
+    def _active_contact(self) -> Optional[Contact]:
+        return self.session.get_active_contact()
+
+    @_active_contact.setter
+    def _active_contact(self, contact: Optional[Contact]) -> None:
+        self.session.active_contact = contact
+
+    def snapshot_contacts(self) -> list:
+        """
+        Get a copy of the contact list taken under the read lock,
+        safe to iterate while other threads modify the book.
+        """
+        with self._lock.read():
+            return list(self.contacts)
 
     def add_contact(self) -> str:
         """
@@ -27,42 +298,333 @@ class AddressBook(Selection):
         Returns a success or failure message.
         """
         name_str = questionary.text("Contact name:").ask()
-        if any(contact.name.value.lower() == name_str.lower() for contact in self.contacts):
+        if self.get_contact(name_str) is not None:
             return fail_message(
                 "Contact with this name already exists. "
                 "Please enter a different name."
             )
         try:
-            name = Name(value=name_str)
-            contact = Contact(name=name)
-            self.contacts.append(contact)
-            return success_message(f"Contact {name.value} added.")
+            contact = self.create_contact(name_str)
+            return success_message(f"Contact {contact.name.value} added.")
         except ValueError as e:
             return fail_message(f"Error adding contact: {e}")
 
+    def parallel_executor(self, workers: Optional[int] = None) -> ParallelQueryExecutor:
+        """
+        Create a process-pool executor over a read-only snapshot of the contacts,
+        for analytical queries on large books.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count).
+
+        Returns:
+            ParallelQueryExecutor; close it (or use it as a context manager) when done.
+        """
+        return ParallelQueryExecutor(self.snapshot_contacts(), workers)
+
+    def get_contact(self, name_str: str) -> Optional[Contact]:
+        """
+        Find a contact by its exact name (case-insensitive), through the name index.
+
+        Args:
+            name_str: Name of the contact.
+
+        Returns:
+            The matching Contact, or None.
+        """
+        if not isinstance(name_str, str):
+            return None
+        indexes = self._get_contact_indexes()
+        with self._lock.read():
+            found = indexes.full_names.get(name_str.lower())
+        return found[0] if found else None
+
+    def create_contact(self, name_str: str) -> Contact:
+        """
+        Create a contact and add it to the address book.
+
+        Args:
+            name_str: Name of the new contact.
+
+        Returns:
+            The created Contact.
+
+        Raises:
+            ValueError: If the name is empty or already used by another contact.
+        """
+        contact = Contact(name=Name(value=name_str))
+        self._insert_contact(contact)
+        return contact
+
+    def _insert_contact(self, contact: Contact, index: Optional[int] = None) -> None:
+        """
+        Add a contact to the book (at the end by default), e.g. a new one or one
+        whose removal is undone, and record the inverse.
+
+        Raises:
+            ValueError: If the name is already used by another contact.
+        """
+        with self._lock.write():
+            if self.get_contact(contact.name.value) is not None:
+                raise ValueError("Contact with this name already exists.")
+            self.contacts.insert(len(self.contacts) if index is None else index, contact)
+            contact._removed = False
+            self._touch(contact)
+            if self._birthday_index is not None:
+                self._birthday_index.add(contact)
+            if self._indexes is not None:
+                self._indexes.add(contact)
+            if self._spatial_index is not None:
+                self._spatial_index.update(contact)
+            if self._completion_index is not None:
+                self._completion_index.add(contact)
+            if self._reminders is not None:
+                self._reminders.schedule(contact)
+        contact._history = self._history
+        contact.subscribe(self._on_contact_changed)
+        self._record(
+            f"add contact {contact.name.value}",
+            lambda: self.remove_contact(contact),
+            lambda: self._insert_contact(contact, index),
+        )
+
+    def rename_contact(self, contact: Contact, new_name: str) -> None:
+        """
+        Rename a contact.
+
+        Args:
+            contact: The contact to rename.
+            new_name: The new name.
+
+        Raises:
+            ValueError: If the name is empty or already used by another contact.
+        """
+        Name(value=new_name)
+        with self._lock.write():
+            existing = self.get_contact(new_name)
+            if existing is not None and existing is not contact:
+                raise ValueError("Another contact with this name already exists.")
+            with contact._lock.write():
+                old_name = contact.name.value
+                contact.name.value = new_name
+                contact._touch()
+            # Re-index the name before releasing the lock, so no other thread can
+            # add a contact with the new name before the notification arrives.
+            self._get_contact_indexes().update(contact, ContactChange.NAME)
+        contact.notify(ContactChange.NAME)
+        self._record(
+            f"rename contact {old_name} to {new_name}",
+            lambda: self.rename_contact(contact, old_name),
+            lambda: self.rename_contact(contact, new_name),
+        )
+
+    def remove_contact(self, contact: Contact) -> None:
+        """
+        Remove a contact from the address book.
+
+        Args:
+            contact: The contact to remove.
+        """
+        with self._lock.write():
+            index = self.contacts.index(contact)
+            del self.contacts[index]
+            self._touch()
+            self._dirty_contacts.pop(id(contact), None)
+            if self._birthday_index is not None:
+                self._birthday_index.remove(contact)
+            if self._indexes is not None:
+                self._indexes.remove(contact)
+            if self._spatial_index is not None:
+                self._spatial_index.remove(contact)
+            if self._completion_index is not None:
+                self._completion_index.remove(contact)
+            if self._reminders is not None:
+                self._reminders.unschedule(contact)
+            contact._removed = True
+        contact.unsubscribe(self._on_contact_changed)
+        if self._active_contact is contact:
+            self._active_contact = None
+        self._record(
+            f"delete contact {contact.name.value}",
+            lambda: self._insert_contact(contact, index),
+            lambda: self.remove_contact(contact),
+        )
+
+    def set_birthday(self, contact: Contact, value: str) -> None:
+        """
+        Set or replace a contact's birthday.
+
+        Args:
+            contact: The contact to update.
+            value: Birthday in DD.MM.YYYY format.
+
+        Raises:
+            ValueError: If the date is invalid or in the future.
+        """
+        contact.replace_birthday(Birthday(value=value))
+
+    def find_duplicates(self, threshold: Optional[float] = None) -> list[DuplicateCandidate]:
+        """
+        Find pairs of contacts that probably describe the same person,
+        e.g. after an import: similar names, or a shared phone or email.
+
+        Args:
+            threshold: Minimum score from 0 to 1 (defaults to the dedup engine's).
+
+        Returns:
+            List of DuplicateCandidate entries, best first.
+        """
+        contacts = self.snapshot_contacts()
+        if threshold is None:
+            return find_duplicates(contacts)
+        return find_duplicates(contacts, threshold)
+
+    def merge_into(self, primary: Contact, duplicate: Contact) -> None:
+        """
+        Copy the phones, emails, addresses, notes and birthday of a duplicate contact
+        into the primary one and remove the duplicate. Values the primary already has
+        are skipped; the primary keeps its name, birthday and main items when set.
+        The merge is undone as a single step.
+
+        Args:
+            primary: The contact to keep.
+            duplicate: The contact to merge and remove.
+
+        Raises:
+            ValueError: If both arguments are the same contact.
+        """
+        if primary is duplicate:
+            raise ValueError("Cannot merge a contact into itself.")
+        with duplicate._lock.read():
+            phones = list(duplicate.phones)
+            emails = list(duplicate.emails)
+            addresses = list(duplicate.addresses)
+            notes = list(duplicate.notes)
+            birthday = duplicate.birthday
+        with primary._lock.read():
+            known = {
+                "phones": {p.number for p in primary.phones},
+                "emails": {e.address.lower() for e in primary.emails},
+                "addresses": {a.full_address().casefold() for a in primary.addresses},
+                "notes": {(n.title, n.content) for n in primary.notes},
+            }
+            has_main = {
+                "phones": primary.main_phone is not None,
+                "emails": primary.main_email is not None,
+                "addresses": primary.main_address is not None,
+            }
+            has_birthday = bool(primary.birthday and primary.birthday.birthday)
+        description = f"merge contact {duplicate.name.value} into {primary.name.value}"
+        with self._history.group(description):
+            self.remove_contact(duplicate)
+            for kind, items, key in (
+                    ("phones", phones, lambda p: p.number),
+                    ("emails", emails, lambda e: e.address.lower()),
+                    ("addresses", addresses, lambda a: a.full_address().casefold()),
+                    ("notes", notes, lambda n: (n.title, n.content)),
+            ):
+                for item in items:
+                    if key(item) in known[kind]:
+                        continue
+                    known[kind].add(key(item))
+                    # Copies leave the removed duplicate intact for undo.
+                    item = copy.deepcopy(item)
+                    if has_main.get(kind):
+                        item.is_main = False
+                    primary.add_field(item)
+            if birthday is not None and birthday.birthday and not has_birthday:
+                self.set_birthday(primary, birthday.value)
+
+    def merge_contacts(self) -> str:
+        """
+        Find likely duplicate contacts, let the user pick a pair and the contact to keep,
+        and merge the other one into it.
+        """
+        candidates = self.find_duplicates()
+        if not candidates:
+            return fail_message("No duplicate contacts found.")
+        candidate = self.select_item_interactively(
+            candidates, str, "Select contacts to merge:")
+        if candidate is None:
+            return fail_message("No contacts selected.")
+        keep = questionary.select(
+            "Which contact do you want to keep?",
+            choices=[candidate.first.name.value, candidate.second.name.value],
+        ).ask()
+        if keep is None:
+            return fail_message("No contact selected.")
+        if keep == candidate.first.name.value:
+            primary, duplicate = candidate.first, candidate.second
+        else:
+            primary, duplicate = candidate.second, candidate.first
+        if primary.removed or duplicate.removed:
+            return fail_message("One of the contacts was removed meanwhile.")
+        self.merge_into(primary, duplicate)
+        return success_message(
+            f"Contact {duplicate.name.value} merged into {primary.name.value}.")
+
+    def undo(self) -> str:
+        """
+        Revert the latest change to the book or its contacts made in the current
+        session, or outside sessions if none is active.
+        """
+        try:
+            description = self._history.undo()
+        except IndexError:
+            return fail_message("Nothing to undo.")
+        except ValueError as e:
+            return fail_message(f"Cannot undo: {e}")
+        return success_message(f"Undone: {description}.")
+
+    def redo(self) -> str:
+        """
+        Repeat the latest change reverted with undo in the current session.
+        """
+        try:
+            description = self._history.redo()
+        except IndexError:
+            return fail_message("Nothing to redo.")
+        except ValueError as e:
+            return fail_message(f"Cannot redo: {e}")
+        return success_message(f"Redone: {description}.")
+
+    def end_session(self, session: Session) -> None:
+        """
+        Forget the undo/redo log of a session that ended, e.g. a disconnected client.
+        """
+        self._history.forget(session.uid)
+
     def find_contact(self, used_for_selection: bool = False) -> Optional[Contact]:
         """
         Find a contact by name or by interactive selection.
         Returns the selected Contact or None.
         """
-        if not used_for_selection and not self.contacts:
+        contacts = self.snapshot_contacts()
+        if not used_for_selection and not contacts:
             return fail_message("No contacts found.")
         return self.select_item_interactively(
-            self.contacts,
+            contacts,
             lambda c: c.name.value,
             "Select contact:"
         )
 
-    def select_active_contact(self) -> str:
+    def select_active_contact(self, name_str: Optional[str] = None) -> str:
         """
-        Set the active contact for further operations using interactive selection.
+        Set the active contact for further operations, by the name typed after
+        the command or else using interactive selection.
         Returns a success or failure message.
-        """
-        contact = self.select_item_interactively(
-            self.contacts,
-            lambda c: c.name.value,
-            "Select contact:",
-        )
+
+        Args:
+            name_str: Name of the contact, e.g. completed at the prompt.
+        """
+        if name_str:
+            contact = self.get_contact(name_str)
+        else:
+            contact = self.select_item_interactively(
+                self.snapshot_contacts(),
+                lambda c: c.name.value,
+                "Select contact:",
+            )
         if contact is None:
             return fail_message("Contact not found.")
         self._active_contact = contact
@@ -231,9 +793,10 @@ class AddressBook(Selection):
         new_name = questionary.text("Enter new name for:", default=contact.name.value).ask()
         if not new_name:
             return fail_message("No new name provided.")
-        if any(c.name.value.lower() == new_name.lower() for c in self.contacts if c != contact):
-            return fail_message("Another contact with this name already exists.")
-        contact.name.value = new_name
+        try:
+            self.rename_contact(contact, new_name)
+        except ValueError as e:
+            return fail_message(str(e))
         return success_message(f"Contact name updated to {new_name}.")
 
     def delete_contact(self) -> str:
@@ -243,20 +806,19 @@ class AddressBook(Selection):
         contact = self.find_contact(True)
         if contact is None:
             return fail_message("No contacts found.")
-        self.contacts.remove(contact)
-        if self._active_contact == contact:
-            self._active_contact = None
+        self.remove_contact(contact)
         return success_message(f"Contact {contact.name.value} removed.")
 
     def show_contacts(self) -> str:
         """
         Show all contacts in the address book.
         """
-        if not self.contacts:
+        contacts = self.snapshot_contacts()
+        if not contacts:
             return fail_message("No contacts found.")
         return "\n".join(
             f"{idx + 1}. {contact.name.value}"
-            for idx, contact in enumerate(self.contacts)
+            for idx, contact in enumerate(contacts)
         )
 
     def open_in_google_maps(self) -> None:
@@ -265,19 +827,484 @@ class AddressBook(Selection):
         """
         return self._active_contact.open_in_google_maps()
 
+    def export_map(self) -> str:
+        """
+        Export the main address of every contact for plotting: a GeoJSON file with
+        points resolved from the offline gazetteer, or a CSV file of map links.
+        """
+        export_format = questionary.select(
+            "Export format:", choices=["GeoJSON", "Map links (CSV)"]).ask()
+        if export_format is None:
+            return fail_message("No format selected.")
+        is_geojson = export_format == "GeoJSON"
+        default_name = "contacts.geojson" if is_geojson else "contacts_map_links.csv"
+        file_path = questionary.text(
+            "File path:", default=os.path.join(os.path.expanduser("~"), default_name)).ask()
+        if not file_path:
+            return fail_message("No file path provided.")
+        contacts = self.snapshot_contacts()
+        try:
+            with open(file_path, "w", encoding="utf-8", newline="") as file:
+                if is_geojson:
+                    exported, missing = write_geojson(contacts, file)
+                else:
+                    exported, missing = write_map_links(contacts, file), 0
+        except OSError as e:
+            return fail_message(f"Cannot export: {e}")
+        message = f"Exported {exported} address(es) to {file_path}."
+        if missing:
+            message += f" {missing} address(es) not found in the gazetteer."
+        return success_message(message)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Take an immutable, point-in-time snapshot of the book. Contacts unchanged since
+        the previous snapshot are shared with it instead of being copied again.
+        """
+        with self._lock.read():
+            snapshot = take_snapshot(self.contacts, self._last_snapshot)
+        self._last_snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _get_snapshot_dir() -> str:
+        """
+        Get the directory of the snapshot store.
+        """
+        return os.path.join(os.path.expanduser("~"), "address_book_snapshots")
+
+    def _get_snapshot_store(self) -> SnapshotStore:
+        """
+        Get the snapshot store of the book. Snapshots of an encrypted book are
+        encrypted with its key, in a store of their own per key.
+        """
+        key = self._key
+        if key is None:
+            return SnapshotStore(self._get_snapshot_dir())
+        directory = os.path.join(self._get_snapshot_dir(), f"encrypted_{key.salt.hex()}")
+        return SnapshotStore(directory, key)
+
+    def take_snapshot(self) -> str:
+        """
+        Save a snapshot of the book to the snapshot store, e.g. once a day for auditing.
+        """
+        store = self._get_snapshot_store()
+        snapshot = self.snapshot()
+        try:
+            stored = store.list_snapshots()
+            changes = store.diff_with(stored[-1], snapshot) if stored else None
+            store.save(snapshot)
+        except (OSError, ValueError) as e:
+            return fail_message(f"Cannot save snapshot: {e}")
+        message = f"Snapshot {snapshot.snapshot_id} saved with {len(snapshot)} contact(s)."
+        if changes is not None:
+            message += (f" Since the previous one: {len(changes.added)} added, "
+                        f"{len(changes.removed)} removed, {len(changes.changed)} changed.")
+        return success_message(message)
+
+    def diff_snapshots(self) -> str:
+        """
+        Show the contacts added, removed and changed between a stored snapshot
+        and a later one or the current book.
+        """
+        store = self._get_snapshot_store()
+        stored = store.list_snapshots()
+        if not stored:
+            return fail_message("No snapshots found.")
+        old_id = self.select_item_interactively(stored, str, "Compare snapshot:")
+        if old_id is None:
+            return fail_message("No snapshot selected.")
+        current = "Current book"
+        later = [snapshot_id for snapshot_id in stored if snapshot_id > old_id]
+        new_id = self.select_item_interactively(later + [current], str, "With:")
+        if new_id is None:
+            return fail_message("No snapshot selected.")
+        try:
+            if new_id == current:
+                changes: SnapshotDiff = store.diff_with(old_id, self.snapshot())
+            else:
+                changes = store.diff(old_id, new_id)
+        except (OSError, KeyError, ValueError) as e:
+            return fail_message(f"Cannot compare snapshots: {e}")
+        return str(changes)
+
     def show_birthdays_this_week(self) -> str:
         """
         Find and display all contacts with birthdays this week.
         """
-        birthdays = self.find_birthdays_this_week(self.contacts)
+        today = date.today()
+        end_of_week = today + timedelta(days=6 - today.weekday())
+        birthdays = self.find_birthdays_in_range(today, end_of_week)
         if not birthdays:
             return fail_message("No birthdays this week.")
 
         result = ["Birthdays this week:"]
-        for name, bday_date in birthdays.items():
-            result.append(f"  {name}: {bday_date.strftime('%d.%m.%Y')}")
+        for upcoming in birthdays:
+            result.append(f"  {upcoming}")
+        return success_message("\n".join(result))
+
+    def show_upcoming_birthdays(self) -> str:
+        """
+        Prompt for a number of days and display birthdays in that period, in date order.
+        """
+        days_str = questionary.text("Number of days ahead:", default="7").ask()
+        try:
+            days = int(days_str)
+            if days < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return fail_message("Please enter a non-negative whole number of days.")
+        today = date.today()
+        birthdays = self.find_birthdays_in_range(today, today + timedelta(days=days))
+        if not birthdays:
+            return fail_message(f"No birthdays in the next {days} day(s).")
+        result = [f"Birthdays in the next {days} day(s):"]
+        for upcoming in birthdays:
+            result.append(f"  {upcoming}")
+        return success_message("\n".join(result))
+
+    def _get_birthday_index(self) -> BirthdayIndex:
+        """
+        Get the birthday index, building it on first use.
+        """
+        if self._birthday_index is None:
+            with self._lock.write():
+                if self._birthday_index is None:
+                    self._birthday_index = BirthdayIndex(self.contacts)
+        return self._birthday_index
+
+    def find_birthdays_in_range(self, start: date, end: date) -> list[UpcomingBirthday]:
+        """
+        Find birthdays between two dates (inclusive), in date order.
+        Contacts sharing a name are reported separately.
+
+        Args:
+            start: First date of the range.
+            end: Last date of the range.
+
+        Returns:
+            List of UpcomingBirthday entries with contact and age on that day.
+        """
+        index = self._get_birthday_index()
+        with self._lock.read():
+            return index.in_range(start, end)
+
+    def next_n_birthdays(self, n: int, from_date: Optional[date] = None) -> list[UpcomingBirthday]:
+        """
+        Find the next n birthdays on or after a date.
+
+        Args:
+            n: Maximum number of birthdays to return.
+            from_date: Date to search from (defaults to today).
+
+        Returns:
+            List of UpcomingBirthday entries in date order.
+        """
+        index = self._get_birthday_index()
+        with self._lock.read():
+            return index.next_n(n, from_date)
+
+    def start_reminders(
+            self,
+            sink: ReminderSink,
+            remind_at: time = time(9, 0),
+            since: Optional[datetime] = None,
+    ) -> BirthdayScheduler:
+        """
+        Start emitting birthday reminders from a background thread. The scheduler
+        follows the book: added, removed and changed birthdays are rescheduled.
+
+        Args:
+            sink: Where reminders are delivered.
+            remind_at: Time of day at which a birthday reminder fires.
+            since: Reminders due until this moment are not emitted, e.g. because
+                today's birthdays were already greeted.
+
+        Returns:
+            The running scheduler.
+        """
+        with self._lock.write():
+            if self._reminders is None:
+                self._reminders = BirthdayScheduler(
+                    self.contacts, sink, remind_at, since=since)
+            reminders = self._reminders
+        return reminders.start()
+
+    def stop_reminders(self) -> None:
+        """
+        Stop the birthday reminders started with start_reminders, if any.
+        """
+        with self._lock.write():
+            reminders, self._reminders = self._reminders, None
+        if reminders is not None:
+            reminders.stop()
+
+    def build_indexes(self) -> None:
+        """
+        Build the birthday, contact and completion indexes that are not built yet, e.g.
+        in the background after loading, so the first search does not wait for them.
+        """
+        self._get_birthday_index()
+        self._get_contact_indexes()
+        self.get_completion_index()
+
+    def _get_contact_indexes(self) -> ContactIndexes:
+        """
+        Get the name, name word, tag, phone and locality indexes, building them on first use.
+        """
+        if self._indexes is None:
+            with self._lock.write():
+                if self._indexes is None:
+                    self._indexes = ContactIndexes(self.contacts)
+        return self._indexes
+
+    def get_completion_index(self) -> CompletionIndex:
+        """
+        Get the prefix tries completing contact names, tags, cities and email domains
+        at the prompt, building them on first use.
+        """
+        if self._completion_index is None:
+            with self._lock.write():
+                if self._completion_index is None:
+                    self._completion_index = CompletionIndex(self.contacts)
+        return self._completion_index
+
+    def find_by_locality(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> list[tuple[Contact, Address]]:
+        """
+        Find addresses in a location using the locality index, e.g. all in a city
+        or with a zip code. Case does not matter.
+
+        Args:
+            country: Country name.
+            city: City name.
+            zip_code: Zip code.
+
+        Returns:
+            List of (contact, address) pairs.
+        """
+        localities = self._get_contact_indexes().localities
+        with self._lock.read():
+            return localities.find(country, city, zip_code)
+
+    def count_by_locality(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> RegionCount:
+        """
+        Count the contacts and addresses in a location, from the locality index.
+        """
+        localities = self._get_contact_indexes().localities
+        with self._lock.read():
+            return localities.count(country, city, zip_code)
+
+    def region_counts(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+    ) -> dict[str, RegionCount]:
+        """
+        Count contacts and addresses per country, per city of a country,
+        or per zip code of a city, from the locality index.
+        """
+        localities = self._get_contact_indexes().localities
+        with self._lock.read():
+            return localities.regions(country, city)
+
+    def find_by_location(self) -> str:
+        """
+        Prompt for a country, city and/or zip code and display the addresses there,
+        with counts per sub-region. With no input, display counts per country.
+        """
+        country = questionary.text("Country (optional):").ask() or ""
+        city = questionary.text("City (optional):").ask() or ""
+        zip_code = questionary.text("Zip code (optional):").ask() or ""
+        parts = [part.strip() for part in (zip_code, city, country) if part and part.strip()]
+        if zip_code.strip():
+            level = None
+        elif city.strip():
+            level = "zip code"
+        elif country.strip():
+            level = "city"
+        else:
+            level = "country"
+
+        result = []
+        if parts:
+            found = self.find_by_locality(country, city, zip_code)
+            if not found:
+                return fail_message(f"No contacts found in {', '.join(parts)}.")
+            total = self.count_by_locality(country, city, zip_code)
+            result.append(
+                f"{total.contacts} contact(s), {total.addresses} address(es) "
+                f"in {', '.join(parts)}:")
+            result.extend(f"  {contact.name.value}: {address}" for contact, address in found)
+        if level is not None:
+            counts = self.region_counts(country, city)
+            if not counts:
+                return fail_message("No addresses found.")
+            result.append(f"By {level}:")
+            result.extend(
+                f"  {name or '-'}: {count.contacts} contact(s), {count.addresses} address(es)"
+                for name, count in counts.items()
+            )
         return success_message("\n".join(result))
 
+    def _get_spatial_index(self) -> SpatialIndex:
+        """
+        Get the spatial index of geocoded addresses, building it on first use.
+        """
+        if self._spatial_index is None:
+            with self._lock.write():
+                if self._spatial_index is None:
+                    self._spatial_index = SpatialIndex(self.contacts)
+        return self._spatial_index
+
+    def find_nearby(
+            self,
+            center: Coordinates,
+            radius_km: Optional[float] = None,
+            count: Optional[int] = None,
+            exclude: Optional[Contact] = None,
+    ) -> list[NearbyContact]:
+        """
+        Find contacts near a point, from their geocoded addresses: all within a radius,
+        the nearest ``count``, or the nearest ``count`` within a radius.
+
+        Args:
+            center: The point to search around.
+            radius_km: Maximum distance in kilometres.
+            count: Maximum number of contacts.
+            exclude: Optional contact to leave out.
+
+        Returns:
+            List of NearbyContact entries, nearest first.
+
+        Raises:
+            ValueError: If neither a radius nor a count is given.
+        """
+        if radius_km is None and count is None:
+            raise ValueError("Give a radius, a count or both.")
+        index = self._get_spatial_index()
+        with self._lock.read():
+            if radius_km is None:
+                return index.nearest(center, count, exclude)
+            found = index.within(center, radius_km, exclude)
+        return found if count is None else found[:count]
+
+    def _resolve_location(self, text: str) -> tuple[Optional[Coordinates], Optional[Contact]]:
+        """
+        Resolve "latitude,longitude" or a contact name to a point.
+        """
+        latitude, sep, longitude = (text or "").partition(",")
+        if sep:
+            try:
+                point = Coordinates(float(latitude), float(longitude))
+            except ValueError:
+                pass
+            else:
+                if -90 <= point.latitude <= 90 and -180 <= point.longitude <= 180:
+                    return point, None
+        contact = self.get_contact((text or "").strip())
+        if contact is None:
+            return None, None
+        address = main_address(contact)
+        if address is None:
+            return None, contact
+        return get_geocoder().locate(address), contact
+
+    def find_nearby_contacts(self) -> str:
+        """
+        Prompt for a point (a contact or coordinates) and a radius or count,
+        and display the contacts nearby.
+        """
+        text = questionary.text("Near (contact name or latitude,longitude):").ask()
+        center, contact = self._resolve_location(text)
+        if center is None:
+            if contact is not None:
+                return fail_message(f"The address of {contact.name.value} cannot be located.")
+            return fail_message("Enter a contact name or coordinates like 50.45,30.52.")
+        radius_str = questionary.text("Radius in km (leave empty for the 10 nearest):").ask()
+        try:
+            if radius_str and radius_str.strip():
+                radius = float(radius_str)
+                if radius < 0:
+                    raise ValueError
+                found = self.find_nearby(center, radius_km=radius, exclude=contact)
+                header = f"Contacts within {radius:g} km:"
+            else:
+                found = self.find_nearby(center, count=10, exclude=contact)
+                header = "Nearest contacts:"
+        except ValueError:
+            return fail_message("Please enter a non-negative number of kilometres.")
+        if not found:
+            return fail_message("No contacts found nearby.")
+        return success_message("\n".join([header, *(f"  {nearby}" for nearby in found)]))
+
+    def _plan_query(self, text: str) -> tuple[QueryPlan, list[Contact]]:
+        """
+        Parse and plan a query, and fetch its candidates under the read lock.
+        """
+        query = parse_query(text)
+        planner = QueryPlanner(self._get_contact_indexes(), self._get_birthday_index())
+        with self._lock.read():
+            plan = planner.plan(query)
+            return plan, planner.candidates(plan, self.contacts)
+
+    def query(self, text: str) -> Iterator[Contact]:
+        """
+        Find contacts matching a query such as ``city:Berlin tag:client birthday:next30d``.
+        The most selective index drives the search, so most queries avoid a full scan.
+
+        Args:
+            text: The query; see ``parse_query`` for the syntax.
+
+        Returns:
+            Lazy iterator over the matching contacts.
+
+        Raises:
+            ValueError: If the query cannot be parsed.
+        """
+        plan, candidates = self._plan_query(text)
+        return execute_plan(plan, candidates)
+
+    def explain_query(self, text: str) -> QueryPlan:
+        """
+        Show how a query would be run, without running it.
+
+        Raises:
+            ValueError: If the query cannot be parsed.
+        """
+        return self._plan_query(text)[0]
+
+    def query_contacts(self, text: Optional[str] = None) -> str:
+        """
+        Display the contacts matching the query typed after the command,
+        prompting for one if there is none.
+
+        Args:
+            text: The query, e.g. completed at the prompt.
+        """
+        if not text:
+            text = questionary.text(
+                "Query (e.g. city:Berlin tag:client birthday:next30d has:email):").ask()
+        try:
+            contacts = list(self.query(text))
+        except ValueError as e:
+            return fail_message(f"Invalid query: {e}")
+        if not contacts:
+            return fail_message("No contacts match the query.")
+        return success_message("\n".join(
+            f"{idx + 1}. {contact.name.value}"
+            for idx, contact in enumerate(contacts)
+        ))
+
     @staticmethod
     def _get_file_path() -> str:
         """
@@ -286,25 +1313,464 @@ class AddressBook(Selection):
         home = os.path.expanduser("~")
         return os.path.join(home, "address_book.pkl")
 
-    def save_to_file(self) -> None:
+    @classmethod
+    def _get_shard_store(cls, key: Optional[BookKey] = None) -> ShardedStore:
+        """
+        Get the store of the sharded layout, in a directory next to the book file.
+        """
+        return ShardedStore(f"{os.path.splitext(cls._get_file_path())[0]}_shards", key=key)
+
+    @classmethod
+    def _saved_header(cls) -> dict:
+        """
+        Read the header of the saved book, in whichever layout it was saved.
+
+        Raises:
+            FileNotFoundError: If no book was saved.
+        """
+        store = cls._get_shard_store()
+        return store.read_header() if store.exists() else read_header(cls._get_file_path())
+
+    @classmethod
+    def _saved_key(cls, passphrase: Optional[str]) -> Optional[BookKey]:
+        """
+        Derive the key of the saved book from a passphrase. Call with the lock held.
+
+        Returns:
+            The key, or None if the saved book is not encrypted.
+
+        Raises:
+            FileNotFoundError: If no book was saved.
+            ValueError: If the passphrase is missing or wrong.
+        """
+        header = cls._saved_header()
+        if header.get("salt") is None:
+            return None
+        if passphrase is None:
+            raise ValueError("The address book is encrypted; a passphrase is needed.")
+        key = BookKey.derive(passphrase, header["salt"])
+        if not key.verify(header["check"]):
+            raise ValueError("Wrong passphrase.")
+        return key
+
+    @classmethod
+    def is_encrypted(cls) -> bool:
+        """
+        Whether the saved book is encrypted and needs a passphrase to load.
+        """
+        try:
+            with file_lock(cls._get_file_path(), exclusive=False):
+                return cls._saved_header().get("salt") is not None
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def check_passphrase(cls, passphrase: str) -> bool:
+        """
+        Whether a passphrase opens the saved book. The derived key is cached,
+        so loading the book with the passphrase afterwards does not derive it again.
+        """
+        try:
+            with file_lock(cls._get_file_path(), exclusive=False):
+                cls._saved_key(passphrase)
+        except FileNotFoundError:
+            return True
+        except ValueError:
+            return False
+        return True
+
+    def needs_passphrase_to_save(self) -> bool:
+        """
+        Whether another process saved the book encrypted with a passphrase this book
+        does not have the key of, so saving it needs that passphrase.
+        """
+        try:
+            with file_lock(self._get_file_path(), exclusive=False):
+                header = self._saved_header()
+        except FileNotFoundError:
+            return False
+        salt = header.get("salt")
+        return (header.get("stamp") != self._base_stamp and salt is not None
+                and salt != (self._key.salt if self._key else None))
+
+    def save_to_file(self, passphrase: Optional[str] = None) -> SaveResult:
         """
         Save the address book to a file.
+
+        The file is locked while it is written, and several processes can work on it
+        at once: if another process saved it since this book was loaded or last saved,
+        its changes are merged in per contact first instead of being overwritten.
+        If that process also turned encryption on or off or changed the passphrase,
+        its file is read with its key, and the book is saved with that key too unless
+        the encryption was changed here as well.
+
+        Args:
+            passphrase: Passphrase the other process encrypted the book with,
+                if it did; see needs_passphrase_to_save.
+
+        Returns:
+            SaveResult telling whether changes were merged and which contacts conflicted.
+
+        Raises:
+            ValueError: If the saved book is encrypted with another key and the
+                passphrase is missing or wrong.
         """
         file_path = self._get_file_path()
-        with open(file_path, "wb") as file:
-            pickle.dump(self, file)
+        with file_lock(file_path):
+            try:
+                header = self._saved_header()
+            except FileNotFoundError:
+                header = {"stamp": self._base_stamp}
+            conflicts: List[str] = []
+            merged = header.get("stamp") != self._base_stamp
+            if merged:
+                key = self._key
+                if header.get("salt") != (key.salt if key else None):
+                    key = self._saved_key(passphrase)
+                conflicts = self._merge_saved(self._read_saved(key)[1])
+                with self._lock.write():
+                    if self._key is self._base_key:
+                        self._key = key
+            store = self._get_shard_store(self._key)
+            stamp = new_stamp()
+            with self._lock.read():
+                version = self._version
+                contact_versions = {c.uid: c.version for c in self.contacts}
+                if self._sharded:
+                    self._save_shards(store, stamp)
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                else:
+                    dictionary = b""
+                    if self._compression == COMPRESSION_ZLIB:
+                        dictionary = build_dictionary(self._storage_strings(self.contacts))
+                    write_book(file_path, self, stamp, self._compression, dictionary, self._key)
+                    store.clear()
+            self._mark_saved(version, contact_versions, stamp)
+            self._base_key = self._key
+        return SaveResult(merged, tuple(conflicts))
+
+    def save_recovery_copy(self) -> str:
+        """
+        Write the book with its unsaved changes to a file next to the book file,
+        for when it cannot be saved. The copy is encrypted with this book's key,
+        if it has one, and can be opened by renaming it to the book file.
+
+        Returns:
+            Path of the copy.
+        """
+        path = f"{self._get_file_path()}.recovered"
+        with self._lock.read():
+            write_book(path, self, new_stamp(), self._compression, key=self._key)
+        return path
+
+    def _save_shards(self, store: ShardedStore, stamp: str) -> None:
+        """
+        Write the shards holding contacts added, changed or removed since the last save
+        (all of them after a merge, or after switching layout or compression), then the
+        manifest. Call with the read lock held.
+        """
+        contacts = {contact.uid: contact for contact in self.contacts}
+        files = self._shard_files
+        if files is None:
+            files = [None] * store.shard_count
+            owners = {uid: shard_of(c.name.value, len(files)) for uid, c in contacts.items()}
+            changed = set(range(len(files)))
+        else:
+            owners = dict(self._base_shards)
+            changed = {owners.pop(uid) for uid in self._base_shards if uid not in contacts}
+            for contact in self._dirty_contacts.values():
+                if contact.uid not in contacts:
+                    continue
+                if contact.uid in owners:
+                    changed.add(owners[contact.uid])
+                owners[contact.uid] = shard_of(contact.name.value, len(files))
+                changed.add(owners[contact.uid])
+        shards: Dict[int, List[Contact]] = {shard: [] for shard in changed}
+        for uid, contact in contacts.items():
+            if owners[uid] in shards:
+                shards[owners[uid]].append(contact)
+        state = self.__getstate__()
+        state["contacts"] = []
+        manifest = ShardManifest(state, list(contacts), list(files))
+        store.write(manifest, shards, stamp, self._compression,
+                    lambda records: build_dictionary(self._storage_strings(records)))
+        self._shard_files = manifest.files
+        self._base_shards = owners
+
+    def _merge_saved(self, theirs: "AddressBook") -> List[str]:
+        """
+        Merge the contacts saved by another process into this book, per contact.
+
+        Compared with the file state this book was loaded from: contacts changed,
+        added or removed only there are taken from there, contacts changed only here
+        are kept. A contact changed on both sides keeps this book's version, one
+        removed on one side and changed on the other is kept, and a contact added
+        there whose name is taken here gets a numbered name.
+
+        Args:
+            theirs: The book as saved by the other process.
+
+        Returns:
+            Names of the contacts that conflicted.
+        """
+        conflicts = []
+        with self._lock.write():
+            base = self._base_versions
+            dirty = {contact.uid for contact in self._dirty_contacts.values()}
+            their_contacts = {}
+            for contact in theirs.contacts:
+                contact.unsubscribe(theirs._on_contact_changed)
+                their_contacts[contact.uid] = contact
+
+            merged = []
+            for contact in self.contacts:
+                their = their_contacts.pop(contact.uid, None)
+                if their is None:
+                    if contact.uid in base and contact.uid not in dirty:
+                        continue
+                    if contact.uid in base:
+                        conflicts.append(contact.name.value)
+                    merged.append(contact)
+                elif their.version == base.get(contact.uid):
+                    merged.append(contact)
+                elif contact.uid in dirty:
+                    conflicts.append(contact.name.value)
+                    merged.append(contact)
+                else:
+                    merged.append(their)
+            for uid, their in their_contacts.items():
+                if uid in base:
+                    if their.version == base[uid]:
+                        continue
+                    conflicts.append(their.name.value)
+                merged.append(their)
+
+            names = set()
+            for contact in merged:
+                name = contact.name.value
+                number = 1
+                while contact.name.value.casefold() in names:
+                    number += 1
+                    contact.name.value = f"{name} ({number})"
+                if number > 1:
+                    conflicts.append(name)
+                names.add(contact.name.value.casefold())
+
+            kept = {id(contact) for contact in merged}
+            for contact in self.contacts:
+                if id(contact) not in kept:
+                    contact.unsubscribe(self._on_contact_changed)
+                    contact._removed = True
+            self.contacts[:] = merged
+            self._birthday_index = None
+            self._indexes = None
+            self._spatial_index = None
+            self._completion_index = None
+            if self._reminders is not None:
+                self._reminders.reset(self.contacts)
+            self._history = History(owner=current_session_uid)
+            self._subscribe_contacts()
+            self._version = max(self._version, theirs._version) + 1
+            self._shard_files = None
+        active = self._active_contact
+        if active is not None and active.removed:
+            self._active_contact = None
+        return conflicts
+
+    def save_if_changed(self, passphrase: Optional[str] = None) -> Optional[SaveResult]:
+        """
+        Save the address book to a file unless nothing changed since it was loaded
+        or last saved.
+
+        Args:
+            passphrase: Passphrase another process encrypted the book with; see save_to_file.
+
+        Returns:
+            SaveResult if the book was saved, None otherwise.
+        """
+        if not self.dirty:
+            return None
+        return self.save_to_file(passphrase)
 
     @classmethod
-    def load_from_file(cls) -> "AddressBook":
+    def load_from_file(cls, passphrase: Optional[str] = None) -> "AddressBook":
         """
         Load the address book from a file.
+
+        Args:
+            passphrase: Passphrase of the book, if it is encrypted.
+
+        Raises:
+            ValueError: If the book is encrypted and the passphrase is missing or wrong.
         """
-        file_path = os.path.join(os.path.expanduser("~"), "address_book.pkl")
         try:
-            with open(file_path, "rb") as f:
-                return pickle.load(f)
+            with file_lock(cls._get_file_path(), exclusive=False):
+                key = cls._saved_key(passphrase)
+                stamp, book, compression = cls._read_saved(key)
         except FileNotFoundError:
             return cls()
+        book._base_stamp = stamp
+        book._compression = compression
+        book._key = key
+        book._base_key = key
+        return book
+
+    @classmethod
+    def _read_saved(cls, key: Optional[BookKey] = None) -> tuple:
+        """
+        Read the saved book in whichever layout it was saved. Call with the lock held.
+
+        Returns:
+            Tuple (stamp, book, compression).
+
+        Raises:
+            FileNotFoundError: If no book was saved.
+            ValueError: If the book is encrypted with another key.
+        """
+        store = cls._get_shard_store(key)
+        if not store.exists():
+            return read_book(cls._get_file_path(), key)
+        stamp, manifest, compression = store.read_manifest()
+        by_uid = {}
+        owners = {}
+        for shard, records in enumerate(store.read_shards(manifest)):
+            for contact in records:
+                by_uid[contact.uid] = contact
+                owners[contact.uid] = shard
+        contacts = [by_uid.pop(uid) for uid in manifest.order if uid in by_uid]
+        state = dict(manifest.state)
+        state["contacts"] = contacts + list(by_uid.values())
+        book = cls.__new__(cls)
+        book.__setstate__(state)
+        book._sharded = True
+        book._shard_files = manifest.files
+        book._base_shards = owners
+        return stamp, book, compression
+
+    @classmethod
+    def load_contact(cls, name_str: str, passphrase: Optional[str] = None) -> Optional[Contact]:
+        """
+        Load a single contact by name (case-insensitive) without loading the book.
+        With the sharded layout, only the contact's shard is read (and decrypted).
+
+        Args:
+            name_str: Name of the contact.
+            passphrase: Passphrase of the book, if it is encrypted.
+
+        Returns:
+            A detached Contact, or None if there is no such contact.
+
+        Raises:
+            ValueError: If the book is encrypted and the passphrase is missing or wrong.
+        """
+        try:
+            with file_lock(cls._get_file_path(), exclusive=False):
+                key = cls._saved_key(passphrase)
+                store = cls._get_shard_store(key)
+                if store.exists():
+                    manifest = store.read_manifest()[1]
+                    contacts = store.read_shard(manifest, shard_of(name_str, len(manifest.files)))
+                else:
+                    contacts = read_book(cls._get_file_path(), key)[1].contacts
+        except FileNotFoundError:
+            return None
+        name = name_str.casefold()
+        return next((c for c in contacts if c.name.value.casefold() == name), None)
+
+    @staticmethod
+    def _storage_strings(contacts: List[Contact]) -> Iterator[str]:
+        """
+        Get the strings that tend to repeat across contacts (note titles, tags,
+        countries, cities and email domains), to build the compression dictionary from.
+        Call with the read lock held.
+        """
+        for contact in contacts:
+            for note in contact.notes:
+                yield note.title
+                yield from note.tags_list
+            for address in contact.addresses:
+                yield address.country
+                yield address.city
+            for email in contact.emails:
+                yield email.address.rpartition("@")[2]
+
+    def set_compression(self) -> str:
+        """
+        Choose how the book file is compressed from the next save on.
+        """
+        descriptions = {
+            COMPRESSION_NONE: "none (fastest to load)",
+            COMPRESSION_ZLIB: "zlib (fast, with a dictionary of frequent tags and cities)",
+            COMPRESSION_LZMA: "lzma (smallest file, slowest)",
+        }
+        choice = self.select_item_interactively(
+            list(COMPRESSIONS), descriptions.get,
+            f"Compress the book file (now {self._compression}):")
+        if choice is None:
+            return fail_message("No compression selected.")
+        if choice == self._compression:
+            return success_message(f"The book file already uses {choice} compression.")
+        with self._lock.write():
+            self._compression = choice
+            self._shard_files = None
+            self._touch()
+        return success_message(f"The book file will be saved with {choice} compression.")
+
+    def set_storage_layout(self) -> str:
+        """
+        Choose whether the book is saved as a single file or as shards.
+        """
+        layouts = {False: "a single file", True: "shards"}
+        descriptions = {
+            False: "a single file (~/address_book.pkl)",
+            True: "shards (~/address_book_shards; saves rewrite only the changed shards)",
+        }
+        choice = self.select_item_interactively(
+            [False, True], descriptions.get, f"Save the book as (now {layouts[self._sharded]}):")
+        if choice is None:
+            return fail_message("No layout selected.")
+        if choice == self._sharded:
+            return success_message("The book already uses this layout.")
+        with self._lock.write():
+            self._sharded = choice
+            self._shard_files = None
+            self._touch()
+        return success_message(f"The book will be saved as {layouts[choice]}.")
+
+    def set_encryption(self) -> str:
+        """
+        Encrypt the book files with a passphrase, change the passphrase,
+        or turn encryption off.
+        """
+        encrypt = "Encrypt with a new passphrase"
+        choice = self.select_item_interactively(
+            [encrypt, "Turn encryption off"], str,
+            f"The book is {'encrypted' if self._key else 'not encrypted'}:")
+        if choice is None:
+            return fail_message("Nothing selected.")
+        key = None
+        if choice == encrypt:
+            passphrase = questionary.password("New passphrase:").ask()
+            if not passphrase:
+                return fail_message("The passphrase cannot be empty.")
+            if questionary.password("Repeat the passphrase:").ask() != passphrase:
+                return fail_message("The passphrases do not match.")
+            try:
+                key = BookKey.derive(passphrase)
+            except RuntimeError as e:
+                return fail_message(str(e))
+        elif self._key is None:
+            return success_message("The book is not encrypted.")
+        with self._lock.write():
+            self._key = key
+            self._shard_files = None
+            self._touch()
+        if key is None:
+            return success_message("The book will be saved without encryption.")
+        return success_message(
+            "The book will be saved encrypted. Keep the passphrase safe: "
+            "the book cannot be opened without it.")
 
     @classmethod
     def find_birthdays_this_week(cls, contacts: list) -> dict[str, date]:
@@ -322,19 +1788,17 @@ class AddressBook(Selection):
             bday = getattr(contact, "birthday", None)
             name = getattr(contact, "name", None)
             if bday and bday.birthday:
-                next_bday = bday.birthday.replace(year=today.year)
-                if next_bday < today:
-                    next_bday = bday.birthday.replace(year=today.year + 1)
+                next_bday = bday.next_occurrence(today)
                 if start_of_week <= next_bday <= end_of_week:
                     birthdays_this_week[name.value] = next_bday
 
         return birthdays_this_week
 
     @classmethod
-    def find_birthdays_this_day(
-            cls, contacts: list, filepath: str = "greetings.txt") -> dict[str, date]:
+    def find_birthdays_this_day(cls, contacts: list) -> dict[str, date]:
         """
-        Find contacts with birthdays today and optionally suggest greetings.
+        Find contacts with birthdays today. Only collects them: greetings are offered
+        afterwards by offer_greetings, so the scan never waits for the user.
         Returns a dictionary mapping contact names to today's date.
         """
         today = date.today()
@@ -344,27 +1808,45 @@ class AddressBook(Selection):
             bday = getattr(contact, "birthday", None)
             name = getattr(contact, "name", None)
             if bday and bday.birthday:
-                today_bday = bday.birthday.replace(year=today.year)
+                today_bday = occurrence_in_year(bday.birthday, today.year)
                 if today_bday == today:
                     birthdays_today[name.value] = today_bday
 
-                    greetings_sug = questionary.confirm(
-                        f"Do you want me to suggest some greetings for {name.value}?"
-                    ).ask()
-                    if greetings_sug:
-                        try:
-                            with open(filepath, "r", encoding="utf-8") as file:
-                                greetings = [line.strip() for line in file if line.strip()]
-                            if not greetings:
-                                print("File is empty.")
-                                continue
-                            for i, greeting in enumerate(
-                                random.sample(greetings, min(3, len(greetings))), 1
-                            ):
-                                print(f"{i}. {greeting.replace('{name}', name.value)}")
-                        except Exception as e:
-                            print(f"Error reading greetings file: {e}")
-                    else:
-                        continue
-
         return birthdays_today
+
+    @classmethod
+    def offer_greetings(
+            cls,
+            contacts: list,
+            filepath: str = DEFAULT_GREETINGS_FILE,
+            locale: Optional[str] = None,
+    ) -> None:
+        """
+        Ask for each contact whether to suggest greetings, and print them if so.
+        Greetings come from the section of the first note tag of the contact the
+        greetings file has, else from the locale's section, else from all of them.
+        The greetings file is read once and cached by the greetings provider.
+
+        Args:
+            contacts: Contacts having a birthday.
+            filepath: Path to the greetings template file.
+            locale: Greetings section used for contacts without a matching tag, e.g. "uk".
+        """
+        provider = get_greetings_provider(filepath)
+        for contact in contacts:
+            name = contact.name.value
+            greetings_sug = questionary.confirm(
+                f"Do you want me to suggest some greetings for {name}?"
+            ).ask()
+            if not greetings_sug:
+                continue
+            try:
+                tag = provider.select_tag(tag_keys(contact), locale)
+                greetings = provider.suggest(name, 3, tag=tag)
+                if not greetings:
+                    print("File is empty.")
+                    continue
+                for i, greeting in enumerate(greetings, 1):
+                    print(f"{i}. {greeting}")
+            except Exception as e:
+                print(f"Error reading greetings file: {e}")
@@ -0,0 +1,553 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import urllib.parse
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http import HTTPStatus
+from typing import Callable, Deque, Dict, List, Optional, Pattern, Tuple
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.helpers.core_utils import ask_passphrase, save_book
+from src.district_9_personal_assistant.helpers.message import info_message
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone, normalize_phone
+from src.district_9_personal_assistant.reminders import StdoutSink
+
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15.0
+# Contacts returned by GET /contacts per page, by default and at most.
+CONTACTS_PAGE_SIZE = 100
+MAX_CONTACTS_PAGE_SIZE = 1000
+
+
+class ApiError(Exception):
+    """
+    Error that maps directly to an HTTP error response.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class HttpRequest:
+    """
+    A parsed HTTP request.
+    """
+    method: str
+    path: str
+    version: str
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> dict:
+        """
+        Decode the body as a JSON object.
+
+        Raises:
+            ApiError: If the body is not a JSON object.
+        """
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be valid JSON.")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+        return data
+
+    @property
+    def keep_alive(self) -> bool:
+        """
+        Whether the client wants the connection kept open after this request.
+        """
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class LatencyMetrics:
+    """
+    Per-route request counts and latency percentiles over a sliding window.
+    Safe to read from a handler thread while the event loop records requests.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        """
+        Args:
+            window: Number of most recent samples kept per route.
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, seconds: float, status: int) -> None:
+        """
+        Record one handled request.
+
+        Args:
+            route: Route label, e.g. "GET /contacts".
+            seconds: Time spent handling the request.
+            status: HTTP status code of the response.
+        """
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+            self._counts[route] = self._counts.get(route, 0) + 1
+            if status >= 400:
+                self._errors[route] = self._errors.get(route, 0) + 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Get the current metrics.
+
+        Returns:
+            Mapping of route label to count, errors and latency figures in milliseconds.
+        """
+        with self._lock:
+            samples = {route: sorted(route_samples)
+                       for route, route_samples in self._samples.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+        result = {}
+        for route, ordered in samples.items():
+            p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+            result[route] = {
+                "count": counts[route],
+                "errors": errors.get(route, 0),
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+                "p95_ms": round(ordered[p95_index] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return result
+
+
+Handler = Callable[[HttpRequest, Dict[str, str]], Tuple[HTTPStatus, object]]
+
+
+@dataclass
+class Route:
+    """
+    An API endpoint.
+
+    Attributes:
+        method: HTTP method.
+        template: Path template used as the metrics label, e.g. "/contacts/{name}".
+        pattern: Compiled regular expression matching the path.
+        handler: Function producing (status, payload).
+        writes: Whether the handler mutates the address book.
+    """
+    method: str
+    template: str
+    pattern: Pattern
+    handler: Handler
+    writes: bool = False
+
+
+def _compile_template(template: str) -> Pattern:
+    """
+    Turn a path template like "/contacts/{name}" into a regular expression.
+    """
+    regex = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template)
+    return re.compile(f"^{regex}$")
+
+
+class ApiServer:
+    """
+    Asyncio HTTP/1.1 server exposing AddressBook operations as JSON endpoints.
+
+    Handlers run in worker threads, so a slow one (e.g. the first lookup building
+    the book's indexes) never blocks the event loop and the other connections.
+    Reads run concurrently, relying on the locking of the book. Mutations are queued
+    and applied one at a time by a single writer task, each holding the book's write
+    lock, so readers see a mutation either whole or not at all. Connections are kept
+    alive between requests until the client closes them or stays idle too long.
+    """
+
+    def __init__(
+            self,
+            book: AddressBook,
+            host: str = "127.0.0.1",
+            port: int = 8080,
+            keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            book: The address book to serve.
+            host: Interface to bind to (localhost by default).
+            port: TCP port to listen on; 0 picks a free port.
+            keep_alive_timeout: Seconds an idle connection is kept open.
+        """
+        self.book = book
+        self.host = host
+        self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.metrics = LatencyMetrics()
+        self._server: Optional[asyncio.Server] = None
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._routes: List[Route] = []
+
+        self._add_route("GET", "/contacts", self._list_contacts)
+        self._add_route("POST", "/contacts", self._create_contact, writes=True)
+        self._add_route("GET", "/contacts/{name}", self._get_contact)
+        self._add_route("PATCH", "/contacts/{name}", self._rename_contact, writes=True)
+        self._add_route("DELETE", "/contacts/{name}", self._delete_contact, writes=True)
+        self._add_route("POST", "/contacts/{name}/phones", self._add_phone, writes=True)
+        self._add_route(
+            "DELETE", "/contacts/{name}/phones/{number}", self._delete_phone, writes=True)
+        self._add_route("POST", "/contacts/{name}/emails", self._add_email, writes=True)
+        self._add_route(
+            "DELETE", "/contacts/{name}/emails/{address}", self._delete_email, writes=True)
+        self._add_route("POST", "/contacts/{name}/addresses", self._add_address, writes=True)
+        self._add_route("POST", "/contacts/{name}/notes", self._add_note, writes=True)
+        self._add_route("PUT", "/contacts/{name}/birthday", self._set_birthday, writes=True)
+        self._add_route("GET", "/birthdays", self._upcoming_birthdays)
+        self._add_route("GET", "/metrics", self._get_metrics)
+
+    def _add_route(self, method: str, template: str, handler: Handler, writes: bool = False):
+        self._routes.append(Route(method, template, _compile_template(template), handler, writes))
+
+    async def start(self) -> None:
+        """
+        Start listening and launch the writer task.
+        The actual port is stored in ``self.port`` (useful when binding to port 0).
+        """
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._run_writer())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Stop accepting connections and finish the writer task.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+    async def serve_forever(self) -> None:
+        """
+        Start the server (if needed) and serve until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    def _write(self, handler: Handler, request: HttpRequest, params: Dict[str, str]):
+        """
+        Apply a mutation holding the book's write lock. Runs in a worker thread.
+        """
+        with self.book._lock.write():
+            return handler(request, params)
+
+    async def _run_writer(self) -> None:
+        """
+        Apply queued mutations one at a time, in arrival order.
+        """
+        while True:
+            handler, request, params, future = await self._writes.get()
+            try:
+                result = await asyncio.to_thread(self._write, handler, request, params)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def _handle_connection(
+            self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve requests on one connection until it is closed or idle.
+        """
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        self._read_request(reader), self.keep_alive_timeout)
+                except ApiError as e:
+                    writer.write(self._encode_response(e.status, {"error": e.message}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                keep_alive = request.keep_alive
+                started = time.perf_counter()
+                route_label, status, payload = await self._dispatch(request)
+                self.metrics.record(route_label, time.perf_counter() - started, status)
+                writer.write(self._encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[HttpRequest]:
+        """
+        Read one request from the stream, or return None on a clean EOF.
+
+        Raises:
+            ApiError: If the request is malformed or too large.
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").strip().split(" ")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        else:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers.")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length > MAX_BODY_SIZE:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+        body = await reader.readexactly(length) if length else b""
+
+        parsed = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        return HttpRequest(method.upper(), parsed.path, version, query, headers, body)
+
+    async def _dispatch(self, request: HttpRequest) -> Tuple[str, int, object]:
+        """
+        Route a request to its handler.
+
+        Returns:
+            Tuple of (route label, status code, JSON payload).
+        """
+        path_matched = False
+        for route in self._routes:
+            match = route.pattern.match(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if route.method != request.method:
+                continue
+            params = {k: urllib.parse.unquote(v) for k, v in match.groupdict().items()}
+            label = f"{route.method} {route.template}"
+            try:
+                if route.writes:
+                    future = asyncio.get_running_loop().create_future()
+                    await self._writes.put((route.handler, request, params, future))
+                    status, payload = await future
+                else:
+                    status, payload = await asyncio.to_thread(route.handler, request, params)
+            except ApiError as e:
+                return label, e.status, {"error": e.message}
+            except (ValueError, TypeError) as e:
+                return label, HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            return label, status, payload
+
+        if path_matched:
+            return "unmatched", HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Method not allowed."}
+        return "unmatched", HTTPStatus.NOT_FOUND, {"error": "Not found."}
+
+    @staticmethod
+    def _encode_response(status: int, payload: object, keep_alive: bool) -> bytes:
+        """
+        Serialize a JSON response with headers.
+        """
+        status = HTTPStatus(status)
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    def _require_contact(self, params: Dict[str, str]) -> Contact:
+        """
+        Look up the contact named in the path.
+
+        Raises:
+            ApiError: If the contact does not exist.
+        """
+        contact = self.book.get_contact(params["name"])
+        if contact is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Contact {params['name']} not found.")
+        return contact
+
+    @staticmethod
+    def _query_int(request: HttpRequest, name: str, default: int, minimum: int) -> int:
+        """
+        Read a whole-number query parameter.
+
+        Raises:
+            ApiError: If the value is not a whole number of at least the minimum.
+        """
+        try:
+            value = int(request.query.get(name, default))
+        except ValueError:
+            value = minimum - 1
+        if value < minimum:
+            raise ApiError(
+                HTTPStatus.BAD_REQUEST, f"{name} must be a whole number from {minimum}.")
+        return value
+
+    def _list_contacts(self, request: HttpRequest, params: Dict[str, str]):
+        offset = self._query_int(request, "offset", 0, 0)
+        limit = min(self._query_int(request, "limit", CONTACTS_PAGE_SIZE, 1),
+                    MAX_CONTACTS_PAGE_SIZE)
+        with self.book._lock.read():
+            page = self.book.contacts[offset:offset + limit]
+            total = len(self.book.contacts)
+        return HTTPStatus.OK, {
+            "contacts": [contact.to_dict() for contact in page],
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+        }
+
+    def _get_contact(self, request: HttpRequest, params: Dict[str, str]):
+        return HTTPStatus.OK, self._require_contact(params).to_dict()
+
+    def _create_contact(self, request: HttpRequest, params: Dict[str, str]):
+        name = request.json().get("name", "")
+        if self.book.get_contact(name) is not None:
+            raise ApiError(HTTPStatus.CONFLICT, "Contact with this name already exists.")
+        contact = self.book.create_contact(name)
+        return HTTPStatus.CREATED, contact.to_dict()
+
+    def _rename_contact(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        self.book.rename_contact(contact, request.json().get("name", ""))
+        return HTTPStatus.OK, contact.to_dict()
+
+    def _delete_contact(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        self.book.remove_contact(contact)
+        return HTTPStatus.OK, {"deleted": contact.name.value}
+
+    def _add_phone(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        data = request.json()
+        phone = Phone(number=data.get("number", ""), is_main=bool(data.get("is_main")))
+        if contact.has_phone(phone.number):
+            raise ApiError(HTTPStatus.CONFLICT, f"Phone {phone.number} already exists.")
+        contact._insert_item(phone)
+        return HTTPStatus.CREATED, contact.to_dict()
+
+    def _delete_phone(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        number = normalize_phone(params["number"])
+        phone = next((p for p in contact.phones if p.number == number), None)
+        if phone is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Phone {number} not found.")
+        contact.remove_field(phone)
+        return HTTPStatus.OK, contact.to_dict()
+
+    def _add_email(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        email = Email(address=str(request.json().get("address", "")).lower())
+        if contact.has_email(email.address):
+            raise ApiError(HTTPStatus.CONFLICT, f"Email {email.address} already exists.")
+        contact._insert_item(email)
+        return HTTPStatus.CREATED, contact.to_dict()
+
+    def _delete_email(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        address = params["address"].lower()
+        email = next((e for e in contact.emails if e.address == address), None)
+        if email is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Email {address} not found.")
+        contact.remove_field(email)
+        return HTTPStatus.OK, contact.to_dict()
+
+    def _add_address(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        contact._insert_item(Address.from_dict(request.json()))
+        return HTTPStatus.CREATED, contact.to_dict()
+
+    def _add_note(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        data = request.json()
+        contact._insert_item(Note(
+            content=data.get("content", ""),
+            title=data.get("title", ""),
+            tags_string=data.get("tags", ""),
+        ))
+        return HTTPStatus.CREATED, contact.to_dict()
+
+    def _set_birthday(self, request: HttpRequest, params: Dict[str, str]):
+        contact = self._require_contact(params)
+        self.book.set_birthday(contact, request.json().get("value", ""))
+        return HTTPStatus.OK, contact.to_dict()
+
+    def _upcoming_birthdays(self, request: HttpRequest, params: Dict[str, str]):
+        try:
+            days = int(request.query.get("days", "7"))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "days must be a whole number.")
+        today = date.today()
+        return HTTPStatus.OK, [
+            {"name": b.contact.name.value, "date": b.when.isoformat(), "age": b.age}
+            for b in self.book.find_birthdays_in_range(today, today + timedelta(days=days))
+        ]
+
+    def _get_metrics(self, request: HttpRequest, params: Dict[str, str]):
+        return HTTPStatus.OK, self.metrics.snapshot()
+
+
+def run_api_server(host: str = "127.0.0.1", port: int = 8080) -> None:
+    """
+    Load the address book and serve it over HTTP until interrupted, then save it.
+    Birthday reminders are printed on the server's console meanwhile.
+
+    Args:
+        host: Interface to bind to.
+        port: TCP port to listen on.
+    """
+    book = AddressBook.load_from_file(ask_passphrase())
+    server = ApiServer(book, host, port)
+    book.start_reminders(StdoutSink())
+    print(info_message(f"Serving the address book on http://{host}:{port}"))
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        book.stop_reminders()
+        print(save_book(book, "Server stopped."))
@@ -1,10 +1,48 @@
+import calendar
 from datetime import datetime, date
 from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
 
 from src.district_9_personal_assistant.field import BaseField
 from src.district_9_personal_assistant.helpers.message import fail_message
 
 
+def occurrence_in_year(birth_date: date, year: int) -> date:
+    """
+    Get the date a birthday is celebrated in the given year.
+    Birthdays on 29 February fall on 28 February in non-leap years.
+
+    Args:
+        birth_date: The date of birth.
+        year: The year of the occurrence.
+
+    Returns:
+        Date of the birthday in that year.
+    """
+    if birth_date.month == 2 and birth_date.day == 29 and not calendar.isleap(year):
+        return date(year, 2, 28)
+    return birth_date.replace(year=year)
+
+
+@dataclass(frozen=True)
+class BirthdayStats:
+    """
+    Values derived from a birthday for a given day.
+
+    Attributes:
+        today: The day the values were computed for.
+        age: Age on that day.
+        next_occurrence: Next birthday on or after that day.
+        days_until: Days from that day until the next birthday.
+        had_birthday_this_year: Whether the birthday has occurred this year.
+    """
+    today: date
+    age: int
+    next_occurrence: date
+    days_until: int
+    had_birthday_this_year: bool
+
+
 @dataclass
 class Birthday(BaseField):
     """
@@ -15,6 +53,16 @@ class Birthday(BaseField):
     """
     value: str
     DATE_FORMAT = "%d.%m.%Y"
+    # Derived values for one day; also covers books pickled before the cache existed.
+    _stats = None
+
+    def __getstate__(self) -> dict:
+        """
+        Leave the day-scoped cache out of the pickled state.
+        """
+        state = self.__dict__.copy()
+        state.pop("_stats", None)
+        return state
 
     def __post_init__(self) -> None:
         """
@@ -70,6 +118,38 @@ class Birthday(BaseField):
         """
         return cls(value=data.get("value", ""))
 
+    def stats(self, today: Optional[date] = None) -> BirthdayStats | None:
+        """
+        Get the values derived from the birthday for a day.
+        The result is cached until the day (or the birthday) changes.
+
+        Args:
+            today: Day to compute the values for (defaults to today).
+
+        Returns:
+            BirthdayStats instance, or None if the birthday is not set.
+        """
+        if not self.birthday:
+            return None
+        today = today or date.today()
+        cached = self._stats
+        if cached is not None and cached[0] == self.birthday and cached[1].today == today:
+            return cached[1]
+        this_year_bday = occurrence_in_year(self.birthday, today.year)
+        had_birthday = today >= this_year_bday
+        next_bday = this_year_bday
+        if today > this_year_bday:
+            next_bday = occurrence_in_year(self.birthday, today.year + 1)
+        stats = BirthdayStats(
+            today=today,
+            age=today.year - self.birthday.year - (0 if had_birthday else 1),
+            next_occurrence=next_bday,
+            days_until=(next_bday - today).days,
+            had_birthday_this_year=had_birthday,
+        )
+        self._stats = (self.birthday, stats)
+        return stats
+
     @property
     def age(self) -> int:
         """
@@ -78,13 +158,8 @@ class Birthday(BaseField):
         Returns:
             Age as integer.
         """
-        if not self.birthday:
-            return 0
-        today = date.today()
-        age = today.year - self.birthday.year
-        if today < self.birthday.replace(year=today.year):
-            age -= 1
-        return age
+        stats = self.stats()
+        return stats.age if stats else 0
 
     @property
     def has_had_birthday_this_year(self) -> bool:
@@ -94,11 +169,60 @@ class Birthday(BaseField):
         Returns:
             True if birthday has occurred this year, False otherwise.
         """
+        stats = self.stats()
+        return stats.had_birthday_this_year if stats else False
+
+    @property
+    def days_until_next(self) -> int | None:
+        """
+        Number of days until the next birthday (0 if it is today), or None if not set.
+        """
+        stats = self.stats()
+        return stats.days_until if stats else None
+
+    def next_occurrence(self, from_date: Optional[date] = None) -> date | None:
+        """
+        Get the next birthday on or after the given date.
+
+        Args:
+            from_date: Date to search from (defaults to today).
+
+        Returns:
+            Date of the next birthday, or None if not set.
+        """
         if not self.birthday:
-            return False
-        today = date.today()
-        this_year_bday = self.birthday.replace(year=today.year)
-        return today >= this_year_bday
+            return None
+        if from_date is None:
+            return self.stats().next_occurrence
+        occurrence = occurrence_in_year(self.birthday, from_date.year)
+        if occurrence < from_date:
+            occurrence = occurrence_in_year(self.birthday, from_date.year + 1)
+        return occurrence
 
     def __str__(self) -> str:
         return self.value if self.value else ""
+
+
+def ages_for(
+        contacts: Iterable,
+        today: Optional[date] = None,
+) -> List[Tuple[object, BirthdayStats]]:
+    """
+    Compute birthday values for many contacts in one pass, for reporting.
+    Contacts without a birthday are skipped.
+
+    Args:
+        contacts: Contacts (objects with an optional ``birthday`` attribute).
+        today: Day to compute the values for (defaults to today).
+
+    Returns:
+        List of (contact, BirthdayStats) pairs in input order.
+    """
+    today = today or date.today()
+    result = []
+    for contact in contacts:
+        bday = getattr(contact, "birthday", None)
+        stats = bday.stats(today) if bday else None
+        if stats is not None:
+            result.append((contact, stats))
+    return result
@@ -0,0 +1,208 @@
+import bisect
+import itertools
+from calendar import isleap
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.district_9_personal_assistant.birthday import occurrence_in_year
+from src.district_9_personal_assistant.contact import Contact
+
+
+@dataclass(frozen=True)
+class UpcomingBirthday:
+    """
+    A contact's birthday on a concrete date.
+
+    Attributes:
+        when: Date the birthday is celebrated.
+        contact: The contact.
+        age: Age the contact turns on that date.
+    """
+    when: date
+    contact: Contact
+    age: int
+
+    def __str__(self) -> str:
+        return f"{self.contact.name.value}: {self.when.strftime('%d.%m.%Y')} (turns {self.age})"
+
+
+class BirthdayIndex:
+    """
+    Contacts sorted by birthday (month, day), for range queries in O(log n + k).
+
+    Keys are (month, day, seq) tuples kept in a sorted list; seq keeps the order
+    of contacts sharing a birthday stable. Birthdays on 29 February are reported
+    on 28 February in non-leap years.
+    """
+
+    def __init__(self, contacts: Iterable[Contact] = ()) -> None:
+        """
+        Args:
+            contacts: Contacts to index; those without a birthday are skipped.
+        """
+        self._seq = itertools.count()
+        self._keys: List[Tuple[int, int, int]] = []
+        self._contacts: List[Contact] = []
+        self._key_by_contact: Dict[int, Tuple[int, int, int]] = {}
+
+        entries = []
+        for contact in contacts:
+            key = self._make_key(contact)
+            if key is not None:
+                entries.append((key, contact))
+        entries.sort(key=lambda entry: entry[0])
+        for key, contact in entries:
+            self._keys.append(key)
+            self._contacts.append(contact)
+            self._key_by_contact[id(contact)] = key
+
+    def _make_key(self, contact: Contact) -> Optional[Tuple[int, int, int]]:
+        """
+        Build the sort key for a contact, or None if it has no birthday.
+        """
+        if not contact.birthday or not contact.birthday.birthday:
+            return None
+        bday = contact.birthday.birthday
+        return bday.month, bday.day, next(self._seq)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, contact: Contact) -> None:
+        """
+        Add a contact to the index (no-op if it has no birthday).
+        """
+        key = self._make_key(contact)
+        if key is None:
+            return
+        idx = bisect.bisect_left(self._keys, key)
+        self._keys.insert(idx, key)
+        self._contacts.insert(idx, contact)
+        self._key_by_contact[id(contact)] = key
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from the index (no-op if it is not indexed).
+        """
+        key = self._key_by_contact.pop(id(contact), None)
+        if key is None:
+            return
+        idx = bisect.bisect_left(self._keys, key)
+        del self._keys[idx]
+        del self._contacts[idx]
+
+    def update(self, contact: Contact) -> None:
+        """
+        Re-index a contact after its birthday changed.
+        """
+        self.remove(contact)
+        self.add(contact)
+
+    def _year_bounds(self, year: int, start: date, end: date) -> Tuple[int, int]:
+        """
+        Get the slice of the sorted keys between two dates of the same year.
+        """
+        upper = (end.month, end.day + 1)
+        if end.month == 2 and end.day == 28 and not isleap(year):
+            upper = (2, 30)
+        lo = bisect.bisect_left(self._keys, (start.month, start.day))
+        hi = bisect.bisect_left(self._keys, upper)
+        return lo, hi
+
+    @staticmethod
+    def _years(start: date, end: date) -> Iterator[Tuple[int, date, date]]:
+        """
+        Split a range into (year, first date, last date) parts within single years.
+        """
+        for year in range(start.year, end.year + 1):
+            yield (
+                year,
+                start if year == start.year else date(year, 1, 1),
+                end if year == end.year else date(year, 12, 31),
+            )
+
+    def _iter_year(self, year: int, start: date, end: date) -> Iterator[UpcomingBirthday]:
+        """
+        Yield birthdays between two dates of the same year, in date order.
+        """
+        lo, hi = self._year_bounds(year, start, end)
+        for idx in range(lo, hi):
+            contact = self._contacts[idx]
+            birth_date = contact.birthday.birthday
+            when = occurrence_in_year(birth_date, year)
+            if when < birth_date:
+                continue
+            yield UpcomingBirthday(when, contact, year - birth_date.year)
+
+    def iter_range(self, start: date, end: date) -> Iterator[UpcomingBirthday]:
+        """
+        Lazily yield birthdays from start to end (inclusive), in date order.
+        Ranges may cross year boundaries.
+
+        Args:
+            start: First date of the range.
+            end: Last date of the range.
+
+        Yields:
+            UpcomingBirthday entries.
+        """
+        for year, first, last in self._years(start, end):
+            yield from self._iter_year(year, first, last)
+
+    def count_range(self, start: date, end: date) -> int:
+        """
+        Count the birthdays from start to end (inclusive) in O(log n), from the
+        positions of the range in the sorted keys. An upper bound: contacts born
+        after a birthday in the range are counted too, and ranges longer than
+        a year count a contact once per year.
+
+        Args:
+            start: First date of the range.
+            end: Last date of the range.
+
+        Returns:
+            Number of birthdays (0 if end is before start).
+        """
+        count = 0
+        for year, first, last in self._years(start, end):
+            lo, hi = self._year_bounds(year, first, last)
+            count += hi - lo
+        return count
+
+    def in_range(self, start: date, end: date) -> List[UpcomingBirthday]:
+        """
+        Get birthdays from start to end (inclusive), in date order.
+
+        Args:
+            start: First date of the range.
+            end: Last date of the range.
+
+        Returns:
+            List of UpcomingBirthday entries (empty if end is before start).
+        """
+        return list(self.iter_range(start, end))
+
+    def next_n(self, n: int, from_date: Optional[date] = None) -> List[UpcomingBirthday]:
+        """
+        Get the next n birthdays on or after a date.
+        Each contact appears at most once.
+
+        Args:
+            n: Maximum number of birthdays to return.
+            from_date: Date to search from (defaults to today).
+
+        Returns:
+            List of UpcomingBirthday entries in date order.
+        """
+        from_date = from_date or date.today()
+        result: List[UpcomingBirthday] = []
+        seen = set()
+        for entry in self.iter_range(from_date, from_date + timedelta(days=365)):
+            if len(result) >= n:
+                break
+            if id(entry.contact) in seen:
+                continue
+            seen.add(id(entry.contact))
+            result.append(entry)
+        return result
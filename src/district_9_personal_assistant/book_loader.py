@@ -0,0 +1,87 @@
+import threading
+from typing import Callable, Optional
+
+from src.district_9_personal_assistant.address_book import AddressBook
+
+
+class BookLoader:
+    """
+    Loads the address book in a background thread so the prompt can be shown
+    while the pickle is still being read.
+    """
+
+    def __init__(self, load_func: Optional[Callable[[], AddressBook]] = None) -> None:
+        """
+        Args:
+            load_func: Callable that returns the loaded AddressBook.
+                Defaults to AddressBook.load_from_file.
+        """
+        self._load_func = load_func or AddressBook.load_from_file
+        self._ready = threading.Event()
+        self._book: Optional[AddressBook] = None
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "BookLoader":
+        """
+        Start loading the address book in a daemon thread.
+
+        Returns:
+            The loader itself, to allow chaining.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="address-book-loader", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        """
+        Thread target: load the book and signal readiness.
+        """
+        try:
+            self._book = self._load_func()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def is_ready(self) -> bool:
+        """
+        Check whether loading has finished (successfully or not).
+
+        Returns:
+            True if the loader is done, False otherwise.
+        """
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> AddressBook:
+        """
+        Block until the address book is loaded and return it.
+
+        Args:
+            timeout: Maximum number of seconds to wait, or None to wait forever.
+
+        Returns:
+            The loaded AddressBook.
+
+        Raises:
+            TimeoutError: If loading did not finish within the timeout.
+            Exception: Any error raised while loading the book.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Address book is still loading.")
+        if self._error is not None:
+            raise self._error
+        return self._book
+
+    @property
+    def book(self) -> Optional[AddressBook]:
+        """
+        Returns the loaded AddressBook, or None if it is not ready yet.
+        """
+        if not self.is_ready() or self._error is not None:
+            return None
+        return self._book
@@ -0,0 +1,315 @@
+import bisect
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from prompt_toolkit.completion import Completer, Completion
+from prompt_toolkit.document import Document
+
+from src.district_9_personal_assistant.contact import Contact, ContactChange
+from src.district_9_personal_assistant.contact_index import name_keys, tag_keys
+
+# Completions offered per keystroke; bounds the work of a lookup whatever the book size.
+COMPLETION_LIMIT = 20
+# Commands taking a contact name as their argument.
+CONTACT_ARGUMENT_COMMANDS = frozenset({"select_active_contact"})
+QUERY_COMMAND = "query"
+# Query fields completed, with the trie of CompletionIndex completing their values.
+QUERY_FIELD_TRIES = {"": "names", "name": "names", "tag": "tags", "city": "cities",
+                     "email": "domains"}
+
+Entry = Tuple[str, str]
+
+
+class _TrieNode:
+    __slots__ = ("children", "values", "size", "top")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Display values of the keys ending here, with how many times each was added.
+        self.values: Dict[str, int] = {}
+        # Number of values added in this subtree, to prune empty branches.
+        self.size = 0
+        # The first (key, value) entries of the subtree in key order, one per value,
+        # so a lookup reads them instead of walking the subtree.
+        self.top: List[Entry] = []
+
+
+def _offer(top: List[Entry], entry: Entry, limit: int) -> bool:
+    """
+    Insert an entry into a node's top entries if it ranks within the limit.
+    A value keeps only its first key.
+
+    Returns:
+        Whether the top entries changed.
+    """
+    if len(top) >= limit and entry >= top[-1]:
+        return False
+    key, value = entry
+    for i, (other_key, other_value) in enumerate(top):
+        if other_value == value:
+            if other_key <= key:
+                return False
+            del top[i]
+            break
+    bisect.insort(top, entry)
+    del top[limit:]
+    return True
+
+
+class PrefixTrie:
+    """
+    Prefix tree from case-insensitive keys to display values, e.g. from a name word
+    to the full contact name. The same value may be added several times (a tag used
+    by many contacts) and stays until it was discarded as many times.
+
+    Every node keeps the first ``limit`` distinct values of its subtree in key order,
+    updated as values are added and discarded, so a lookup costs one step per
+    character of the prefix plus copying at most ``limit`` values, however many keys
+    share the prefix.
+    """
+
+    def __init__(self, limit: int = COMPLETION_LIMIT) -> None:
+        """
+        Args:
+            limit: Number of completions kept per node, the most a lookup returns.
+        """
+        self._root = _TrieNode()
+        self._limit = limit
+
+    def __len__(self) -> int:
+        return self._root.size
+
+    def add(self, key: str, value: str) -> None:
+        """
+        Add a value under a key.
+        """
+        key = key.casefold()
+        entry = (key, value)
+        path = [self._root]
+        for char in key:
+            path.append(path[-1].children.setdefault(char, _TrieNode()))
+        path[-1].values[value] = path[-1].values.get(value, 0) + 1
+        for node in path:
+            node.size += 1
+        # A node's top entries rank at least as high as any child's, so once the entry
+        # misses a node it misses every node above it too.
+        for node in reversed(path):
+            if not _offer(node.top, entry, self._limit):
+                break
+
+    def discard(self, key: str, value: str) -> None:
+        """
+        Remove a value added under a key once. Unknown values are ignored.
+        """
+        key = key.casefold()
+        path = [self._root]
+        for char in key:
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+        count = path[-1].values.get(value)
+        if count is None:
+            return
+        for node in path:
+            node.size -= 1
+        if count > 1:
+            path[-1].values[value] = count - 1
+            return
+        del path[-1].values[value]
+        # A node's top entries come from its own values and its children's top entries,
+        # so the entry can only be in the top entries of a node whose child has it.
+        entry = (key, value)
+        for depth in range(len(path) - 1, -1, -1):
+            if entry not in path[depth].top:
+                break
+            self._refill(path[depth], key[:depth])
+        for parent, char, child in zip(path, key, path[1:]):
+            if child.size == 0:
+                del parent.children[char]
+                break
+
+    def _refill(self, node: _TrieNode, key: str) -> None:
+        """
+        Recompute the top entries of a node from its own values and its children's.
+        """
+        candidates = [(key, value) for value in heapq.nsmallest(self._limit, node.values)]
+        for child in node.children.values():
+            candidates.extend(child.top)
+        candidates.sort()
+        top: List[Entry] = []
+        seen = set()
+        for entry in candidates:
+            if entry[1] not in seen:
+                seen.add(entry[1])
+                top.append(entry)
+                if len(top) == self._limit:
+                    break
+        node.top = top
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix.casefold():
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str, limit: int = COMPLETION_LIMIT) -> List[str]:
+        """
+        Get up to ``limit`` distinct values whose key starts with the prefix, in key
+        order; never more than the limit of the trie.
+        """
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [value for _, value in node.top[:limit]]
+
+
+def _name_entries(contact: Contact) -> List[Entry]:
+    return [(key, contact.name.value) for key in name_keys(contact)]
+
+
+def _tag_entries(contact: Contact) -> List[Entry]:
+    return [(tag, tag) for tag in tag_keys(contact)]
+
+
+def _city_entries(contact: Contact) -> List[Entry]:
+    return [(address.city, address.city) for address in contact.addresses if address.city]
+
+
+def _domain_entries(contact: Contact) -> List[Entry]:
+    domains = [email.address.rpartition("@")[2] for email in contact.emails]
+    return [(domain, domain) for domain in domains if domain]
+
+
+class CompletionIndex:
+    """
+    Prefix tries over contact names (and each word of them), note tags, cities and
+    email domains, for completing command arguments as they are typed. Kept up to
+    date from contact change notifications, re-indexing only the part that changed.
+    """
+
+    def __init__(self, contacts: Iterable[Contact] = ()) -> None:
+        """
+        Args:
+            contacts: Contacts to index.
+        """
+        self.names = PrefixTrie()
+        self.tags = PrefixTrie()
+        self.cities = PrefixTrie()
+        self.domains = PrefixTrie()
+        self._sources: Dict[ContactChange, Tuple[PrefixTrie, Callable[[Contact], List[Entry]]]] = {
+            ContactChange.NAME: (self.names, _name_entries),
+            ContactChange.NOTES: (self.tags, _tag_entries),
+            ContactChange.ADDRESSES: (self.cities, _city_entries),
+            ContactChange.EMAILS: (self.domains, _domain_entries),
+        }
+        # Entries added for each contact, by change kind, so they can be removed exactly.
+        self._entries: Dict[int, Dict[ContactChange, List[Entry]]] = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact: Contact) -> None:
+        """
+        Index a new contact.
+        """
+        for change in self._sources:
+            self.update(contact, change)
+
+    def update(self, contact: Contact, change: ContactChange) -> None:
+        """
+        Re-index the part of a contact that changed.
+        """
+        source = self._sources.get(change)
+        if source is None:
+            return
+        trie, entries_func = source
+        with contact._lock.read():
+            new_entries = entries_func(contact)
+        entries = self._entries.setdefault(id(contact), {})
+        for key, value in entries.get(change, ()):
+            trie.discard(key, value)
+        for key, value in new_entries:
+            trie.add(key, value)
+        entries[change] = new_entries
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from the index. Unknown contacts are ignored.
+        """
+        for change, entries in self._entries.pop(id(contact), {}).items():
+            trie = self._sources[change][0]
+            for key, value in entries:
+                trie.discard(key, value)
+
+
+class CommandCompleter(Completer):
+    """
+    Completes the command prompt: command names first, then the argument of
+    commands that take one, such as a contact name for ``select_active_contact``
+    or the field values of a ``query`` (``tag:``, ``city:``, ``email:``, ``name:``).
+    """
+
+    def __init__(
+            self,
+            commands: Sequence[str],
+            get_index: Callable[[], Optional[CompletionIndex]],
+    ) -> None:
+        """
+        Args:
+            commands: Command names to complete.
+            get_index: Returns the completion index of the book, or None while it is
+                not loaded yet.
+        """
+        self.commands = list(commands)
+        self._get_index = get_index
+
+    @staticmethod
+    def _last_term(text: str) -> str:
+        """
+        Get the query term being typed: the text after the last space outside quotes.
+        """
+        start, quoted = 0, False
+        for i, char in enumerate(text):
+            if char == '"':
+                quoted = not quoted
+            elif char == " " and not quoted:
+                start = i + 1
+        return text[start:]
+
+    def _argument_values(self, index: CompletionIndex, command: str, argument: str) -> Tuple[
+            str, List[str]]:
+        """
+        Get the fragment of the argument being completed and its completions.
+        """
+        if command in CONTACT_ARGUMENT_COMMANDS:
+            return argument, index.names.complete(argument)
+        if command != QUERY_COMMAND:
+            return argument, []
+        term = self._last_term(argument)
+        field, colon, value = term.partition(":")
+        if not colon:
+            field, value = "", term
+        trie_name = QUERY_FIELD_TRIES.get(field.lower())
+        if trie_name is None:
+            return value, []
+        values = getattr(index, trie_name).complete(value.lstrip('"'))
+        # Values with spaces are quoted, as parse_query expects.
+        return value, [f'"{v}"' if " " in v else v for v in values]
+
+    def get_completions(self, document: Document, complete_event) -> Iterator[Completion]:
+        text = document.text_before_cursor.lstrip()
+        command, space, argument = text.partition(" ")
+        if not space:
+            word = command.lower()
+            for name in self.commands:
+                if word in name:
+                    yield Completion(name, start_position=-len(command))
+            return
+        index = self._get_index()
+        if index is None:
+            return
+        fragment, values = self._argument_values(index, command.lower(), argument.lstrip())
+        for value in values:
+            yield Completion(value, start_position=-len(fragment))
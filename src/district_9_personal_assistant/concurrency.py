@@ -0,0 +1,106 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """
+    Lock that lets many readers or a single writer in at a time.
+
+    Waiting writers block new readers, so a steady stream of reads cannot starve
+    writes. Locks are reentrant per thread: a reader may read again, and the writer
+    may read or write again. Upgrading a read lock to a write lock is not allowed,
+    as two upgrading readers would deadlock each other.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: int | None = None
+        self._write_depth = 0
+        self._local = threading.local()
+
+    def _held_reads(self) -> int:
+        return getattr(self._local, "reads", 0)
+
+    def acquire_read(self) -> None:
+        """
+        Acquire the lock for reading.
+        """
+        if self._writer == threading.get_ident():
+            self._local.reads_in_write = getattr(self._local, "reads_in_write", 0) + 1
+            return
+        held = self._held_reads()
+        with self._cond:
+            if not held:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+        self._local.reads = held + 1
+
+    def release_read(self) -> None:
+        """
+        Release a read acquisition.
+        """
+        if getattr(self._local, "reads_in_write", 0):
+            self._local.reads_in_write -= 1
+            return
+        with self._cond:
+            self._readers -= 1
+            self._local.reads = self._held_reads() - 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Acquire the lock for writing.
+
+        Raises:
+            RuntimeError: If the current thread holds a read lock.
+        """
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if self._held_reads():
+            raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """
+        Release a write acquisition.
+        """
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Context manager holding the lock for reading.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Context manager holding the lock for writing.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -5,6 +5,8 @@ class Commands(Enum):
     # shared commands
     EXIT = "exit"
     HELP = "help"
+    UNDO = "undo"
+    REDO = "redo"
 
     # book commands
     ADD_CONTACT = "add_contact"
@@ -15,6 +17,17 @@ class Commands(Enum):
     DELETE_CONTACT = "delete_contact"
     SHOW_CONTACTS = "show_contacts"
     FIND_BIRTHDAYS_THIS_WEEK = "find_birthdays_this_week"
+    FIND_UPCOMING_BIRTHDAYS = "find_upcoming_birthdays"
+    QUERY = "query"
+    FIND_BY_LOCATION = "find_by_location"
+    EXPORT_MAP = "export_map"
+    FIND_NEARBY = "find_nearby"
+    MERGE_CONTACTS = "merge_contacts"
+    TAKE_SNAPSHOT = "take_snapshot"
+    DIFF_SNAPSHOTS = "diff_snapshots"
+    SET_COMPRESSION = "set_compression"
+    SET_STORAGE_LAYOUT = "set_storage_layout"
+    SET_ENCRYPTION = "set_encryption"
 
     # phone
     ADD_PHONE = "add_phone"
@@ -59,6 +72,19 @@ book_commands_list = [
     Commands.DELETE_CONTACT.value,
     Commands.SHOW_CONTACTS.value,
     Commands.FIND_BIRTHDAYS_THIS_WEEK.value,
+    Commands.FIND_UPCOMING_BIRTHDAYS.value,
+    Commands.QUERY.value,
+    Commands.FIND_BY_LOCATION.value,
+    Commands.EXPORT_MAP.value,
+    Commands.FIND_NEARBY.value,
+    Commands.MERGE_CONTACTS.value,
+    Commands.TAKE_SNAPSHOT.value,
+    Commands.DIFF_SNAPSHOTS.value,
+    Commands.SET_COMPRESSION.value,
+    Commands.SET_STORAGE_LAYOUT.value,
+    Commands.SET_ENCRYPTION.value,
+    Commands.UNDO.value,
+    Commands.REDO.value,
     Commands.EXIT.value,
     Commands.HELP.value,
 ]
@@ -94,6 +120,8 @@ contact_commands_list = [
     Commands.ADD_BIRTHDAY.value,
     Commands.SHOW_BIRTHDAY.value,
     # shared
+    Commands.UNDO.value,
+    Commands.REDO.value,
     Commands.EXIT.value,
     Commands.HELP.value,
     Commands.BACK_TO_BOOK.value
@@ -177,5 +205,41 @@ commands_info = (
     "    - contact name (required): Name of the contact whose birthday to display\n"
     "  find_birthdays_this_week\n"
     "    - Find all contacts with birthdays in the current week\n"
+    "  find_upcoming_birthdays\n"
+    "    - days (required): Number of days ahead to list birthdays for, in date order\n"
+    "  query\n"
+    "    - query (required): Terms that must all match, e.g.\n"
+    "      city:Berlin tag:client birthday:next30d has:email\n"
+    "      fields: name, tag, phone, country, city, zip, email, note,\n"
+    "      birthday (today, next<N>d),\n"
+    "      has (phone, email, address, note, birthday); a plain word matches names\n"
+    "      the query may follow the command; Tab completes names, tags, cities, domains\n"
+    "  find_by_location\n"
+    "    - country, city, zip code (optional): Location to list addresses for;\n"
+    "      shows counts per city, zip code or country\n"
+    "  export_map\n"
+    "    - format (required): GeoJSON points or a CSV of map links\n"
+    "    - file path (required): File to write the main address of every contact to\n"
+    "  find_nearby\n"
+    "    - near (required): Contact name or latitude,longitude to search around\n"
+    "    - radius (optional): Distance in km; without it, the 10 nearest contacts are shown\n"
+    "  merge_contacts\n"
+    "    - pair (required): Likely duplicates to merge (similar names, same phone or email)\n"
+    "    - contact to keep (required): The other contact's data is merged into it\n"
+    "  take_snapshot\n"
+    "    - Save a point-in-time copy of the book; unchanged contacts are stored only once\n"
+    "  diff_snapshots\n"
+    "    - snapshot (required): Snapshot to compare\n"
+    "    - with (required): A later snapshot or the current book\n"
+    "  set_compression\n"
+    "    - compression (required): none, zlib or lzma, used from the next save on\n"
+    "  set_storage_layout\n"
+    "    - layout (required): A single file, or shards that are saved and loaded separately\n"
+    "  set_encryption\n"
+    "    - passphrase (required): Encrypts the saved book; asked for when it is loaded\n"
+    "  undo\n"
+    "    - Revert the latest change (up to 100 changes are kept)\n"
+    "  redo\n"
+    "    - Repeat the latest change reverted with undo\n"
     "  exit\n"
     "    - Exit and save data\n")
@@ -1,19 +1,36 @@
+import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional, Callable
+from enum import Enum
+from typing import Iterator, List, Optional, Callable, Tuple
 
 import questionary
 
-from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.phone import Phone, normalize_phone
 from src.district_9_personal_assistant.note import Note
 from src.district_9_personal_assistant.email import Email
 from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.concurrency import ReadWriteLock
 from src.district_9_personal_assistant.field import BaseField
+from src.district_9_personal_assistant.history import History, Operation
 from src.district_9_personal_assistant.name import Name
 from src.district_9_personal_assistant.selection import Selection
 from src.district_9_personal_assistant.helpers.message import fail_message, success_message
 from src.district_9_personal_assistant.birthday import Birthday
 
 
+class ContactChange(Enum):
+    """
+    The part of a contact that changed, passed to contact listeners.
+    """
+    NAME = "name"
+    PHONES = "phones"
+    EMAILS = "emails"
+    ADDRESSES = "addresses"
+    NOTES = "notes"
+    BIRTHDAY = "birthday"
+
+
 @dataclass
 class Contact(Selection):
     """
@@ -25,6 +42,410 @@ class Contact(Selection):
     emails: List[Email] = field(default_factory=list)
     addresses: List[Address] = field(default_factory=list)
     birthday: Optional[Birthday] = None
+    _lock: ReadWriteLock = field(
+        default_factory=ReadWriteLock, init=False, repr=False, compare=False)
+    # The main item of each collection, kept in step with the items' is_main flags.
+    _main_phone: Optional[Phone] = field(default=None, init=False, repr=False, compare=False)
+    _main_email: Optional[Email] = field(default=None, init=False, repr=False, compare=False)
+    _main_address: Optional[Address] = field(
+        default=None, init=False, repr=False, compare=False)
+    # Identifies the contact across saves and processes, even when it is renamed.
+    _uid: str = field(
+        default_factory=lambda: uuid.uuid4().hex, init=False, repr=False, compare=False)
+    # Phone numbers and lowercased email addresses of the contact, for O(1) duplicate checks.
+    _phone_numbers: set = field(default_factory=set, init=False, repr=False, compare=False)
+    _email_addresses: set = field(default_factory=set, init=False, repr=False, compare=False)
+    # Set when the contact is removed from its address book.
+    _removed = False
+    # Bumped on every change of the contact or one of its fields.
+    _version = 0
+    # Callables notified after the contact changes, e.g. address book indexes.
+    _listeners: tuple = ()
+    # Undo/redo log of the address book the contact belongs to.
+    _history: Optional[History] = None
+
+    def __post_init__(self) -> None:
+        """
+        Build the phone and email uniqueness sets and the main items from the initial fields.
+        """
+        self._phone_numbers = {phone.number for phone in self.phones}
+        self._email_addresses = {email.address.lower() for email in self.emails}
+        for attr, items in (("_main_phone", self.phones), ("_main_email", self.emails),
+                            ("_main_address", self.addresses)):
+            if getattr(self, attr) is None:
+                setattr(self, attr, self._flagged_main(items))
+
+    def __getstate__(self) -> dict:
+        """
+        Leave the lock, listeners and history out of the pickled state.
+        """
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        state.pop("_listeners", None)
+        state.pop("_history", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the pickled state with a fresh lock.
+        Contacts saved before main items were tracked get them from the is_main flags,
+        and their uniqueness sets from their phones and emails. Contacts saved before
+        uids existed get one derived from their name, the same in every process.
+        """
+        self.__dict__.update(state)
+        self._lock = ReadWriteLock()
+        if "_uid" not in state:
+            self._uid = uuid.uuid5(uuid.NAMESPACE_OID, self.name.value.casefold()).hex
+        for attr in ("_main_phone", "_main_email", "_main_address"):
+            self.__dict__.setdefault(attr, None)
+        if "_phone_numbers" not in state or "_main_phone" not in state:
+            self.__post_init__()
+
+    @staticmethod
+    def _flagged_main(items: list) -> Optional[BaseField]:
+        """
+        Get the last item flagged as main, or None.
+        """
+        main = [item for item in items if getattr(item, "is_main", False)]
+        return main[-1] if main else None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Contact":
+        """
+        Create a contact from the output of to_dict.
+
+        Args:
+            data: Dictionary representation of a contact.
+
+        Returns:
+            Contact instance.
+        """
+        return cls(
+            name=Name(value=data["name"]),
+            phones=[Phone.from_dict(dict(p)) for p in data.get("phones", [])],
+            emails=[Email.from_dict(dict(e)) for e in data.get("emails", [])],
+            addresses=[Address.from_dict(a) for a in data.get("addresses", [])],
+            notes=[Note.from_dict(dict(n)) for n in data.get("notes", [])],
+            birthday=Birthday(value=data["birthday"]) if data.get("birthday") else None,
+        )
+
+    @property
+    def main_phone(self) -> Optional[Phone]:
+        """
+        The main phone, or None if no phone is marked as main.
+        """
+        return self._main_phone
+
+    @property
+    def main_email(self) -> Optional[Email]:
+        """
+        The main email, or None if no email is marked as main.
+        """
+        return self._main_email
+
+    @property
+    def main_address(self) -> Optional[Address]:
+        """
+        The main address, or None if no address is marked as main.
+        """
+        return self._main_address
+
+    def _set_main(self, attr: str, item: Optional[BaseField]) -> None:
+        """
+        Make an item the main one of its collection, clearing the flag of the previous one.
+        Call with the write lock held.
+
+        Args:
+            attr: Name of the pointer attribute, e.g. "_main_phone".
+            item: The new main item, or None to have no main item.
+        """
+        previous = getattr(self, attr)
+        if previous is not None and previous is not item:
+            previous.is_main = False
+        if item is not None:
+            item.is_main = True
+        setattr(self, attr, item)
+
+    def _forget_main(self, attr: str, item: BaseField) -> None:
+        """
+        Clear the main pointer if it refers to a removed item.
+        Call with the write lock held.
+        """
+        if getattr(self, attr) is item:
+            setattr(self, attr, None)
+
+    def _unique_key(self, field_instance: BaseField) -> tuple:
+        """
+        Get the uniqueness set a field belongs to and its key in it.
+
+        Returns:
+            Tuple (set, key), or (None, None) for fields that may repeat.
+        """
+        if isinstance(field_instance, Phone):
+            return self._phone_numbers, field_instance.number
+        if isinstance(field_instance, Email):
+            return self._email_addresses, field_instance.address.lower()
+        return None, None
+
+    def _claim(self, field_instance: BaseField) -> None:
+        """
+        Record a phone or email as used by the contact.
+        Call with the write lock held.
+
+        Raises:
+            ValueError: If the contact already has the same phone number or email address.
+        """
+        keys, key = self._unique_key(field_instance)
+        if keys is None:
+            return
+        if key in keys:
+            raise ValueError(f"{field_instance} already exists for contact {self.name.value}.")
+        keys.add(key)
+
+    def _release(self, field_instance: BaseField) -> None:
+        """
+        Forget a phone or email that was removed from the contact.
+        Call with the write lock held.
+        """
+        keys, key = self._unique_key(field_instance)
+        if keys is not None:
+            keys.discard(key)
+
+    def _update_field(self, field_instance: BaseField, new_data: dict) -> dict:
+        """
+        Update a field in place, keeping the uniqueness sets in step.
+        If the new values are invalid or duplicate, the old ones are restored.
+        Call with the write lock held.
+
+        Returns:
+            The old values of the attributes that changed.
+
+        Raises:
+            ValueError: If validation fails, nothing changed, or the new value is a duplicate.
+        """
+        self._release(field_instance)
+        try:
+            return field_instance.update(new_data, check=self._claim)
+        except (ValueError, TypeError):
+            self._claim(field_instance)
+            raise
+
+    def has_phone(self, number: str) -> bool:
+        """
+        Whether the contact has a phone number, in any formatting.
+        """
+        return normalize_phone(number) in self._phone_numbers
+
+    def has_email(self, address: str) -> bool:
+        """
+        Whether the contact has an email address, ignoring case.
+        """
+        return address.lower() in self._email_addresses
+
+    @property
+    def uid(self) -> str:
+        """
+        Unique id of the contact, kept across renames and saves.
+        """
+        return self._uid
+
+    @property
+    def version(self) -> int:
+        """
+        Number of changes made to the contact, kept across saves.
+        """
+        return self._version
+
+    def _touch(self) -> None:
+        """
+        Record that the contact changed.
+        Call with the write lock held.
+        """
+        self._version += 1
+
+    @property
+    def removed(self) -> bool:
+        """
+        Whether the contact has been removed from its address book.
+        """
+        return self._removed
+
+    def subscribe(self, listener: Callable[["Contact", ContactChange], None]) -> None:
+        """
+        Register a callable to be notified as ``listener(contact, change)``
+        after the contact changes.
+        """
+        if listener not in self._listeners:
+            self._listeners = self._listeners + (listener,)
+
+    def unsubscribe(self, listener: Callable[["Contact", ContactChange], None]) -> None:
+        """
+        Remove a previously registered listener.
+        """
+        self._listeners = tuple(lst for lst in self._listeners if lst != listener)
+
+    def notify(self, change: ContactChange) -> None:
+        """
+        Notify listeners that part of the contact changed.
+        """
+        for listener in self._listeners:
+            listener(self, change)
+
+    @contextmanager
+    def _change(self, change: ContactChange) -> Iterator[None]:
+        """
+        Hold the write lock for a mutation, then bump the version and notify listeners
+        once it succeeded. Listeners run after the lock is released.
+        """
+        with self._lock.write():
+            yield
+            self._touch()
+        self.notify(change)
+
+    @staticmethod
+    def _change_kind(field_instance: BaseField) -> ContactChange:
+        """
+        Map a field instance to the part of the contact it belongs to.
+
+        Raises:
+            TypeError: If the field type is not supported.
+        """
+        if isinstance(field_instance, Phone):
+            return ContactChange.PHONES
+        if isinstance(field_instance, Email):
+            return ContactChange.EMAILS
+        if isinstance(field_instance, Address):
+            return ContactChange.ADDRESSES
+        if isinstance(field_instance, Note):
+            return ContactChange.NOTES
+        raise TypeError("Unsupported field type")
+
+    def _collection(self, field_instance: BaseField) -> Tuple[list, Optional[str]]:
+        """
+        Get the list a field belongs to and the name of its main pointer.
+
+        Returns:
+            Tuple (items, main attribute), the attribute being None for notes.
+
+        Raises:
+            TypeError: If the field type is not supported.
+        """
+        if isinstance(field_instance, Phone):
+            return self.phones, "_main_phone"
+        if isinstance(field_instance, Email):
+            return self.emails, "_main_email"
+        if isinstance(field_instance, Address):
+            return self.addresses, "_main_address"
+        if isinstance(field_instance, Note):
+            return self.notes, None
+        raise TypeError("Unsupported field type")
+
+    def _record(self, description: str, undo: Callable[[], None],
+                redo: Callable[[], None]) -> None:
+        """
+        Add a change to the undo/redo log of the contact's address book, if any.
+        """
+        if self._history is not None:
+            self._history.record(Operation(description, undo, redo))
+
+    def _insert_item(self, field_instance: BaseField, index: Optional[int] = None) -> None:
+        """
+        Insert a field into its list (at the end by default) and record the inverse.
+        A field flagged as main becomes the main one.
+
+        Raises:
+            TypeError: If the field type is not supported.
+            ValueError: If the contact already has the same phone number or email address.
+        """
+        items, attr = self._collection(field_instance)
+        with self._change(self._change_kind(field_instance)):
+            previous_main = getattr(self, attr) if attr else None
+            self._claim(field_instance)
+            items.insert(len(items) if index is None else index, field_instance)
+            if attr is not None and field_instance.is_main:
+                self._set_main(attr, field_instance)
+        self._record(
+            f"add {field_instance.__class__.__name__.lower()} {field_instance}",
+            lambda: self._remove_item(field_instance, previous_main),
+            lambda: self._insert_item(field_instance, index),
+        )
+
+    def _remove_item(
+            self,
+            field_instance: BaseField,
+            new_main: Optional[BaseField] = None,
+    ) -> None:
+        """
+        Remove a field from its list and record the inverse.
+
+        Args:
+            field_instance: The field to remove.
+            new_main: Optional item to make the main one afterwards,
+                e.g. the one the removed field replaced.
+
+        Raises:
+            TypeError: If the field type is not supported.
+            ValueError: If the field does not belong to the contact.
+        """
+        items, attr = self._collection(field_instance)
+        with self._change(self._change_kind(field_instance)):
+            index = items.index(field_instance)
+            del items[index]
+            if attr is not None:
+                self._forget_main(attr, field_instance)
+                if new_main is not None and new_main in items:
+                    self._set_main(attr, new_main)
+            self._release(field_instance)
+        self._record(
+            f"delete {field_instance.__class__.__name__.lower()} {field_instance}",
+            lambda: self._insert_item(field_instance, index),
+            lambda: self._remove_item(field_instance),
+        )
+
+    def _edit_item(self, field_instance: BaseField, new_data: dict) -> None:
+        """
+        Update a field in place and record the old values of what changed.
+
+        Raises:
+            ValueError: If validation fails, nothing changed, or the new value is a duplicate.
+        """
+        with self._change(self._change_kind(field_instance)):
+            if isinstance(field_instance, Note):
+                old_values = field_instance.update_note(**new_data)
+            else:
+                old_values = self._update_field(field_instance, new_data)
+            new_values = {name: getattr(field_instance, name) for name in old_values}
+        self._record(
+            f"edit {field_instance.__class__.__name__.lower()} {field_instance}",
+            lambda: self._edit_item(field_instance, old_values),
+            lambda: self._edit_item(field_instance, new_values),
+        )
+
+    def _choose_main(self, attr: str, change: ContactChange, item: Optional[BaseField]) -> None:
+        """
+        Make an item the main one of its list (or clear the main item) and record the inverse.
+        """
+        with self._change(change):
+            previous = getattr(self, attr)
+            self._set_main(attr, item)
+        self._record(
+            f"set main {attr[len('_main_'):]} {item}",
+            lambda: self._choose_main(attr, change, previous),
+            lambda: self._choose_main(attr, change, item),
+        )
+
+    def replace_birthday(self, birthday: Optional[Birthday]) -> None:
+        """
+        Set, replace or clear the birthday and record the inverse.
+        """
+        with self._change(ContactChange.BIRTHDAY):
+            previous = self.birthday
+            self.birthday = birthday
+        self._record(
+            f"set birthday of {self.name.value} to {birthday.value if birthday else 'none'}",
+            lambda: self.replace_birthday(previous),
+            lambda: self.replace_birthday(birthday),
+        )
 
     def add_field(self, field_instance: BaseField) -> str:
         """
@@ -32,22 +453,38 @@ class Contact(Selection):
         Returns a success or failure message.
         """
         try:
-            if isinstance(field_instance, Phone):
-                if field_instance.is_main:
-                    self._reset_main_phone()
-                self.phones.append(field_instance)
-            elif isinstance(field_instance, Email):
-                self.emails.append(field_instance)
-            elif isinstance(field_instance, Address):
-                self.addresses.append(field_instance)
-            elif isinstance(field_instance, Note):
-                self.notes.append(field_instance)
-            else:
-                raise TypeError("Unsupported field type")
+            self._insert_item(field_instance)
             return success_message(f"{field_instance.__class__.__name__} added successfully.")
         except (ValueError, TypeError) as e:
             return fail_message(f"Error adding field: {e}")
 
+    def remove_field(self, field_instance: BaseField) -> None:
+        """
+        Removes a field (Phone, Email, Address, Note) from the contact.
+
+        Raises:
+            TypeError: If the field type is not supported.
+            ValueError: If the field does not belong to the contact.
+        """
+        self._remove_item(field_instance)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the contact and its fields to a dictionary for serialization.
+
+        Returns:
+            Dictionary representation of the contact.
+        """
+        with self._lock.read():
+            return {
+                "name": self.name.value,
+                "phones": [p.to_dict() for p in self.phones],
+                "emails": [e.to_dict() for e in self.emails],
+                "addresses": [a.to_dict() for a in self.addresses],
+                "notes": [n.to_dict() for n in self.notes],
+                "birthday": self.birthday.value if self.birthday else None,
+            }
+
     @staticmethod
     def _require_note(func: Callable) -> Callable:
         """
@@ -79,7 +516,7 @@ class Contact(Selection):
         Find a phone number interactively (with selection).
         """
         return self.select_item_interactively(
-            self.phones,
+            list(self.phones),
             lambda p: p.number,
             "Select phone:",
         )
@@ -91,7 +528,7 @@ class Contact(Selection):
         """
         new_number = questionary.text("New phone number:", default=phone.number).ask()
         try:
-            phone.update({"number": new_number})
+            self._edit_item(phone, {"number": normalize_phone(new_number)})
             return success_message(f"Phone number updated to {phone.number}.")
         except ValueError as e:
             return fail_message(f"Error: {e}")
@@ -101,7 +538,7 @@ class Contact(Selection):
         """
         Delete the selected phone.
         """
-        self.phones.remove(phone)
+        self._remove_item(phone)
         return success_message(f"Phone {phone.number} deleted from contact {self.name}.")
 
     def add_phone(self) -> str:
@@ -115,37 +552,29 @@ class Contact(Selection):
         is_main = questionary.confirm("Is this the main number?").ask()
         try:
             phone = Phone(number=phone_number, is_main=is_main)
-            if phone.is_main:
-                self._reset_main_phone()
-            self.phones.append(phone)
+            self._insert_item(phone)
             return success_message(f"Phone {phone.number} added to contact {self.name}.")
         except ValueError as e:
             return fail_message(f"Error adding phone: {e}")
 
-    def _reset_main_phone(self) -> None:
-        """
-        Reset the main phone flag for all phones.
-        """
-        for p in self.phones:
-            p.is_main = False
-
     @_require_phone
     def set_main_phone(self, phone: Phone) -> str:
         """
         Set a phone number as the main phone.
         """
-        self._reset_main_phone()
-        phone.is_main = True
+        self._choose_main("_main_phone", ContactChange.PHONES, phone)
         return success_message(f"Main number is set to: {phone.number}")
 
     def show_phones(self) -> str:
         """
         Show all phone numbers for the contact.
         """
-        if not self.phones:
+        with self._lock.read():
+            phones = list(self.phones)
+        if not phones:
             return fail_message("No phones found.")
         out = []
-        for p in self.phones:
+        for p in phones:
             label = "[main]" if p.is_main else ""
             out.append(f"{label} {p.number}".strip())
         return "; ".join(out)
@@ -168,7 +597,7 @@ class Contact(Selection):
         Find an email address interactively (with selection).
         """
         return self.select_item_interactively(
-            self.emails,
+            list(self.emails),
             lambda e: e.address,
             "Select email:",
         )
@@ -180,7 +609,7 @@ class Contact(Selection):
         """
         new_address = questionary.text("New email address:", default=email.address).ask()
         try:
-            email.update({"address": new_address})
+            self._edit_item(email, {"address": new_address})
             return success_message(f"Email updated to {email.address}.")
         except ValueError as e:
             return fail_message(f"Error: {e}")
@@ -190,7 +619,7 @@ class Contact(Selection):
         """
         Delete the selected email.
         """
-        self.emails.remove(email)
+        self._remove_item(email)
         return success_message(f"Email {email.address} deleted from contact {self.name}.")
 
     def add_email(self) -> str:
@@ -200,7 +629,7 @@ class Contact(Selection):
         email_address = questionary.text("Email address:").ask().lower()
         try:
             email = Email(address=email_address)
-            self.emails.append(email)
+            self._insert_item(email)
             return success_message(f"Email {email.address} added to contact {self.name}.")
         except ValueError as e:
             return fail_message(f"Error adding email: {e}")
@@ -209,28 +638,30 @@ class Contact(Selection):
         """
         Show all email addresses for the contact.
         """
-        if not self.emails:
+        with self._lock.read():
+            emails = list(self.emails)
+        if not emails:
             return fail_message("No emails found.")
-        return "; ".join(email.address for email in self.emails)
+        return "; ".join(email.address for email in emails)
 
     @_require_email
     def set_main_email(self, email: Email) -> str:
         """
         Set an email address as the main email for the contact.
         """
-        for e in self.emails:
-            e.is_main = False
-        email.is_main = True
+        self._choose_main("_main_email", ContactChange.EMAILS, email)
         return success_message(f"Main email set to {email.address} for contact {self.name}.")
 
     def show_notes(self) -> str:
         """
         Show all notes for the contact.
         """
-        if not self.notes:
+        with self._lock.read():
+            notes = list(self.notes)
+        if not notes:
             return fail_message("No notes available.")
         out = []
-        for note in self.notes:
+        for note in notes:
             out.append(f"\n{note}\n")
         return "All notes:\n".join(out)
 
@@ -243,7 +674,7 @@ class Contact(Selection):
         tags = questionary.text("Tags (comma separated):").ask()
         try:
             note = Note(content, title, tags)
-            self.notes.append(note)
+            self._insert_item(note)
             return success_message("Note added.")
         except ValueError as e:
             return fail_message(f"Error adding note: {e}")
@@ -258,7 +689,7 @@ class Contact(Selection):
         def display_note(note: Note) -> str:
             return note.title or note.content[:20]
         return self.select_item_interactively(
-            self.notes,
+            list(self.notes),
             display_note,
             "Select note:",
         )
@@ -275,7 +706,7 @@ class Contact(Selection):
                 "New tags (comma-separated):", default=note.tags_string).ask(),
         }
         try:
-            note.update_note(**new_data)
+            self._edit_item(note, new_data)
             return success_message("Note updated successfully.")
         except ValueError as e:
             return fail_message(f"Error: {e}")
@@ -285,7 +716,7 @@ class Contact(Selection):
         """
         Delete the selected note.
         """
-        self.notes.remove(note)
+        self._remove_item(note)
         return success_message("Note deleted.")
 
     def find_by_tag(self) -> str:
@@ -300,9 +731,10 @@ class Contact(Selection):
         elif not self.notes:
             return fail_message("No notes available.")
 
-        found_notes = [
-            note for note in self.notes if tag in [
-                t.lower() for t in note.get_tags_list()]]
+        with self._lock.read():
+            found_notes = [
+                note for note in self.notes if tag in [
+                    t.lower() for t in note.get_tags_list()]]
         if not found_notes:
             return fail_message("No notes found with this tag.")
         return "\n".join(f"{str(note)}\n" for note in found_notes)
@@ -325,7 +757,7 @@ class Contact(Selection):
         Find an address interactively (with selection).
         """
         return self.select_item_interactively(
-            self.addresses,
+            list(self.addresses),
             str,
             "Select address:",
         )
@@ -343,7 +775,7 @@ class Contact(Selection):
             "zip_code": questionary.text("New zip code:", default=address.zip_code).ask(),
         }
         try:
-            address.update(new_data)
+            self._edit_item(address, new_data)
             return success_message(f"Address updated to {address}.")
         except ValueError as e:
             return fail_message(f"Error: {e}")
@@ -353,7 +785,7 @@ class Contact(Selection):
         """
         Delete the selected address.
         """
-        self.addresses.remove(address)
+        self._remove_item(address)
         return success_message(f"Address '{address}' deleted from contact {self.name}.")
 
     def add_address(self) -> str:
@@ -371,7 +803,7 @@ class Contact(Selection):
                 street_address=street_address,
                 zip_code=zip_code
             )
-            self.addresses.append(address)
+            self._insert_item(address)
             return success_message(f"Address '{address}' added to contact {self.name}.")
         except ValueError as e:
             return fail_message(f"Error adding address: {e}")
@@ -380,18 +812,18 @@ class Contact(Selection):
         """
         Show all addresses for the contact.
         """
-        if not self.addresses:
+        with self._lock.read():
+            addresses = list(self.addresses)
+        if not addresses:
             return fail_message("No addresses found.")
-        return "; ".join(str(address) for address in self.addresses)
+        return "; ".join(str(address) for address in addresses)
 
     @_require_address
     def set_main_address(self, address: Address) -> str:
         """
         Set an address as the main address for the contact.
         """
-        for a in self.addresses:
-            a.is_main = False
-        address.is_main = True
+        self._choose_main("_main_address", ContactChange.ADDRESSES, address)
         return success_message(f"Main address set to {address} for contact {self.name}.")
 
     def add_birthday(self) -> str:
@@ -404,7 +836,7 @@ class Contact(Selection):
         ).ask()
         try:
             birthday_obj = Birthday(value=bday)
-            self.birthday = birthday_obj
+            self.replace_birthday(birthday_obj)
             return success_message(
                 f"Birthday set to {
                     birthday_obj.birthday.strftime(
@@ -432,6 +864,13 @@ class Contact(Selection):
         address.open_in_google_maps()
 
     def __str__(self) -> str:
+        with self._lock.read():
+            return self._format()
+
+    def _format(self) -> str:
+        """
+        Build the multi-line text representation of the contact.
+        """
         lines = [
             f"Contact: {self.name.value}",
             f"Phones: {', '.join([str(p) for p in self.phones]) if self.phones else 'No phones'}",
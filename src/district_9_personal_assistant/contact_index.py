@@ -0,0 +1,195 @@
+import bisect
+from typing import Callable, Dict, FrozenSet, Iterable, List
+
+from src.district_9_personal_assistant.contact import Contact, ContactChange
+from src.district_9_personal_assistant.locality_index import LocalityIndex
+
+KeysFunc = Callable[[Contact], Iterable[str]]
+
+
+def name_keys(contact: Contact) -> List[str]:
+    """
+    Index keys for a contact's name: the whole name and each word, casefolded.
+    """
+    name = contact.name.value.casefold()
+    return [name, *name.split()]
+
+
+def full_name_keys(contact: Contact) -> List[str]:
+    """
+    Index key for a contact's whole name, lowercased as AddressBook.get_contact compares it.
+    """
+    return [contact.name.value.lower()]
+
+
+def tag_keys(contact: Contact) -> List[str]:
+    """
+    Index keys for the tags of a contact's notes.
+    """
+    return [tag for note in contact.notes for tag in note.tags_list]
+
+
+def phone_keys(contact: Contact) -> List[str]:
+    """
+    Index keys for a contact's phone numbers (normalized, with the leading '+').
+    """
+    return [phone.number for phone in contact.phones]
+
+
+class KeyIndex:
+    """
+    Inverted index from string keys to the contacts having them.
+
+    Postings keep contacts in insertion order. The keys are also kept in a sorted
+    list for prefix lookups: sorted once when the index is built, then updated by
+    bisection as keys come and go.
+    """
+
+    def __init__(self, keys_func: KeysFunc, contacts: Iterable[Contact] = ()) -> None:
+        """
+        Args:
+            keys_func: Function returning the keys of a contact.
+            contacts: Contacts to index.
+        """
+        self._keys_func = keys_func
+        self._postings: Dict[str, Dict[int, Contact]] = {}
+        self._keys_by_contact: Dict[int, FrozenSet[str]] = {}
+        self._sorted_keys: List[str] = []
+        for contact in contacts:
+            self._index(contact)
+        self._sorted_keys = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._keys_by_contact)
+
+    def _index(self, contact: Contact) -> List[str]:
+        """
+        Update the postings of a contact, leaving the sorted keys alone.
+
+        Returns:
+            The keys that appeared, to add to the sorted keys.
+        """
+        with contact._lock.read():
+            new_keys = frozenset(self._keys_func(contact))
+        old_keys = self._keys_by_contact.get(id(contact), frozenset())
+        for key in old_keys - new_keys:
+            self._discard(key, contact)
+        added = []
+        for key in new_keys - old_keys:
+            postings = self._postings.setdefault(key, {})
+            if not postings:
+                added.append(key)
+            postings[id(contact)] = contact
+        if new_keys:
+            self._keys_by_contact[id(contact)] = new_keys
+        else:
+            self._keys_by_contact.pop(id(contact), None)
+        return added
+
+    def update(self, contact: Contact) -> None:
+        """
+        Add a contact, or re-index it after the indexed values changed.
+        """
+        for key in self._index(contact):
+            bisect.insort(self._sorted_keys, key)
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from the index. Unknown contacts are ignored.
+        """
+        for key in self._keys_by_contact.pop(id(contact), ()):
+            self._discard(key, contact)
+
+    def _discard(self, key: str, contact: Contact) -> None:
+        postings = self._postings.get(key)
+        if postings is None:
+            return
+        postings.pop(id(contact), None)
+        if not postings:
+            del self._postings[key]
+            idx = bisect.bisect_left(self._sorted_keys, key)
+            if idx < len(self._sorted_keys) and self._sorted_keys[idx] == key:
+                del self._sorted_keys[idx]
+
+    def _keys_with_prefix(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self._sorted_keys, prefix)
+        hi = bisect.bisect_left(self._sorted_keys, prefix + "\U0010ffff")
+        return self._sorted_keys[lo:hi]
+
+    def get(self, key: str) -> List[Contact]:
+        """
+        Get the contacts having exactly this key.
+        """
+        return list(self._postings.get(key, {}).values())
+
+    def count(self, key: str) -> int:
+        """
+        Count the contacts having exactly this key.
+        """
+        return len(self._postings.get(key, ()))
+
+    def prefix(self, prefix: str) -> List[Contact]:
+        """
+        Get the contacts having a key that starts with the prefix, each once.
+        """
+        found: Dict[int, Contact] = {}
+        for key in self._keys_with_prefix(prefix):
+            found.update(self._postings[key])
+        return list(found.values())
+
+    def prefix_count(self, prefix: str) -> int:
+        """
+        Upper bound of the number of contacts having a key with the prefix;
+        a contact is counted once per matching key.
+        """
+        return sum(len(self._postings[key]) for key in self._keys_with_prefix(prefix))
+
+
+class ContactIndexes:
+    """
+    Secondary indexes over an address book's contacts: whole names, name words,
+    note tags, phone numbers and address localities. Kept up to date from contact
+    change notifications.
+    """
+
+    def __init__(self, contacts: Iterable[Contact] = ()) -> None:
+        """
+        Args:
+            contacts: Contacts to index.
+        """
+        self.full_names = KeyIndex(full_name_keys)
+        self.names = KeyIndex(name_keys)
+        self.tags = KeyIndex(tag_keys)
+        self.phones = KeyIndex(phone_keys)
+        self.localities = LocalityIndex()
+        self._by_change = {
+            ContactChange.NAME: (self.full_names, self.names),
+            ContactChange.NOTES: (self.tags,),
+            ContactChange.PHONES: (self.phones,),
+            ContactChange.ADDRESSES: (self.localities,),
+        }
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact: Contact) -> None:
+        """
+        Index a new contact.
+        """
+        for indexes in self._by_change.values():
+            for index in indexes:
+                index.update(contact)
+
+    def update(self, contact: Contact, change: ContactChange) -> None:
+        """
+        Re-index the part of a contact that changed.
+        """
+        for index in self._by_change.get(change, ()):
+            index.update(contact)
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from all indexes.
+        """
+        for indexes in self._by_change.values():
+            for index in indexes:
+                index.remove(contact)
@@ -1,55 +1,303 @@
+import asyncio
+from datetime import datetime, time
+from typing import List, Optional
+
 import questionary
+from prompt_toolkit.patch_stdout import patch_stdout
 from src.district_9_personal_assistant.helpers.message import info_message
 
 
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.book_loader import BookLoader
 from src.district_9_personal_assistant.constants.commands import commands_info, Commands
+from src.district_9_personal_assistant.greetings import system_locale
 from src.district_9_personal_assistant.helpers.core_utils import (
     parse_input,
+    parse_arguments,
     get_commands_list_suggestions,
+    get_command_completer,
     get_command_handler,
+    handle_help,
+    ask_passphrase,
 )
 from src.district_9_personal_assistant.helpers.message import success_message, fail_message
+from src.district_9_personal_assistant.reminders import StdoutSink
 
+# Seconds between background saves of the async assistant.
+AUTOSAVE_INTERVAL = 60.0
+# Birthday reminders of the assistant fire at midnight, so the birthdays of the day
+# are shown at startup and again every midnight in sessions left open overnight.
+REMIND_AT = time(0, 0)
 
-def run_personal_assistant():
-    book = AddressBook.load_from_file()
-    print(info_message("Welcome to the Personal Assistant!"))
-    print(commands_info)
 
-    greetings_file = "src/district_9_personal_assistant/constants/greetings.txt"
-    birthdays_today = AddressBook.find_birthdays_this_day(book.contacts, greetings_file)
+def greet_birthdays(book: AddressBook) -> None:
+    """
+    Print today's birthdays and offer greetings for them, in the user's locale
+    unless a contact's note tags select another greetings section.
+
+    Args:
+        book: The loaded AddressBook instance.
+    """
+    contacts = book.snapshot_contacts()
+    birthdays_today = AddressBook.find_birthdays_this_day(contacts)
     if birthdays_today:
         print(success_message(f"\n🎉 Today's birthdays: {', '.join(birthdays_today.keys())}"))
+        AddressBook.offer_greetings(
+            [contact for contact in contacts if contact.name.value in birthdays_today],
+            locale=system_locale())
 
-    while True:
-        active_contact = book.get_active_contact()
-        commands_list = get_commands_list_suggestions(active_contact)
 
-        if active_contact is not None:
-            print(info_message(f"Working on the contact: {active_contact.name}"))
+def start_birthday_checks(book: AddressBook) -> None:
+    """
+    Greet today's birthdays, then start the book's reminders for the following days,
+    so a session left open overnight still announces them. Today's reminders count
+    as shown by the greeting.
 
-        user_input = questionary.autocomplete(
-            "Enter a command:",
-            choices=commands_list,
-            match_middle=True,
-        ).ask()
+    Args:
+        book: The loaded AddressBook instance.
+    """
+    greet_birthdays(book)
+    book.start_reminders(StdoutSink(), REMIND_AT, since=datetime.now())
 
-        command = parse_input(user_input)
-        if command is None:
-            print(fail_message("Invalid command input."))
-            continue
 
-        handler_map = get_command_handler(book)
-        handler = handler_map.get(command)
-        if handler is None:
-            print(fail_message("Unknown command. Type 'help' to see available commands."))
+def report_load_error(error: Exception) -> None:
+    """
+    Print why the address book could not be loaded, e.g. a corrupt or unreadable file.
+    """
+    print(fail_message(f"Could not load the address book: {error}"))
+
+
+def wait_for_book(loader: BookLoader) -> Optional[AddressBook]:
+    """
+    Wait for the address book to load, reporting a load error instead of raising it.
+
+    Args:
+        loader: The loader of the book.
+
+    Returns:
+        The loaded AddressBook, or None if it could not be loaded.
+    """
+    try:
+        return loader.wait()
+    except Exception as e:
+        report_load_error(e)
+        return None
+
+
+def run_personal_assistant(background_load: bool = False):
+    """
+    Run the interactive assistant loop.
+
+    Args:
+        background_load: If True, the prompt is shown immediately while the address book
+            is loaded in a background thread. Commands that need data wait for loading
+            to finish, and the birthday scan runs once the book is ready. Birthday
+            reminders then keep running for sessions left open past midnight.
+            If the book cannot be loaded, the error is reported and the assistant exits
+            without touching the saved file.
+    """
+    try:
+        passphrase = ask_passphrase()
+    except Exception as e:
+        report_load_error(e)
+        return
+    loader = BookLoader(lambda: AddressBook.load_from_file(passphrase)).start()
+    if not background_load and wait_for_book(loader) is None:
+        return
+    print(info_message("Welcome to the Personal Assistant!"))
+    print(commands_info)
+
+    birthdays_checked = False
+    try:
+        with patch_stdout(raw=True):
+            while True:
+                book = loader.book
+                if book is not None and not birthdays_checked:
+                    start_birthday_checks(book)
+                    birthdays_checked = True
+
+                active_contact = book.get_active_contact() if book is not None else None
+                commands_list = get_commands_list_suggestions(active_contact)
+
+                if active_contact is not None:
+                    print(info_message(f"Working on the contact: {active_contact.name}"))
+
+                user_input = questionary.autocomplete(
+                    "Enter a command:",
+                    choices=commands_list,
+                    completer=get_command_completer(lambda: loader.book, active_contact),
+                ).ask()
+
+                command = parse_input(user_input)
+                if command is None:
+                    print(fail_message("Invalid command input."))
+                    continue
+
+                if command == Commands.HELP.value:
+                    handle_help()
+                    continue
+
+                if book is None:
+                    if not loader.is_ready():
+                        print(info_message("Loading address book..."))
+                    book = wait_for_book(loader)
+                    if book is None:
+                        return
+                    if not birthdays_checked:
+                        start_birthday_checks(book)
+                        birthdays_checked = True
+
+                handler_map = get_command_handler(book, parse_arguments(user_input))
+                handler = handler_map.get(command)
+                if handler is None:
+                    print(fail_message("Unknown command. Type 'help' to see available commands."))
+                    continue
+
+                result = handler()
+
+                if result is not None:
+                    print(result)
+
+                if command == Commands.EXIT.value:
+                    break
+    finally:
+        book = loader.book
+        if book is not None:
+            book.stop_reminders()
+
+
+async def autosave_book(book: AddressBook, interval: float = AUTOSAVE_INTERVAL) -> None:
+    """
+    Save the book in the background whenever it changed, and rebuild the indexes
+    a merge with another terminal's changes dropped. Runs until cancelled.
+
+    Args:
+        book: The AddressBook instance to save.
+        interval: Seconds between checks.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await asyncio.to_thread(book.save_if_changed)
+        except (OSError, ValueError) as e:
+            print(fail_message(f"Autosave failed: {e}"))
             continue
+        if result is not None and result.merged:
+            await asyncio.to_thread(book.build_indexes)
+        if result is not None and result.conflicts:
+            names = ", ".join(result.conflicts)
+            print(fail_message(
+                f"Also changed in another terminal, this version was kept: {names}"))
+
+
+async def start_background_tasks(
+        book_task: "asyncio.Future[AddressBook]",
+        tasks: List[asyncio.Task],
+        autosave_interval: float = AUTOSAVE_INTERVAL,
+) -> None:
+    """
+    Once the book is loaded, start the background tasks: building the indexes,
+    autosaving and the birthday reminders. Reminders are emitted by the book's
+    scheduler thread without prompting, as the command prompt is running meanwhile.
+    If loading failed, nothing is started; the command loop reports the error.
+
+    Args:
+        book_task: Task loading the book.
+        tasks: List the started tasks are added to, to cancel them on exit.
+        autosave_interval: Seconds between background saves.
+    """
+    try:
+        book = await book_task
+    except Exception:
+        return
+    tasks.append(asyncio.create_task(asyncio.to_thread(book.build_indexes)))
+    tasks.append(asyncio.create_task(autosave_book(book, autosave_interval)))
+    await asyncio.to_thread(book.start_reminders, StdoutSink(), REMIND_AT)
+
+
+async def run_personal_assistant_async(autosave_interval: float = AUTOSAVE_INTERVAL) -> None:
+    """
+    Run the interactive assistant loop on an asyncio event loop.
+
+    The command prompt is awaited with questionary's async API, and command handlers
+    run in a worker thread, so loading, index building, autosaving and birthday
+    reminders keep running in the background while the user types. Their output
+    is printed above the prompt.
+
+    Args:
+        autosave_interval: Seconds between background saves of a changed book.
+    """
+    try:
+        passphrase = await asyncio.to_thread(ask_passphrase)
+    except Exception as e:
+        report_load_error(e)
+        return
+    book_task = asyncio.ensure_future(
+        asyncio.to_thread(AddressBook.load_from_file, passphrase))
+    tasks: List[asyncio.Task] = []
+    tasks.append(asyncio.create_task(
+        start_background_tasks(book_task, tasks, autosave_interval)))
+    print(info_message("Welcome to the Personal Assistant!"))
+    print(commands_info)
+
+    def loaded_book() -> Optional[AddressBook]:
+        if book_task.done() and book_task.exception() is None:
+            return book_task.result()
+        return None
+
+    book: Optional[AddressBook] = None
+    try:
+        with patch_stdout(raw=True):
+            while True:
+                if book is None:
+                    book = loaded_book()
+
+                active_contact = book.get_active_contact() if book is not None else None
+                commands_list = get_commands_list_suggestions(active_contact)
+
+                if active_contact is not None:
+                    print(info_message(f"Working on the contact: {active_contact.name}"))
+
+                user_input = await questionary.autocomplete(
+                    "Enter a command:",
+                    choices=commands_list,
+                    completer=get_command_completer(loaded_book, active_contact),
+                ).ask_async()
+
+                command = parse_input(user_input)
+                if command is None:
+                    print(fail_message("Invalid command input."))
+                    continue
+
+                if command == Commands.HELP.value:
+                    handle_help()
+                    continue
+
+                if book is None:
+                    if not book_task.done():
+                        print(info_message("Loading address book..."))
+                    try:
+                        book = await book_task
+                    except Exception as e:
+                        report_load_error(e)
+                        break
+
+                handler = get_command_handler(book, parse_arguments(user_input)).get(command)
+                if handler is None:
+                    print(fail_message("Unknown command. Type 'help' to see available commands."))
+                    continue
 
-        result = handler()
+                result = await asyncio.to_thread(handler)
 
-        if result is not None:
-            print(result)
+                if result is not None:
+                    print(result)
 
-        if command == Commands.EXIT.value:
-            break
+                if command == Commands.EXIT.value:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        book = loaded_book()
+        if book is not None:
+            await asyncio.to_thread(book.stop_reminders)
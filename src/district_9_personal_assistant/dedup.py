@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+from src.district_9_personal_assistant.contact import Contact
+
+# Blocks larger than this (a shared office number, a very common name part) are skipped:
+# comparing every pair in them would be quadratic and rarely finds real duplicates.
+MAX_BLOCK_SIZE = 50
+# Number of name-trigram blocks, smallest first, each contact is compared against.
+NAME_BLOCKING_KEYS = 3
+# Number of following contacts compared in name order (and reversed-name order),
+# which catches similar names whose trigrams are all too common to block on.
+NAME_WINDOW = 5
+DEFAULT_THRESHOLD = 0.7
+
+
+def name_trigrams(name: str) -> FrozenSet[str]:
+    """
+    Character trigrams of a casefolded name, padded so short names get trigrams too.
+    Word order and spacing do not matter.
+
+    Args:
+        name: The name to split.
+
+    Returns:
+        Set of trigrams.
+    """
+    words = sorted(name.casefold().split())
+    text = f"  {' '.join(words)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+@dataclass(frozen=True)
+class DuplicateCandidate:
+    """
+    Two contacts that probably describe the same person.
+    """
+    score: float
+    first: Contact
+    second: Contact
+    reasons: Tuple[str, ...]
+
+    def __str__(self) -> str:
+        return (f"{self.first.name.value} + {self.second.name.value} "
+                f"({self.score:.2f}: {', '.join(self.reasons)})")
+
+
+class _ContactKeys:
+    """
+    Normalized values of a contact used for blocking and scoring, computed once.
+    """
+    __slots__ = ("contact", "name", "trigrams", "phones", "emails")
+
+    def __init__(self, contact: Contact) -> None:
+        with contact._lock.read():
+            self.contact = contact
+            self.name = " ".join(sorted(contact.name.value.casefold().split()))
+            self.trigrams = name_trigrams(contact.name.value)
+            self.phones = frozenset(phone.number for phone in contact.phones)
+            self.emails = frozenset(email.address.lower() for email in contact.emails)
+
+
+def _block_pairs(blocks: Iterable[List[int]], pairs: Set[Tuple[int, int]]) -> None:
+    """
+    Add the index pairs within each block of acceptable size.
+    """
+    for block in blocks:
+        if len(block) < 2 or len(block) > MAX_BLOCK_SIZE:
+            continue
+        for i, first in enumerate(block):
+            for second in block[i + 1:]:
+                pairs.add((first, second))
+
+
+def _name_pairs(keys: List["_ContactKeys"], pairs: Set[Tuple[int, int]]) -> None:
+    """
+    Add the pairs of each contact with the contacts sharing one of its rarest name
+    trigrams. Only one side of a pair has to pick the shared trigram, so a typo
+    in the other name does not hide the pair. Neighbours in name order and in
+    reversed-name order are paired as well.
+    """
+    by_trigram: Dict[str, List[int]] = {}
+    for idx, contact_keys in enumerate(keys):
+        for trigram in contact_keys.trigrams:
+            by_trigram.setdefault(trigram, []).append(idx)
+    for idx, contact_keys in enumerate(keys):
+        blocks = sorted(
+            (block for block in map(by_trigram.__getitem__, contact_keys.trigrams)
+             if 1 < len(block) <= MAX_BLOCK_SIZE),
+            key=len,
+        )
+        for block in blocks[:NAME_BLOCKING_KEYS]:
+            for other in block:
+                if other != idx:
+                    pairs.add((idx, other) if idx < other else (other, idx))
+
+    for sort_key in (lambda idx: keys[idx].name, lambda idx: keys[idx].name[::-1]):
+        order = sorted(range(len(keys)), key=sort_key)
+        for pos, first in enumerate(order):
+            for second in order[pos + 1:pos + 1 + NAME_WINDOW]:
+                pairs.add((first, second) if first < second else (second, first))
+
+
+def score_pair(first: _ContactKeys, second: _ContactKeys) -> Tuple[float, Tuple[str, ...]]:
+    """
+    Score how likely two contacts are the same person, from 0 to 1.
+
+    Name similarity is the Jaccard index of the name trigrams. A shared phone or email
+    is strong evidence on its own, raised further by similar names.
+    """
+    union = len(first.trigrams | second.trigrams)
+    name_similarity = len(first.trigrams & second.trigrams) / union if union else 0.0
+    same_phone = bool(first.phones & second.phones)
+    same_email = bool(first.emails & second.emails)
+    reasons = []
+    if same_phone:
+        reasons.append("same phone")
+    if same_email:
+        reasons.append("same email")
+    if name_similarity >= 0.5:
+        reasons.append(f"similar name {name_similarity:.0%}")
+    score = name_similarity
+    if same_phone or same_email:
+        score = 0.6 + 0.4 * name_similarity
+        if same_phone and same_email:
+            score = min(1.0, score + 0.2)
+    return score, tuple(reasons)
+
+
+def find_duplicates(
+        contacts: Sequence[Contact],
+        threshold: float = DEFAULT_THRESHOLD,
+) -> List[DuplicateCandidate]:
+    """
+    Find pairs of contacts that are probably duplicates.
+
+    Instead of comparing every pair, contacts are grouped into blocks sharing a
+    normalized phone number or a lowercased email, and each contact is compared with
+    the contacts sharing one of its rarest name trigrams and with its neighbours in
+    name order. The work grows roughly linearly with the number of contacts.
+
+    Args:
+        contacts: Contacts to check.
+        threshold: Minimum score for a pair to be reported.
+
+    Returns:
+        List of DuplicateCandidate entries, best first.
+    """
+    keys = [_ContactKeys(contact) for contact in contacts]
+    pairs: Set[Tuple[int, int]] = set()
+
+    by_phone: Dict[str, List[int]] = {}
+    by_email: Dict[str, List[int]] = {}
+    for idx, contact_keys in enumerate(keys):
+        for phone in contact_keys.phones:
+            by_phone.setdefault(phone, []).append(idx)
+        for email in contact_keys.emails:
+            by_email.setdefault(email, []).append(idx)
+    _block_pairs(by_phone.values(), pairs)
+    _block_pairs(by_email.values(), pairs)
+
+    _name_pairs(keys, pairs)
+
+    result = []
+    for first, second in pairs:
+        score, reasons = score_pair(keys[first], keys[second])
+        if score >= threshold:
+            result.append(DuplicateCandidate(
+                score, keys[first].contact, keys[second].contact, reasons))
+    result.sort(key=lambda candidate: (-candidate.score, candidate.first.name.value))
+    return result
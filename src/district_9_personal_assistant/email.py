@@ -9,6 +9,7 @@ class Email(BaseField):
     """Email class with validation for contact information."""
 
     address: str
+    is_main: bool = False
 
     def validate(self) -> None:
         """
@@ -0,0 +1,213 @@
+import functools
+import hashlib
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Optional
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # Encryption is unavailable without the cryptography package.
+    AESGCM = None
+    InvalidTag = None
+
+# Plaintext bytes sealed together; each chunk is authenticated on its own, so a file is
+# encrypted and decrypted as a stream.
+CHUNK_SIZE = 64 * 1024
+SALT_SIZE = 16
+KEY_SIZE = 32
+NONCE_PREFIX_SIZE = 8
+# Each chunk is stored as its final flag and sealed length, then the sealed bytes.
+_CHUNK_HEADER = struct.Struct(">?I")
+_CHECK_TEXT = b"district-9 address book"
+
+
+def encryption_available() -> bool:
+    """
+    Whether the cryptography package needed for encryption is installed.
+    """
+    return AESGCM is not None
+
+
+@functools.lru_cache(maxsize=8)
+def _derive(passphrase: str, salt: bytes) -> bytes:
+    """
+    Derive a key from a passphrase with scrypt. Deliberately slow, so the result is
+    cached: a key is derived once per session however many files it opens.
+    """
+    return hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, n=2 ** 14, r=8, p=1,
+                          dklen=KEY_SIZE)
+
+
+@dataclass(frozen=True)
+class BookKey:
+    """
+    Key encrypting a book, with the salt it was derived with; the salt is stored in the
+    clear in the file headers, so the key can be derived again from the passphrase.
+    """
+    salt: bytes
+    key: bytes = field(repr=False)
+
+    @classmethod
+    def derive(cls, passphrase: str, salt: Optional[bytes] = None) -> "BookKey":
+        """
+        Derive the key of a passphrase.
+
+        Args:
+            passphrase: The passphrase.
+            salt: Salt of an encrypted book, or None for a new random one.
+
+        Raises:
+            RuntimeError: If the cryptography package is not installed.
+        """
+        if not encryption_available():
+            raise RuntimeError("Encryption needs the cryptography package: "
+                               "pip3 install -r requirements.txt")
+        salt = salt or os.urandom(SALT_SIZE)
+        return cls(salt, _derive(passphrase, salt))
+
+    def check_value(self) -> bytes:
+        """
+        Get a short token sealed with the key, stored in file headers so a wrong
+        passphrase is detected before reading the book.
+        """
+        nonce = os.urandom(12)
+        return nonce + AESGCM(self.key).encrypt(nonce, _CHECK_TEXT, self.salt)
+
+    def verify(self, check_value: bytes) -> bool:
+        """
+        Whether a token from check_value was sealed with this key.
+        """
+        try:
+            AESGCM(self.key).decrypt(check_value[:12], check_value[12:], self.salt)
+        except InvalidTag:
+            return False
+        return True
+
+
+class Encryptor:
+    """
+    Streaming AES-GCM encryptor with the interface of zlib's compress objects.
+
+    Data is sealed in chunks of CHUNK_SIZE bytes under nonces made of a random
+    per-file prefix and the chunk number. The last chunk is flagged in its
+    associated data, so a truncated file fails to decrypt instead of losing its end.
+    """
+
+    def __init__(self, key: BookKey) -> None:
+        self._aead = AESGCM(key.key)
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self._counter = 0
+        self._buffer = bytearray()
+        self._started = False
+
+    def _start(self) -> bytes:
+        if self._started:
+            return b""
+        self._started = True
+        return self._prefix
+
+    def _seal(self, chunk: bytes, final: bool) -> bytes:
+        nonce = self._prefix + self._counter.to_bytes(4, "big")
+        self._counter += 1
+        sealed = self._aead.encrypt(nonce, chunk, bytes([final]))
+        return _CHUNK_HEADER.pack(final, len(sealed)) + sealed
+
+    def compress(self, data: bytes) -> bytes:
+        self._buffer += data
+        output = [self._start()]
+        while len(self._buffer) > CHUNK_SIZE:
+            output.append(self._seal(bytes(self._buffer[:CHUNK_SIZE]), final=False))
+            del self._buffer[:CHUNK_SIZE]
+        return b"".join(output)
+
+    def flush(self) -> bytes:
+        output = self._start() + self._seal(bytes(self._buffer), final=True)
+        self._buffer.clear()
+        return output
+
+
+class Decryptor:
+    """
+    Streaming decryptor of Encryptor's output, with the interface of lzma's
+    decompressor objects.
+    """
+
+    def __init__(self, key: BookKey) -> None:
+        self._aead = AESGCM(key.key)
+        self._prefix: Optional[bytes] = None
+        self._counter = 0
+        self._input = bytearray()
+        self._output = bytearray()
+        self._final = False
+
+    def _next_chunk_size(self) -> Optional[int]:
+        """
+        Size of the next stored chunk if it is complete in the input, else None.
+        """
+        if self._prefix is None:
+            return NONCE_PREFIX_SIZE if len(self._input) >= NONCE_PREFIX_SIZE else None
+        if len(self._input) < _CHUNK_HEADER.size:
+            return None
+        size = _CHUNK_HEADER.size + _CHUNK_HEADER.unpack_from(self._input)[1]
+        return size if len(self._input) >= size else None
+
+    def _open_next(self) -> bool:
+        size = self._next_chunk_size()
+        if size is None:
+            return False
+        if self._prefix is None:
+            self._prefix = bytes(self._input[:size])
+        else:
+            final, _ = _CHUNK_HEADER.unpack_from(self._input)
+            nonce = self._prefix + self._counter.to_bytes(4, "big")
+            self._counter += 1
+            try:
+                self._output += self._aead.decrypt(
+                    nonce, bytes(self._input[_CHUNK_HEADER.size:size]), bytes([final]))
+            except InvalidTag:
+                raise ValueError("Wrong passphrase or damaged book file.") from None
+            self._final = final
+        del self._input[:size]
+        return True
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._output and not self._final and self._next_chunk_size() is None
+
+    @property
+    def eof(self) -> bool:
+        return self._final and not self._output
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        self._input += data
+        while not self._final and (max_length < 0 or len(self._output) < max_length):
+            if not self._open_next():
+                break
+        size = len(self._output) if max_length < 0 else max_length
+        output = bytes(self._output[:size])
+        del self._output[:size]
+        return output
+
+
+def seal(key: BookKey, data: bytes) -> bytes:
+    """
+    Encrypt a small piece of data at once, e.g. a snapshot object.
+    """
+    encryptor = Encryptor(key)
+    return encryptor.compress(data) + encryptor.flush()
+
+
+def unseal(key: BookKey, data: bytes) -> bytes:
+    """
+    Decrypt data encrypted with seal.
+
+    Raises:
+        ValueError: If the key is wrong or the data is damaged or truncated.
+    """
+    decryptor = Decryptor(key)
+    data = decryptor.decompress(data)
+    if not decryptor.eof:
+        raise ValueError("Damaged file: it ends early.")
+    return data
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass, fields, is_dataclass
+from typing import Callable, Optional
 
 
 @dataclass
@@ -8,6 +9,21 @@ class BaseField(ABC):
     Base class for all contact fields to provide a common interface
     for validation, serialization, and representation.
     """
+    # Bumped on every successful update; not a dataclass field, so it is not serialized.
+    _version = 0
+
+    @property
+    def version(self) -> int:
+        """
+        Number of times the field has been updated.
+        """
+        return self._version
+
+    def _touch(self) -> None:
+        """
+        Record that the field changed.
+        """
+        self._version += 1
 
     def __post_init__(self) -> None:
         """
@@ -39,12 +55,21 @@ class BaseField(ABC):
         """Abstract method to create a field instance from a dictionary."""
         raise NotImplementedError
 
-    def update(self, new_data: dict) -> None:
+    def update(
+            self,
+            new_data: dict,
+            check: Optional[Callable[["BaseField"], None]] = None,
+    ) -> dict:
         """
         Updates the fields of the instance with new data and re-validates.
 
         Args:
             new_data: Dictionary with new field values.
+            check: Optional callable run on the updated instance after validation,
+                e.g. a uniqueness check; if it raises, the old values are restored too.
+
+        Returns:
+            The old values of the fields that changed, e.g. to revert the update.
 
         Raises:
             TypeError: If not a dataclass instance.
@@ -71,10 +96,14 @@ class BaseField(ABC):
         # If validation fails, restore the old values
         try:
             self.validate()
+            if check is not None:
+                check(self)
         except (ValueError, TypeError):
             for field_name, old_value in old_values.items():
                 setattr(self, field_name, old_value)
             raise
+        self._touch()
+        return {name: old for name, old in old_values.items() if old != new_data[name]}
 
     def __str__(self) -> str:
         return self.__class__.__name__
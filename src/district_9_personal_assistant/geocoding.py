@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from src.district_9_personal_assistant.address import Address, normalize_locality
+from src.district_9_personal_assistant.contact import Contact
+
+DEFAULT_GAZETTEER_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "constants", "gazetteer.csv"
+)
+
+
+@dataclass(frozen=True)
+class Coordinates:
+    """
+    A point on the map, in decimal degrees.
+    """
+    latitude: float
+    longitude: float
+
+    def __str__(self) -> str:
+        return f"{self.latitude},{self.longitude}"
+
+
+class Geocoder:
+    """
+    Resolves addresses to coordinates from a local gazetteer file, without network access.
+
+    The gazetteer is a CSV file with the columns ``country, city, zip_code, latitude,
+    longitude``; an empty zip code gives the city centre. An address resolves to its
+    zip code entry if there is one, otherwise to its city. Results, including misses,
+    are cached by ``full_address()``; the file and the cache are reloaded only when
+    the file's modification time or size changes.
+    """
+
+    def __init__(self, filepath: str = DEFAULT_GAZETTEER_FILE) -> None:
+        """
+        Args:
+            filepath: Path to the gazetteer CSV file.
+        """
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._places: Dict[Tuple[str, str, str], Coordinates] = {}
+        self._cache: Dict[str, Optional[Coordinates]] = {}
+
+    def _reload_if_changed(self) -> None:
+        """
+        Re-read the gazetteer if it changed since the last load.
+        Raises OSError if the file cannot be read.
+        """
+        stat = os.stat(self.filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature == self._signature:
+                return
+            places = {}
+            with open(self.filepath, "r", encoding="utf-8", newline="") as file:
+                for row in csv.DictReader(file):
+                    try:
+                        point = Coordinates(float(row["latitude"]), float(row["longitude"]))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    key = normalize_locality(
+                        row.get("country") or "", row.get("city") or "", row.get("zip_code") or "")
+                    places[key] = point
+            self._places = places
+            self._cache = {}
+            self._signature = signature
+
+    def __len__(self) -> int:
+        self._reload_if_changed()
+        return len(self._places)
+
+    def locate(self, address: Address) -> Optional[Coordinates]:
+        """
+        Get the coordinates of an address.
+
+        Args:
+            address: The address to resolve.
+
+        Returns:
+            Coordinates, or None if the gazetteer knows neither its zip code nor its city.
+        """
+        self._reload_if_changed()
+        key = address.full_address()
+        if key in self._cache:
+            return self._cache[key]
+        country, city, zip_code = address.locality
+        point = self._places.get((country, city, zip_code)) or self._places.get(
+            (country, city, ""))
+        self._cache[key] = point
+        return point
+
+    def cache_size(self) -> int:
+        """
+        Number of addresses resolved so far.
+        """
+        return len(self._cache)
+
+
+_geocoders: Dict[str, Geocoder] = {}
+_geocoders_lock = threading.Lock()
+
+
+def get_geocoder(filepath: str = DEFAULT_GAZETTEER_FILE) -> Geocoder:
+    """
+    Get the shared geocoder for a gazetteer file, creating it on first use.
+
+    Args:
+        filepath: Path to the gazetteer CSV file.
+
+    Returns:
+        Geocoder instance.
+    """
+    key = os.path.abspath(filepath)
+    with _geocoders_lock:
+        geocoder = _geocoders.get(key)
+        if geocoder is None:
+            geocoder = Geocoder(key)
+            _geocoders[key] = geocoder
+        return geocoder
+
+
+def main_address(contact: Contact) -> Optional[Address]:
+    """
+    Get the main address of a contact, or its first address if none is marked as main.
+    """
+    with contact._lock.read():
+        return contact.main_address or (contact.addresses[0] if contact.addresses else None)
+
+
+def map_links(
+        contacts: Iterable[Contact],
+        geocoder: Optional[Geocoder] = None,
+) -> List[Tuple[Contact, Address, str]]:
+    """
+    Build a map link for the main address of every contact that has one.
+    Located addresses link to their coordinates, others to the address text.
+
+    Args:
+        contacts: Contacts to build links for.
+        geocoder: Geocoder to use (defaults to the shared one).
+
+    Returns:
+        List of (contact, address, url) tuples.
+    """
+    geocoder = geocoder or get_geocoder()
+    result = []
+    for contact in contacts:
+        address = main_address(contact)
+        if address is not None:
+            point = geocoder.locate(address)
+            coordinates = (point.latitude, point.longitude) if point else None
+            result.append((contact, address, address.map_url(coordinates)))
+    return result
+
+
+def write_map_links(
+        contacts: Iterable[Contact],
+        file: TextIO,
+        geocoder: Optional[Geocoder] = None,
+) -> int:
+    """
+    Write map links for the contacts' main addresses as CSV (name, address, url).
+
+    Returns:
+        Number of links written.
+    """
+    writer = csv.writer(file)
+    writer.writerow(["name", "address", "url"])
+    links = map_links(contacts, geocoder)
+    for contact, address, url in links:
+        writer.writerow([contact.name.value, address.full_address(), url])
+    return len(links)
+
+
+def write_geojson(
+        contacts: Iterable[Contact],
+        file: TextIO,
+        geocoder: Optional[Geocoder] = None,
+) -> Tuple[int, int]:
+    """
+    Stream a GeoJSON FeatureCollection with a point per contact's main address.
+    Features are written one at a time, so large books are not built in memory.
+
+    Args:
+        contacts: Contacts to export.
+        file: Text file to write to.
+        geocoder: Geocoder to use (defaults to the shared one).
+
+    Returns:
+        Tuple (exported, not located); contacts without addresses are not counted.
+    """
+    geocoder = geocoder or get_geocoder()
+    exported = missing = 0
+    file.write('{"type": "FeatureCollection", "features": [')
+    for contact in contacts:
+        address = main_address(contact)
+        if address is None:
+            continue
+        point = geocoder.locate(address)
+        if point is None:
+            missing += 1
+            continue
+        feature = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [point.longitude, point.latitude]},
+            "properties": {"name": contact.name.value, "address": address.full_address()},
+        }
+        file.write(("\n" if not exported else ",\n") + json.dumps(feature, ensure_ascii=False))
+        exported += 1
+    file.write("\n]}\n")
+    return exported, missing
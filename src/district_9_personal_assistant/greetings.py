@@ -0,0 +1,201 @@
+import locale
+import os
+import random
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_GREETINGS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "constants", "greetings.txt"
+)
+DEFAULT_TAG = "default"
+NAME_PLACEHOLDER = "{name}"
+SECTION_PATTERN = re.compile(r"^\[(?P<tag>[\w\-]+)\]$")
+
+
+@dataclass(frozen=True)
+class GreetingTemplate:
+    """
+    A greeting template pre-split around the {name} placeholder,
+    so formatting is a single join.
+    """
+    parts: Tuple[str, ...]
+
+    @classmethod
+    def parse(cls, text: str) -> "GreetingTemplate":
+        """
+        Create a template from a raw greeting line.
+
+        Args:
+            text: Greeting text containing zero or more {name} placeholders.
+
+        Returns:
+            GreetingTemplate instance.
+        """
+        return cls(parts=tuple(text.split(NAME_PLACEHOLDER)))
+
+    def format(self, name: str) -> str:
+        """
+        Substitute the contact name into the template.
+
+        Args:
+            name: Name to insert.
+
+        Returns:
+            Formatted greeting.
+        """
+        return name.join(self.parts)
+
+    def __str__(self) -> str:
+        return NAME_PLACEHOLDER.join(self.parts)
+
+
+class GreetingsProvider:
+    """
+    Loads greeting templates from a file once and serves them from memory.
+
+    The file holds one greeting per line. Lines like ``[uk]`` or ``[formal]`` start a
+    new section, so large libraries can be split by locale or tag; lines before the
+    first section belong to the ``default`` tag. The file is re-read only when its
+    modification time or size changes.
+    """
+
+    def __init__(self, filepath: str = DEFAULT_GREETINGS_FILE) -> None:
+        """
+        Args:
+            filepath: Path to the greetings template file.
+        """
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._by_tag: Dict[str, List[GreetingTemplate]] = {}
+        self._all: List[GreetingTemplate] = []
+
+    def _reload_if_changed(self) -> None:
+        """
+        Re-read and index the file if it changed since the last load.
+        Raises OSError if the file cannot be read.
+        """
+        stat = os.stat(self.filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature == self._signature:
+                return
+            by_tag: Dict[str, List[GreetingTemplate]] = {}
+            all_templates: List[GreetingTemplate] = []
+            tag = DEFAULT_TAG
+            with open(self.filepath, "r", encoding="utf-8") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    section = SECTION_PATTERN.match(line)
+                    if section:
+                        tag = section.group("tag").lower()
+                        continue
+                    template = GreetingTemplate.parse(line)
+                    by_tag.setdefault(tag, []).append(template)
+                    all_templates.append(template)
+            self._by_tag = by_tag
+            self._all = all_templates
+            self._signature = signature
+
+    def tags(self) -> List[str]:
+        """
+        Get the available tags (locales or categories).
+
+        Returns:
+            List of tag names in file order.
+        """
+        self._reload_if_changed()
+        return list(self._by_tag)
+
+    def templates(self, tag: Optional[str] = None) -> List[GreetingTemplate]:
+        """
+        Get templates for a tag, or all templates if no tag is given.
+        An unknown tag falls back to all templates.
+
+        Args:
+            tag: Optional tag or locale to select.
+
+        Returns:
+            List of GreetingTemplate instances.
+        """
+        self._reload_if_changed()
+        if tag is not None and tag.lower() in self._by_tag:
+            return self._by_tag[tag.lower()]
+        return self._all
+
+    def select_tag(self, tags: Iterable[str], default: Optional[str] = None) -> Optional[str]:
+        """
+        Choose the section to greet from: the first of the tags that has one
+        (e.g. a contact's note tags), else the default (e.g. the user's locale).
+
+        Args:
+            tags: Candidate tags in order of preference.
+            default: Tag used if none of the tags has a section.
+
+        Returns:
+            The chosen tag, or None if neither has a section.
+        """
+        self._reload_if_changed()
+        for tag in (*tags, default):
+            if tag is not None and tag.lower() in self._by_tag:
+                return tag.lower()
+        return None
+
+    def suggest(self, name: str, count: int = 3, tag: Optional[str] = None) -> List[str]:
+        """
+        Pick random greetings and substitute the name.
+
+        Args:
+            name: Contact name to insert into the greetings.
+            count: Maximum number of greetings to return.
+            tag: Optional tag or locale to select templates from.
+
+        Returns:
+            List of formatted greetings (empty if there are no templates).
+        """
+        templates = self.templates(tag)
+        return [
+            template.format(name)
+            for template in random.sample(templates, min(count, len(templates)))
+        ]
+
+
+def system_locale() -> Optional[str]:
+    """
+    Get the language of the user's locale, e.g. ``uk`` for ``uk_UA``,
+    to greet in by default.
+
+    Returns:
+        Lowercase language code, or None if the locale is not set.
+    """
+    language = locale.getlocale()[0]
+    if not language:
+        return None
+    return language.split("_")[0].lower()
+
+
+_providers: Dict[str, GreetingsProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_greetings_provider(filepath: str = DEFAULT_GREETINGS_FILE) -> GreetingsProvider:
+    """
+    Get the shared provider for a greetings file, creating it on first use.
+
+    Args:
+        filepath: Path to the greetings template file.
+
+    Returns:
+        GreetingsProvider instance.
+    """
+    key = os.path.abspath(filepath)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = GreetingsProvider(key)
+            _providers[key] = provider
+        return provider
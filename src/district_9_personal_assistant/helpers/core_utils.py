@@ -1,11 +1,17 @@
+from typing import Callable, Optional
+
+import questionary
+from prompt_toolkit.completion import Completer, ThreadedCompleter
+
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.completion import CommandCompleter
 from src.district_9_personal_assistant.constants.commands import (
     book_commands_list,
     contact_commands_list,
     Commands,
     commands_info,
 )
-from src.district_9_personal_assistant.helpers.message import success_message
+from src.district_9_personal_assistant.helpers.message import fail_message, success_message
 
 
 def parse_input(user_input: str) -> str | None:
@@ -28,6 +34,23 @@ def parse_input(user_input: str) -> str | None:
     return cmd
 
 
+def parse_arguments(user_input: str) -> str:
+    """
+    Parses the arguments typed after the command, e.g. a completed contact name.
+
+    Args:
+        user_input: The raw input string from the user.
+
+    Returns:
+        The text after the command with surrounding whitespace removed,
+        or an empty string if there is none.
+    """
+    if not isinstance(user_input, str):
+        return ""
+    parts = user_input.strip().split(maxsplit=1)
+    return parts[1].strip() if len(parts) > 1 else ""
+
+
 def get_commands_list_suggestions(active_contact) -> list:
     """
     Get the list of command suggestions based on whether a contact is active.
@@ -44,6 +67,30 @@ def get_commands_list_suggestions(active_contact) -> list:
         return contact_commands_list
 
 
+def get_command_completer(
+        get_book: Callable[[], Optional[AddressBook]],
+        active_contact,
+) -> Completer:
+    """
+    Get the completer of the command prompt: command names, then contact names,
+    tags, cities and email domains from the book's completion index. It runs in
+    a worker thread, so typing never waits for the index to be built.
+
+    Args:
+        get_book: Returns the address book, or None while it is still loading.
+        active_contact: The currently active contact or None.
+
+    Returns:
+        A prompt_toolkit completer.
+    """
+    def get_index():
+        book = get_book()
+        return book.get_completion_index() if book is not None else None
+
+    return ThreadedCompleter(
+        CommandCompleter(get_commands_list_suggestions(active_contact), get_index))
+
+
 def handle_help() -> None:
     """
     Print the commands info/help to the console.
@@ -51,23 +98,101 @@ def handle_help() -> None:
     print(f"{commands_info}\n")
 
 
+def ask_passphrase() -> Optional[str]:
+    """
+    Ask for the passphrase of the saved address book until it is right,
+    if the book is encrypted.
+
+    Returns:
+        The passphrase, or None if the book is not encrypted.
+
+    Raises:
+        SystemExit: If no passphrase is entered.
+    """
+    if not AddressBook.is_encrypted():
+        return None
+    while True:
+        passphrase = questionary.password("The address book is encrypted. Passphrase:").ask()
+        if not passphrase:
+            raise SystemExit(fail_message("No passphrase entered."))
+        if AddressBook.check_passphrase(passphrase):
+            return passphrase
+        print(fail_message("Wrong passphrase."))
+
+
+def ask_changed_passphrase() -> Optional[str]:
+    """
+    Ask for the passphrase another terminal encrypted the saved address book with,
+    until it is right.
+
+    Returns:
+        The passphrase, or None if none is entered.
+    """
+    while True:
+        passphrase = questionary.password(
+            "The address book was encrypted in another terminal. Passphrase:").ask()
+        if not passphrase:
+            return None
+        if AddressBook.check_passphrase(passphrase):
+            return passphrase
+        print(fail_message("Wrong passphrase."))
+
+
+def save_book(book: AddressBook, prefix: str) -> str:
+    """
+    Save the address book if it changed and describe the outcome, warning about
+    contacts that were also changed by another terminal in the meantime.
+    If another terminal encrypted the book with a new passphrase, it is asked for;
+    if the book still cannot be saved, its changes are written to a recovery copy.
+
+    Args:
+        book: The AddressBook instance to save.
+        prefix: Start of the message, e.g. "Exit.".
+
+    Returns:
+        Colored message.
+    """
+    passphrase = None
+    if book.dirty and book.needs_passphrase_to_save():
+        passphrase = ask_changed_passphrase()
+    try:
+        result = book.save_if_changed(passphrase)
+    except (OSError, ValueError) as e:
+        try:
+            path = book.save_recovery_copy()
+        except OSError as copy_error:
+            return fail_message(
+                f"{prefix} Could not save the book: {e} "
+                f"Could not write a recovery copy either: {copy_error}")
+        return fail_message(
+            f"{prefix} Could not save the book: {e} The changes were written to {path}.")
+    if result is None:
+        return success_message(f"{prefix} No changes to save.")
+    message = success_message(f"{prefix} Data saved.")
+    if result.conflicts:
+        names = ", ".join(result.conflicts)
+        message += "\n" + fail_message(
+            f"Also changed in another terminal, this version was kept: {names}")
+    return message
+
+
 def handle_exit(book: AddressBook) -> None:
     """
-    Save the address book and print exit message.
+    Save the address book if it changed and print exit message.
 
     Args:
         book: The AddressBook instance to save.
     """
-    book.save_to_file()
-    print(success_message("Exit. Data saved."))
+    print(save_book(book, "Exit."))
 
 
-def get_command_handler(book: AddressBook) -> dict:
+def get_command_handler(book: AddressBook, args: str = "") -> dict:
     """
     Get a mapping of command strings to handler functions for the current context.
 
     Args:
         book: The AddressBook instance.
+        args: Arguments typed after the command, passed to the commands taking one.
 
     Returns:
         Dictionary mapping command strings to handler functions.
@@ -77,11 +202,24 @@ def get_command_handler(book: AddressBook) -> dict:
         return {
             Commands.ADD_CONTACT.value: book.add_contact,
             Commands.FIND_CONTACT.value: book.find_contact,
-            Commands.SELECT_ACTIVE_CONTACT.value: book.select_active_contact,
+            Commands.SELECT_ACTIVE_CONTACT.value: lambda: book.select_active_contact(args),
             Commands.EDIT_CONTACT.value: book.edit_contact,
             Commands.DELETE_CONTACT.value: book.delete_contact,
             Commands.SHOW_CONTACTS.value: book.show_contacts,
             Commands.FIND_BIRTHDAYS_THIS_WEEK.value: book.show_birthdays_this_week,
+            Commands.FIND_UPCOMING_BIRTHDAYS.value: book.show_upcoming_birthdays,
+            Commands.QUERY.value: lambda: book.query_contacts(args),
+            Commands.FIND_BY_LOCATION.value: book.find_by_location,
+            Commands.EXPORT_MAP.value: book.export_map,
+            Commands.FIND_NEARBY.value: book.find_nearby_contacts,
+            Commands.MERGE_CONTACTS.value: book.merge_contacts,
+            Commands.TAKE_SNAPSHOT.value: book.take_snapshot,
+            Commands.DIFF_SNAPSHOTS.value: book.diff_snapshots,
+            Commands.SET_COMPRESSION.value: book.set_compression,
+            Commands.SET_STORAGE_LAYOUT.value: book.set_storage_layout,
+            Commands.SET_ENCRYPTION.value: book.set_encryption,
+            Commands.UNDO.value: book.undo,
+            Commands.REDO.value: book.redo,
             Commands.EXIT.value: lambda: handle_exit(book),
             Commands.HELP.value: handle_help,
         }
@@ -117,6 +255,8 @@ def get_command_handler(book: AddressBook) -> dict:
         Commands.ADD_BIRTHDAY.value: book.add_birthday,
         Commands.SHOW_BIRTHDAY.value: book.show_birthday,
         # other commands
+        Commands.UNDO.value: book.undo,
+        Commands.REDO.value: book.redo,
         Commands.EXIT.value: lambda: handle_exit(book),
         Commands.HELP.value: handle_help,
         Commands.BACK_TO_BOOK.value: book.back_to_book,
@@ -0,0 +1,170 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, Iterator, List, Optional, Tuple
+
+DEFAULT_HISTORY_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class Operation:
+    """
+    A recorded change with the callables that revert and repeat it.
+    """
+    description: str
+    undo: Callable[[], None]
+    redo: Callable[[], None]
+
+
+class History:
+    """
+    Undo/redo log of the changes made to an address book.
+
+    Operations hold their own inverse, built from what the change touched (e.g. the old
+    values of the edited attributes), so undoing or redoing costs as much as the change
+    itself. Both stacks are ring buffers of ``limit`` entries: the oldest operations are
+    dropped first. A new operation clears the redo stack. Changes made while an
+    operation is undone or redone are not recorded.
+
+    Each owner, e.g. each session of a shared book, has its own pair of stacks and
+    undoes and redoes only its own operations.
+    """
+
+    def __init__(
+            self,
+            limit: int = DEFAULT_HISTORY_LIMIT,
+            owner: Callable[[], Hashable] = lambda: None,
+    ) -> None:
+        """
+        Args:
+            limit: Maximum number of operations kept for undo, and for redo, per owner.
+            owner: Returns the owner of the changes made in the calling context.
+        """
+        self._limit = limit
+        self._owner = owner
+        self._logs: Dict[Hashable, Tuple[Deque[Operation], Deque[Operation]]] = {}
+        self._lock = threading.RLock()
+        self._replaying = False
+        self._group: Optional[List[Operation]] = None
+
+    def _log(self) -> Tuple[Deque[Operation], Deque[Operation]]:
+        """
+        Get the undo and redo stacks of the current owner. Call with the lock held.
+        """
+        owner = self._owner()
+        log = self._logs.get(owner)
+        if log is None:
+            log = self._logs[owner] = (deque(maxlen=self._limit), deque(maxlen=self._limit))
+        return log
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._log()[0])
+
+    def forget(self, owner: Hashable) -> None:
+        """
+        Drop the operations of an owner, e.g. a session that ended.
+        """
+        with self._lock:
+            self._logs.pop(owner, None)
+
+    def record(self, operation: Operation) -> None:
+        """
+        Record a change that was just made, in the log of the current owner.
+        """
+        with self._lock:
+            if self._replaying:
+                return
+            if self._group is not None:
+                self._group.append(operation)
+                return
+            undo, redo = self._log()
+            undo.append(operation)
+            redo.clear()
+
+    @contextmanager
+    def group(self, description: str) -> Iterator[None]:
+        """
+        Record the changes made inside the block as a single operation,
+        e.g. all the steps of a merge. Nested groups join the outer one.
+        """
+        with self._lock:
+            if self._group is not None:
+                yield
+                return
+            self._group = operations = []
+            try:
+                yield
+            finally:
+                self._group = None
+            if operations:
+                def undo() -> None:
+                    for operation in reversed(operations):
+                        operation.undo()
+
+                def redo() -> None:
+                    for operation in operations:
+                        operation.redo()
+                self.record(Operation(description, undo, redo))
+
+    def _replay(self, undo: bool) -> str:
+        """
+        Revert or repeat the latest operation of the current owner's undo or redo stack
+        and move it to the other one.
+        """
+        with self._lock:
+            undo_stack, redo_stack = self._log()
+            source, target = (undo_stack, redo_stack) if undo else (redo_stack, undo_stack)
+            operation = source.pop()
+            self._replaying = True
+            try:
+                (operation.undo if undo else operation.redo)()
+            except (ValueError, TypeError):
+                source.append(operation)
+                raise
+            finally:
+                self._replaying = False
+            target.append(operation)
+            return operation.description
+
+    def can_undo(self) -> bool:
+        """
+        Whether there is an operation to undo.
+        """
+        with self._lock:
+            return bool(self._log()[0])
+
+    def can_redo(self) -> bool:
+        """
+        Whether there is an operation to redo.
+        """
+        with self._lock:
+            return bool(self._log()[1])
+
+    def undo(self) -> str:
+        """
+        Revert the latest operation of the current owner.
+
+        Returns:
+            Description of the reverted operation.
+
+        Raises:
+            IndexError: If there is nothing to undo.
+            ValueError: If the operation can no longer be reverted, e.g. a restored
+                contact name is taken; the operation stays in the log.
+        """
+        return self._replay(undo=True)
+
+    def redo(self) -> str:
+        """
+        Repeat the latest reverted operation of the current owner.
+
+        Returns:
+            Description of the repeated operation.
+
+        Raises:
+            IndexError: If there is nothing to redo.
+            ValueError: If the operation can no longer be repeated.
+        """
+        return self._replay(undo=False)
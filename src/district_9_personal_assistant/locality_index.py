@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.district_9_personal_assistant.address import Address, normalize_locality
+from src.district_9_personal_assistant.contact import Contact
+
+# A region is a (country,), (country, city) or (country, city, zip_code) tuple.
+Region = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RegionCount:
+    """
+    Number of contacts and addresses in a region.
+    """
+    contacts: int
+    addresses: int
+
+
+class LocalityIndex:
+    """
+    Hierarchical index of addresses: country -> city -> zip code -> addresses.
+
+    Every level keeps its contact and address counts up to date, so counts per region
+    are read from the index instead of scanning contacts. A contact is re-indexed from
+    its current addresses on every update, which costs O(addresses of the contact).
+    """
+
+    def __init__(self, contacts: Iterable[Contact] = ()) -> None:
+        """
+        Args:
+            contacts: Contacts to index.
+        """
+        # Region -> names of its sub-regions; the root () lists the countries.
+        self._children: Dict[Region, Dict[str, None]] = {}
+        # Full (country, city, zip) region -> address id -> (contact, address).
+        self._leaves: Dict[Region, Dict[int, Tuple[Contact, Address]]] = {}
+        # Region -> contact id -> number of the contact's addresses in the region.
+        self._contact_refs: Dict[Region, Dict[int, int]] = {}
+        self._address_counts: Dict[Region, int] = {}
+        # (level, name) -> regions with that name at that level, e.g. (2, "10115").
+        self._by_name: Dict[Tuple[int, str], Dict[Region, None]] = {}
+        self._entries: Dict[int, List[Tuple[Region, Address]]] = {}
+        for contact in contacts:
+            self.update(contact)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, contact: Contact) -> None:
+        """
+        Add a contact, or re-index it after its addresses changed.
+        """
+        self.remove(contact)
+        with contact._lock.read():
+            entries = [(address.locality, address) for address in contact.addresses]
+        if not entries:
+            return
+        self._entries[id(contact)] = entries
+        for leaf, address in entries:
+            self._leaves.setdefault(leaf, {})[id(address)] = (contact, address)
+            for depth in range(1, len(leaf) + 1):
+                region = leaf[:depth]
+                refs = self._contact_refs.setdefault(region, {})
+                refs[id(contact)] = refs.get(id(contact), 0) + 1
+                self._address_counts[region] = self._address_counts.get(region, 0) + 1
+                self._children.setdefault(region[:-1], {})[region[-1]] = None
+                self._by_name.setdefault((depth - 1, region[-1]), {})[region] = None
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from the index. Unknown contacts are ignored.
+        """
+        for leaf, address in self._entries.pop(id(contact), ()):
+            leaf_entries = self._leaves[leaf]
+            leaf_entries.pop(id(address), None)
+            if not leaf_entries:
+                del self._leaves[leaf]
+            for depth in range(len(leaf), 0, -1):
+                region = leaf[:depth]
+                refs = self._contact_refs[region]
+                refs[id(contact)] -= 1
+                if not refs[id(contact)]:
+                    del refs[id(contact)]
+                self._address_counts[region] -= 1
+                if not self._address_counts[region]:
+                    self._drop_region(region)
+
+    def _drop_region(self, region: Region) -> None:
+        del self._address_counts[region]
+        del self._contact_refs[region]
+        self._children.pop(region, None)
+        siblings = self._children[region[:-1]]
+        del siblings[region[-1]]
+        if not siblings:
+            del self._children[region[:-1]]
+        same_name = self._by_name[(len(region) - 1, region[-1])]
+        del same_name[region]
+        if not same_name:
+            del self._by_name[(len(region) - 1, region[-1])]
+
+    def _regions(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> List[Region]:
+        """
+        Find the regions matching the given parts; missing parts match anything.
+        Looks up the most specific given part by name, so a zip code or city
+        alone does not walk all countries.
+        """
+        parts = normalize_locality(country or "", city or "", zip_code or "")
+        given = [level for level, part in enumerate(parts) if part]
+        if not given:
+            return [()]
+        deepest = given[-1]
+        return [
+            region for region in self._by_name.get((deepest, parts[deepest]), ())
+            if all(region[level] == parts[level] for level in given)
+        ]
+
+    def _iter_leaves(self, region: Region) -> Iterator[Region]:
+        if len(region) == 3:
+            if region in self._leaves:
+                yield region
+            return
+        for child in self._children.get(region, ()):
+            yield from self._iter_leaves(region + (child,))
+
+    def find(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> List[Tuple[Contact, Address]]:
+        """
+        Find the addresses in a location, e.g. ``find(city="Kyiv")`` or ``find(zip_code="10115")``.
+        Values are normalized like Address fields, so case does not matter.
+
+        Args:
+            country: Country name.
+            city: City name.
+            zip_code: Zip code.
+
+        Returns:
+            List of (contact, address) pairs, grouped by country, city and zip code.
+        """
+        return [
+            entry
+            for region in self._regions(country, city, zip_code)
+            for leaf in self._iter_leaves(region)
+            for entry in self._leaves[leaf].values()
+        ]
+
+    def contacts(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> List[Contact]:
+        """
+        Find the contacts with at least one address in a location, each once.
+        """
+        found: Dict[int, Contact] = {}
+        for contact, _ in self.find(country, city, zip_code):
+            found.setdefault(id(contact), contact)
+        return list(found.values())
+
+    def count(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+            zip_code: Optional[str] = None,
+    ) -> RegionCount:
+        """
+        Count the contacts and addresses in a location, from the index counters.
+        """
+        regions = self._regions(country, city, zip_code)
+        if regions == [()]:
+            return RegionCount(len(self._entries), sum(
+                self._address_counts[(name,)] for name in self._children.get((), ())))
+        contact_ids = set()
+        addresses = 0
+        for region in regions:
+            contact_ids.update(self._contact_refs[region])
+            addresses += self._address_counts[region]
+        return RegionCount(len(contact_ids), addresses)
+
+    def regions(
+            self,
+            country: Optional[str] = None,
+            city: Optional[str] = None,
+    ) -> Dict[str, RegionCount]:
+        """
+        Get the counts per sub-region of a location: per country when nothing is given,
+        per city of a country, or per zip code of a city.
+
+        Returns:
+            Dictionary mapping sub-region names to counts, sorted by name.
+        """
+        contact_ids: Dict[str, set] = {}
+        addresses: Dict[str, int] = {}
+        for region in self._regions(country, city):
+            for name in self._children.get(region, ()):
+                child = region + (name,)
+                contact_ids.setdefault(name, set()).update(self._contact_refs[child])
+                addresses[name] = addresses.get(name, 0) + self._address_counts[child]
+        return {
+            name: RegionCount(len(contact_ids[name]), addresses[name])
+            for name in sorted(addresses)
+        }
@@ -52,7 +52,7 @@ class Note(BaseField):
         content: str = "",
         tags_string: Optional[str] = "",
         title: Optional[str] = ""
-    ) -> None:
+    ) -> dict:
         """
         Update the note's content, title, and tags.
 
@@ -60,12 +60,19 @@ class Note(BaseField):
             content: New content for the note.
             tags_string: New tags string.
             title: New title for the note.
+
+        Returns:
+            The old content, title and tags string, e.g. to revert the update.
         """
+        old_values = {"content": self.content, "title": self.title,
+                      "tags_string": self.tags_string}
         self.content = content
         self.title = title
         self.tags_string = tags_string
         self.tags_list.clear()
         self.add_tags(tags_string)
+        self._touch()
+        return old_values
 
     def get_tags_list(self) -> List[str]:
         """
@@ -89,6 +96,8 @@ class Note(BaseField):
         """
         if 'creation_date' in data and isinstance(data['creation_date'], str):
             data['creation_date'] = datetime.fromisoformat(data['creation_date'])
+        # Tags are rebuilt from tags_string.
+        data.pop('tags_list', None)
         return cls(**data)
 
     def to_dict(self) -> dict:
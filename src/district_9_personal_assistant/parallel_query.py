@@ -0,0 +1,229 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.phone import normalize_phone
+
+# Books smaller than this are scanned in-process; starting workers would cost more.
+PARALLEL_THRESHOLD = 50_000
+
+
+class ContactPredicate(ABC):
+    """
+    A picklable test on a contact, so it can be sent to worker processes.
+    Combine predicates with ``&`` and ``|``.
+    """
+
+    @abstractmethod
+    def __call__(self, contact: Contact) -> bool:
+        pass
+
+    def __and__(self, other: "ContactPredicate") -> "ContactPredicate":
+        return AllOf((self, other))
+
+    def __or__(self, other: "ContactPredicate") -> "ContactPredicate":
+        return AnyOf((self, other))
+
+
+@dataclass(frozen=True)
+class AllOf(ContactPredicate):
+    """Matches contacts that satisfy every predicate."""
+    predicates: Tuple[ContactPredicate, ...]
+
+    def __call__(self, contact: Contact) -> bool:
+        return all(predicate(contact) for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class AnyOf(ContactPredicate):
+    """Matches contacts that satisfy at least one predicate."""
+    predicates: Tuple[ContactPredicate, ...]
+
+    def __call__(self, contact: Contact) -> bool:
+        return any(predicate(contact) for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class NameContains(ContactPredicate):
+    """Matches contacts whose name contains the text (case-insensitive)."""
+    text: str
+
+    def __call__(self, contact: Contact) -> bool:
+        return self.text.casefold() in contact.name.value.casefold()
+
+
+@dataclass(frozen=True)
+class NoteContains(ContactPredicate):
+    """Matches contacts with a note whose title or content contains the text."""
+    text: str
+
+    def __call__(self, contact: Contact) -> bool:
+        text = self.text.casefold()
+        return any(
+            text in note.content.casefold() or text in (note.title or "").casefold()
+            for note in contact.notes
+        )
+
+
+@dataclass(frozen=True)
+class HasTag(ContactPredicate):
+    """Matches contacts with a note carrying the tag."""
+    tag: str
+
+    def __call__(self, contact: Contact) -> bool:
+        tag = self.tag.strip().lower()
+        return any(tag in note.tags_list for note in contact.notes)
+
+
+@dataclass(frozen=True)
+class PhoneContains(ContactPredicate):
+    """Matches contacts with a phone number containing the digits."""
+    digits: str
+
+    def __call__(self, contact: Contact) -> bool:
+        digits = normalize_phone(self.digits).lstrip("+")
+        return any(digits in phone.number for phone in contact.phones)
+
+
+@dataclass(frozen=True)
+class EmailContains(ContactPredicate):
+    """Matches contacts with an email address containing the text (e.g. a domain)."""
+    text: str
+
+    def __call__(self, contact: Contact) -> bool:
+        text = self.text.lower()
+        return any(text in email.address.lower() for email in contact.emails)
+
+
+@dataclass(frozen=True)
+class AddressContains(ContactPredicate):
+    """Matches contacts with an address containing the text (case-insensitive)."""
+    text: str
+
+    def __call__(self, contact: Contact) -> bool:
+        text = self.text.casefold()
+        return any(text in address.full_address().casefold() for address in contact.addresses)
+
+
+_worker_contacts: Sequence[Contact] = ()
+
+
+def _init_worker(contacts: Sequence[Contact]) -> None:
+    """
+    Store the read-only snapshot in the worker process once, at start-up.
+    """
+    global _worker_contacts
+    _worker_contacts = contacts
+
+
+def _scan_partition(predicate: ContactPredicate, start: int, stop: int) -> List[int]:
+    """
+    Return the snapshot indices in [start, stop) matching the predicate.
+    """
+    return [
+        idx for idx in range(start, stop) if predicate(_worker_contacts[idx])
+    ]
+
+
+class ParallelQueryExecutor:
+    """
+    Runs predicate scans over a snapshot of contacts in a pool of worker processes.
+
+    The snapshot is sent to each worker once, when the pool starts; every query then
+    ships only the predicate and a partition range, and the matching indices are merged
+    back in book order. Small snapshots are scanned in-process.
+    Use as a context manager, or call ``close()`` when done.
+    """
+
+    def __init__(
+            self,
+            contacts: Sequence[Contact],
+            workers: Optional[int] = None,
+            threshold: int = PARALLEL_THRESHOLD,
+    ) -> None:
+        """
+        Args:
+            contacts: Contacts to query; the list is copied, so later book changes
+                are not seen until a new executor is created.
+            workers: Number of worker processes (defaults to the CPU count).
+            threshold: Minimum number of contacts for the scan to run in parallel.
+        """
+        self.contacts = list(contacts)
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParallelQueryExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.contacts,),
+            )
+        return self._pool
+
+    def _partitions(self) -> List[Tuple[int, int]]:
+        """
+        Split the snapshot into a few ranges per worker, for load balancing.
+        """
+        total = len(self.contacts)
+        count = max(1, min(total, self.workers * 4))
+        size = -(-total // count)
+        return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+    def find_indices(self, predicate: ContactPredicate) -> List[int]:
+        """
+        Find the snapshot positions of contacts matching the predicate.
+
+        Args:
+            predicate: The test to apply.
+
+        Returns:
+            Sorted list of indices into ``self.contacts``.
+        """
+        if len(self.contacts) < self.threshold or self.workers == 1:
+            return [idx for idx, contact in enumerate(self.contacts) if predicate(contact)]
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_scan_partition, predicate, start, stop)
+            for start, stop in self._partitions()
+        ]
+        result = []
+        for future in futures:
+            result.extend(future.result())
+        return result
+
+    def search(self, predicate: ContactPredicate) -> List[Contact]:
+        """
+        Find contacts matching the predicate, in book order.
+
+        Args:
+            predicate: The test to apply.
+
+        Returns:
+            List of matching contacts from the snapshot.
+        """
+        return [self.contacts[idx] for idx in self.find_indices(predicate)]
+
+    def count(self, predicate: ContactPredicate) -> int:
+        """
+        Count contacts matching the predicate.
+        """
+        return len(self.find_indices(predicate))
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
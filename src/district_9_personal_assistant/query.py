@@ -0,0 +1,327 @@
+import re
+import shlex
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.district_9_personal_assistant.address import normalize_locality
+from src.district_9_personal_assistant.birthday_index import BirthdayIndex
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.contact_index import ContactIndexes, name_keys
+from src.district_9_personal_assistant.parallel_query import (
+    AllOf,
+    ContactPredicate,
+    EmailContains,
+    HasTag,
+    NoteContains,
+)
+from src.district_9_personal_assistant.phone import normalize_phone
+
+NEXT_DAYS_PATTERN = re.compile(r"^next(\d+)d$")
+# Fields usable with "has:", mapped to the contact attribute holding their values.
+HAS_FIELDS = {
+    "phone": "phones",
+    "email": "emails",
+    "address": "addresses",
+    "note": "notes",
+    "birthday": "birthday",
+}
+
+
+@dataclass(frozen=True)
+class NamePrefix(ContactPredicate):
+    """Matches contacts whose name, or a word of it, starts with the prefix."""
+    prefix: str
+
+    def __call__(self, contact: Contact) -> bool:
+        prefix = self.prefix.casefold()
+        return any(key.startswith(prefix) for key in name_keys(contact))
+
+
+@dataclass(frozen=True)
+class PhonePrefix(ContactPredicate):
+    """Matches contacts with a phone number starting with the given digits."""
+    prefix: str
+
+    def __call__(self, contact: Contact) -> bool:
+        prefix = normalize_phone(self.prefix)
+        return any(phone.number.startswith(prefix) for phone in contact.phones)
+
+
+@dataclass(frozen=True)
+class CountryIs(ContactPredicate):
+    """Matches contacts with an address in the country (case-insensitive)."""
+    country: str
+
+    def __call__(self, contact: Contact) -> bool:
+        country = normalize_locality(country=self.country)[0]
+        return any(address.country == country for address in contact.addresses)
+
+
+@dataclass(frozen=True)
+class CityIs(ContactPredicate):
+    """Matches contacts with an address in the city (case-insensitive)."""
+    city: str
+
+    def __call__(self, contact: Contact) -> bool:
+        city = normalize_locality(city=self.city)[1]
+        return any(address.city == city for address in contact.addresses)
+
+
+@dataclass(frozen=True)
+class ZipIs(ContactPredicate):
+    """Matches contacts with an address with the zip code (case-insensitive)."""
+    zip_code: str
+
+    def __call__(self, contact: Contact) -> bool:
+        zip_code = normalize_locality(zip_code=self.zip_code)[2]
+        return any(address.zip_code == zip_code for address in contact.addresses)
+
+
+@dataclass(frozen=True)
+class HasField(ContactPredicate):
+    """Matches contacts that have at least one value of a field (see HAS_FIELDS)."""
+    field: str
+
+    def __call__(self, contact: Contact) -> bool:
+        if self.field == "birthday":
+            return bool(contact.birthday and contact.birthday.birthday)
+        return bool(getattr(contact, HAS_FIELDS[self.field]))
+
+
+@dataclass(frozen=True)
+class BirthdayWithin(ContactPredicate):
+    """Matches contacts whose next birthday is at most ``days`` days after ``start``."""
+    start: date
+    days: int
+
+    def __call__(self, contact: Contact) -> bool:
+        if not (contact.birthday and contact.birthday.birthday):
+            return False
+        end = self.start + timedelta(days=self.days)
+        return contact.birthday.next_occurrence(self.start) <= end
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    """
+    One ``field:value`` condition of a query.
+    """
+    field: str
+    value: str
+    predicate: ContactPredicate
+
+    def __str__(self) -> str:
+        return f"{self.field}:{self.value}"
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    A parsed query: contacts must match every term.
+    """
+    terms: Tuple[QueryTerm, ...]
+
+    @property
+    def predicate(self) -> ContactPredicate:
+        """
+        The whole query as one picklable predicate, e.g. for ParallelQueryExecutor.
+        """
+        return AllOf(tuple(term.predicate for term in self.terms))
+
+    def __str__(self) -> str:
+        return " ".join(str(term) for term in self.terms)
+
+
+def _parse_birthday(value: str, today: date) -> ContactPredicate:
+    if value == "today":
+        return BirthdayWithin(today, 0)
+    match = NEXT_DAYS_PATTERN.match(value)
+    if match is None:
+        raise ValueError("birthday: expects 'today' or 'next<N>d', e.g. birthday:next30d.")
+    return BirthdayWithin(today, int(match.group(1)))
+
+
+def _parse_has(value: str, today: date) -> ContactPredicate:
+    if value not in HAS_FIELDS:
+        raise ValueError(f"has: expects one of {', '.join(HAS_FIELDS)}.")
+    return HasField(value)
+
+
+def _parse_phone(value: str, today: date) -> ContactPredicate:
+    if not normalize_phone(value).lstrip("+").isdigit():
+        raise ValueError("phone: expects digits, e.g. phone:+4930.")
+    return PhonePrefix(value)
+
+
+TERM_PARSERS: Dict[str, Callable[[str, date], ContactPredicate]] = {
+    "name": lambda value, today: NamePrefix(value),
+    "tag": lambda value, today: HasTag(value),
+    "phone": _parse_phone,
+    "country": lambda value, today: CountryIs(value),
+    "city": lambda value, today: CityIs(value),
+    "zip": lambda value, today: ZipIs(value),
+    "email": lambda value, today: EmailContains(value),
+    "note": lambda value, today: NoteContains(value),
+    "birthday": _parse_birthday,
+    "has": _parse_has,
+}
+
+
+def parse_query(text: str, today: Optional[date] = None) -> Query:
+    """
+    Parse a query such as ``city:Berlin tag:client birthday:next30d has:email``.
+
+    Terms are separated by spaces and all of them must match. A word without a field
+    is a name prefix. Values with spaces can be quoted: ``city:"New York"``.
+
+    Args:
+        text: The query text.
+        today: Reference date for birthday terms (defaults to today).
+
+    Returns:
+        The parsed Query.
+
+    Raises:
+        ValueError: If the query is empty, malformed or uses an unknown field.
+    """
+    today = today or date.today()
+    terms = []
+    for token in shlex.split(text or ""):
+        field_name, sep, value = token.partition(":")
+        if not sep:
+            field_name, value = "name", token
+        field_name = field_name.lower()
+        value = value.strip()
+        parser = TERM_PARSERS.get(field_name)
+        if parser is None:
+            raise ValueError(
+                f"Unknown field '{field_name}'. Use one of: {', '.join(TERM_PARSERS)}.")
+        if not value:
+            raise ValueError(f"No value given for '{field_name}:'.")
+        if field_name in ("has", "birthday"):
+            value = value.lower()
+        terms.append(QueryTerm(field_name, value, parser(value, today)))
+    if not terms:
+        raise ValueError("Empty query.")
+    return Query(tuple(terms))
+
+
+def _birthday_candidates(predicate: BirthdayWithin, index: BirthdayIndex) -> List[Contact]:
+    found: Dict[int, Contact] = {}
+    end = predicate.start + timedelta(days=predicate.days)
+    for upcoming in index.iter_range(predicate.start, end):
+        found.setdefault(id(upcoming.contact), upcoming.contact)
+    return list(found.values())
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    How a query is run: the term answered by an index (the driver), if any,
+    and the terms checked on each candidate.
+    """
+    query: Query
+    driver: Optional[QueryTerm]
+    estimate: Optional[int]
+
+    @property
+    def filters(self) -> Tuple[QueryTerm, ...]:
+        return tuple(term for term in self.query.terms if term is not self.driver)
+
+    def __str__(self) -> str:
+        source = "full scan" if self.driver is None else (
+            f"index {self.driver} (~{self.estimate} candidates)")
+        filters = " ".join(str(term) for term in self.filters)
+        return f"{source}, filter: {filters}" if filters else source
+
+
+class QueryPlanner:
+    """
+    Chooses the most selective index for a query and runs it.
+
+    Name, tag, phone, location and birthday terms can be answered by an index; the term
+    with the fewest candidates drives the query and the other terms are checked on
+    those candidates only. Queries without an indexable term fall back to a full scan.
+    The caller holds the address book's read lock while planning and fetching.
+    """
+
+    def __init__(self, indexes: ContactIndexes, birthday_index: BirthdayIndex) -> None:
+        """
+        Args:
+            indexes: Name, tag, phone and locality indexes of the book.
+            birthday_index: Birthday index of the book.
+        """
+        self.indexes = indexes
+        self.birthday_index = birthday_index
+
+    def estimate(self, term: QueryTerm) -> Optional[int]:
+        """
+        Estimate the number of candidates an index would return for the term.
+
+        Returns:
+            The estimate, or None if no index applies to the term.
+        """
+        predicate = term.predicate
+        if isinstance(predicate, NamePrefix):
+            return self.indexes.names.prefix_count(predicate.prefix.casefold())
+        if isinstance(predicate, HasTag):
+            return self.indexes.tags.count(predicate.tag.strip().lower())
+        if isinstance(predicate, PhonePrefix):
+            return self.indexes.phones.prefix_count(normalize_phone(predicate.prefix))
+        if isinstance(predicate, CountryIs):
+            return self.indexes.localities.count(country=predicate.country).contacts
+        if isinstance(predicate, CityIs):
+            return self.indexes.localities.count(city=predicate.city).contacts
+        if isinstance(predicate, ZipIs):
+            return self.indexes.localities.count(zip_code=predicate.zip_code).contacts
+        if isinstance(predicate, BirthdayWithin):
+            end = predicate.start + timedelta(days=predicate.days)
+            return min(self.birthday_index.count_range(predicate.start, end),
+                       len(self.birthday_index))
+        return None
+
+    def plan(self, query: Query) -> QueryPlan:
+        """
+        Pick the indexed term with the fewest candidates as the driver.
+        """
+        driver, best = None, None
+        for term in query.terms:
+            estimate = self.estimate(term)
+            if estimate is not None and (best is None or estimate < best):
+                driver, best = term, estimate
+        return QueryPlan(query, driver, best)
+
+    def candidates(self, plan: QueryPlan, contacts: Iterable[Contact]) -> List[Contact]:
+        """
+        Fetch the contacts to check: the driver's index entries,
+        or all contacts when the plan is a full scan.
+        """
+        if plan.driver is None:
+            return list(contacts)
+        predicate = plan.driver.predicate
+        if isinstance(predicate, NamePrefix):
+            return self.indexes.names.prefix(predicate.prefix.casefold())
+        if isinstance(predicate, HasTag):
+            return self.indexes.tags.get(predicate.tag.strip().lower())
+        if isinstance(predicate, PhonePrefix):
+            return self.indexes.phones.prefix(normalize_phone(predicate.prefix))
+        if isinstance(predicate, CountryIs):
+            return self.indexes.localities.contacts(country=predicate.country)
+        if isinstance(predicate, CityIs):
+            return self.indexes.localities.contacts(city=predicate.city)
+        if isinstance(predicate, ZipIs):
+            return self.indexes.localities.contacts(zip_code=predicate.zip_code)
+        return _birthday_candidates(predicate, self.birthday_index)
+
+
+def execute_plan(plan: QueryPlan, candidates: Iterable[Contact]) -> Iterator[Contact]:
+    """
+    Lazily yield the candidates matching the plan's remaining terms.
+    """
+    filters = [term.predicate for term in plan.filters]
+    for contact in candidates:
+        with contact._lock.read():
+            matches = all(predicate(contact) for predicate in filters)
+        if matches:
+            yield contact
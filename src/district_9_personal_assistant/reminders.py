@@ -0,0 +1,322 @@
+import heapq
+import itertools
+import socket
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.helpers.message import fail_message
+
+
+@dataclass(order=True)
+class BirthdayEvent:
+    """
+    A single upcoming birthday of a contact.
+
+    Attributes:
+        when: Date of the birthday.
+        seq: Tie-breaker keeping heap order stable for equal dates.
+        contact: The contact whose birthday it is.
+    """
+    when: date
+    seq: int
+    contact: Contact = field(compare=False)
+
+    @property
+    def age(self) -> int:
+        """
+        Age the contact turns on this birthday.
+        """
+        return self.when.year - self.contact.birthday.birthday.year
+
+    def __str__(self) -> str:
+        return (
+            f"🎉 {self.when.strftime('%d.%m.%Y')}: "
+            f"{self.contact.name.value}'s birthday (turns {self.age})"
+        )
+
+
+class ReminderSink(ABC):
+    """
+    Destination for birthday reminders.
+    """
+
+    @abstractmethod
+    def emit(self, event: BirthdayEvent) -> None:
+        """
+        Deliver a reminder for the given event.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Release any resources held by the sink.
+        """
+        pass
+
+
+class StdoutSink(ReminderSink):
+    """
+    Writes reminders to a text stream (stdout by default).
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+
+    def emit(self, event: BirthdayEvent) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(f"{event}\n")
+        stream.flush()
+
+
+class FileSink(ReminderSink):
+    """
+    Appends reminders to a file, one per line.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+
+    def emit(self, event: BirthdayEvent) -> None:
+        with open(self.filepath, "a", encoding="utf-8") as file:
+            file.write(f"{event}\n")
+
+
+class SocketSink(ReminderSink):
+    """
+    Sends reminders as UTF-8 lines to a local TCP socket.
+    The connection is opened lazily and re-opened after errors.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, timeout: float = 5.0) -> None:
+        self.address: Tuple[str, int] = (host, port)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+
+    def emit(self, event: BirthdayEvent) -> None:
+        if self._sock is None:
+            self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        try:
+            self._sock.sendall(f"{event}\n".encode("utf-8"))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class BirthdayScheduler:
+    """
+    Emits birthday reminders when they are due.
+
+    Upcoming birthdays are kept in a min-heap keyed by date, so the scheduler only
+    looks at the earliest event and sleeps until it is due instead of polling all
+    contacts. After a reminder fires, the contact's next birthday is pushed back.
+    Changed or removed contacts are handled lazily when their entry is popped.
+
+    A scheduler started with AddressBook.start_reminders is kept up to date from the
+    book's contact changes.
+    """
+
+    def __init__(
+            self,
+            contacts: Iterable[Contact],
+            sink: ReminderSink,
+            remind_at: time = time(9, 0),
+            now: Callable[[], datetime] = datetime.now,
+            since: Optional[datetime] = None,
+    ) -> None:
+        """
+        Args:
+            contacts: Contacts to schedule reminders for.
+            sink: Where reminders are delivered.
+            remind_at: Time of day at which a birthday reminder fires.
+            now: Clock function, injectable for testing.
+            since: Reminders due until this moment are not emitted, e.g. because
+                the birthdays were already shown.
+        """
+        self.sink = sink
+        self.remind_at = remind_at
+        self._now = now
+        self._seq = itertools.count()
+        self._heap: List[BirthdayEvent] = []
+        self._live: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Moment of the last run_pending; reminders due until then were emitted.
+        self._last_run: Optional[datetime] = since
+        self._fill(contacts)
+
+    def _fill(self, contacts: Iterable[Contact]) -> None:
+        """
+        Build the heap of the next events of the contacts, skipping the reminders
+        already emitted. Call with the lock held or before the scheduler is shared.
+        """
+        today = self._now().date()
+        self._live.clear()
+        self._heap = []
+        for contact in contacts:
+            event = self._make_event(contact, today)
+            if event is not None and self._last_run is not None \
+                    and self._due_at(event) <= self._last_run:
+                event = self._make_event(contact, event.when + timedelta(days=1))
+            if event is not None:
+                self._heap.append(event)
+        heapq.heapify(self._heap)
+
+    def _make_event(self, contact: Contact, from_date: date) -> Optional[BirthdayEvent]:
+        """
+        Build the next event for a contact and mark it as the contact's live event.
+        Returns None if the contact has no birthday.
+        """
+        self._live.pop(id(contact), None)
+        if not contact.birthday or not contact.birthday.birthday:
+            return None
+        event = BirthdayEvent(
+            contact.birthday.next_occurrence(from_date), next(self._seq), contact
+        )
+        self._live[id(contact)] = event.seq
+        return event
+
+    def _due_at(self, event: BirthdayEvent) -> datetime:
+        """
+        Moment at which the reminder for an event fires.
+        """
+        return datetime.combine(event.when, self.remind_at)
+
+    def _is_current(self, event: BirthdayEvent) -> bool:
+        """
+        Check that an event was not superseded or removed
+        and still matches the contact's birthday.
+        """
+        contact = event.contact
+        if self._live.get(id(contact)) != event.seq:
+            return False
+        if not contact.birthday or not contact.birthday.birthday:
+            return False
+        return contact.birthday.next_occurrence(event.when) == event.when
+
+    def schedule(self, contact: Contact) -> None:
+        """
+        Schedule (or reschedule) reminders for a contact,
+        e.g. after it was added or its birthday changed.
+        """
+        with self._lock:
+            event = self._make_event(contact, self._now().date())
+            if event is not None:
+                heapq.heappush(self._heap, event)
+        self._wakeup.set()
+
+    def reset(self, contacts: Iterable[Contact]) -> None:
+        """
+        Reschedule reminders for a new set of contacts, e.g. after the book was merged
+        with changes saved by another process. Reminders already emitted are not repeated.
+        """
+        with self._lock:
+            self._fill(contacts)
+        self._wakeup.set()
+
+    def unschedule(self, contact: Contact) -> None:
+        """
+        Stop reminders for a contact (e.g. after it was deleted).
+        """
+        with self._lock:
+            self._live.pop(id(contact), None)
+
+    def peek(self) -> Optional[BirthdayEvent]:
+        """
+        Get the next valid event without removing it.
+
+        Returns:
+            The earliest BirthdayEvent, or None if nothing is scheduled.
+        """
+        with self._lock:
+            while self._heap and not self._is_current(self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0] if self._heap else None
+
+    def run_pending(self) -> List[BirthdayEvent]:
+        """
+        Emit every reminder that is due and reschedule it for the next year.
+        A reminder the sink fails to deliver is reported and skipped, so one failure
+        neither drops the other reminders nor stops the scheduler thread.
+
+        Returns:
+            List of events that were emitted.
+        """
+        now = self._now()
+        fired = []
+        with self._lock:
+            self._last_run = now
+            while self._heap and self._due_at(self._heap[0]) <= now:
+                event = heapq.heappop(self._heap)
+                if not self._is_current(event):
+                    continue
+                fired.append(event)
+                following = self._make_event(event.contact, event.when + timedelta(days=1))
+                heapq.heappush(self._heap, following)
+        emitted = []
+        for event in fired:
+            try:
+                self.sink.emit(event)
+            except Exception as e:
+                print(fail_message(f"Could not deliver the reminder '{event}': {e}"))
+                continue
+            emitted.append(event)
+        return emitted
+
+    def seconds_until_next(self) -> Optional[float]:
+        """
+        Get the number of seconds until the next reminder is due.
+
+        Returns:
+            Seconds (0 if already due), or None if nothing is scheduled.
+        """
+        event = self.peek()
+        if event is None:
+            return None
+        return max(0.0, (self._due_at(event) - self._now()).total_seconds())
+
+    def _run(self) -> None:
+        """
+        Thread target: sleep until the next event is due, then emit it.
+        """
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            self.run_pending()
+            self._wakeup.wait(self.seconds_until_next())
+
+    def start(self) -> "BirthdayScheduler":
+        """
+        Start emitting reminders in a daemon thread.
+
+        Returns:
+            The scheduler itself, to allow chaining.
+        """
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="birthday-scheduler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the scheduler thread and close the sink.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sink.close()
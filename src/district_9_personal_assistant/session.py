@@ -0,0 +1,64 @@
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from src.district_9_personal_assistant.contact import Contact
+
+_current_session: ContextVar[Optional["Session"]] = ContextVar("current_session", default=None)
+_session_ids = itertools.count(1)
+
+
+@dataclass
+class Session:
+    """
+    Per-user state for working with a shared address book.
+
+    While a session is activated (in a thread or asyncio task), the address book's
+    contact-level commands act on that session's active contact, and undo and redo
+    revert that session's own changes, so several users can work on the same book
+    at once without affecting each other.
+    """
+    name: str = ""
+    active_contact: Optional[Contact] = None
+    # Unique for the process, unlike id(), to key per-session state such as undo logs.
+    uid: int = field(default_factory=lambda: next(_session_ids), init=False, compare=False)
+
+    def get_active_contact(self) -> Optional[Contact]:
+        """
+        Get the active contact, or None if none is selected
+        or it was removed from the book.
+        """
+        contact = self.active_contact
+        if contact is not None and contact.removed:
+            self.active_contact = None
+            return None
+        return contact
+
+    @contextmanager
+    def activate(self) -> Iterator["Session"]:
+        """
+        Make this the current session for the calling thread or task.
+        """
+        token = _current_session.set(self)
+        try:
+            yield self
+        finally:
+            _current_session.reset(token)
+
+
+def current_session() -> Optional[Session]:
+    """
+    Get the session activated in the current context, or None.
+    """
+    return _current_session.get()
+
+
+def current_session_uid() -> Optional[int]:
+    """
+    Get the uid of the session activated in the current context,
+    or None outside sessions.
+    """
+    session = _current_session.get()
+    return session.uid if session is not None else None
@@ -0,0 +1,288 @@
+import itertools
+import os
+import select
+import socket
+import socketserver
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows: no Unix terminals, clients cannot attach.
+    termios = None
+    tty = None
+
+import questionary
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.data_structures import Size
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output.vt100 import Vt100_Output
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.constants.commands import commands_info, Commands
+from src.district_9_personal_assistant.helpers.core_utils import (
+    parse_input,
+    parse_arguments,
+    get_commands_list_suggestions,
+    get_command_completer,
+    get_command_handler,
+    save_book,
+    ask_passphrase,
+)
+from src.district_9_personal_assistant.helpers.message import (
+    fail_message,
+    info_message,
+)
+from src.district_9_personal_assistant.reminders import StdoutSink
+from src.district_9_personal_assistant.session import Session
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), "address_book.sock")
+DEFAULT_TERMINAL_SIZE = Size(rows=24, columns=80)
+
+
+class _SocketWriter:
+    """
+    Minimal text stream that buffers terminal output and sends it over a socket on flush.
+    """
+    encoding = "utf-8"
+    errors = "replace"
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._buffer: list[str] = []
+
+    def write(self, data: str) -> int:
+        self._buffer.append(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).replace("\n", "\r\n").replace("\r\r\n", "\r\n")
+        self._buffer.clear()
+        try:
+            self._sock.sendall(data.encode(self.encoding, self.errors))
+        except OSError:
+            pass
+
+    def isatty(self) -> bool:
+        return True
+
+
+def run_session_loop(book: AddressBook, session: Session, write: Callable[[str], None]) -> None:
+    """
+    Run the command loop for one session until the user exits or disconnects.
+    Prompts go to the current prompt_toolkit app session.
+
+    Args:
+        book: The shared address book.
+        session: The session whose active contact the commands use.
+        write: Function sending a line of text to the user.
+    """
+    with session.activate():
+        write(info_message(f"Welcome to the Personal Assistant, {session.name}!"))
+        while True:
+            active_contact = book.get_active_contact()
+            if active_contact is not None:
+                write(info_message(f"Working on the contact: {active_contact.name}"))
+            try:
+                user_input = questionary.autocomplete(
+                    "Enter a command:",
+                    choices=get_commands_list_suggestions(active_contact),
+                    completer=get_command_completer(lambda: book, active_contact),
+                ).unsafe_ask()
+            except (EOFError, KeyboardInterrupt):
+                return
+
+            command = parse_input(user_input)
+            if command is None:
+                write(fail_message("Invalid command input."))
+                continue
+            if command == Commands.HELP.value:
+                write(commands_info)
+                continue
+            if command == Commands.EXIT.value:
+                write(save_book(book, "Exit."))
+                return
+
+            handler = get_command_handler(book, parse_arguments(user_input)).get(command)
+            if handler is None:
+                write(fail_message("Unknown command. Type 'help' to see available commands."))
+                continue
+            try:
+                result = handler()
+            except (EOFError, KeyboardInterrupt):
+                return
+            if result is not None:
+                write(str(result))
+
+
+class SessionServer:
+    """
+    Serves one shared, in-memory AddressBook to many terminal clients over a Unix socket.
+
+    Each connection gets its own thread and Session, so every client has its own
+    active contact while all of them work on the same warm book. Prompts are rendered
+    through a prompt_toolkit app session bound to the connection.
+
+    A client first sends a line with its terminal size ("<rows> <columns>\\n"),
+    then raw keystrokes.
+    """
+
+    def __init__(self, book: AddressBook, path: str = DEFAULT_SOCKET_PATH) -> None:
+        """
+        Args:
+            book: The address book to share.
+            path: Filesystem path of the Unix socket.
+        """
+        self.book = book
+        self.path = path
+        self.sessions: Dict[int, Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._session_ids = itertools.count(1)
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                server.handle_connection(self.request)
+
+        return Handler
+
+    def handle_connection(self, sock: socket.socket) -> None:
+        """
+        Serve one client connection until it exits or disconnects.
+        """
+        size = DEFAULT_TERMINAL_SIZE
+        handshake = b""
+        with sock.makefile("rb", buffering=0) as reader:
+            while not handshake.endswith(b"\n"):
+                chunk = reader.read(1)
+                if not chunk:
+                    return
+                handshake += chunk
+        try:
+            rows, columns = (int(part) for part in handshake.split())
+            size = Size(rows=rows, columns=columns)
+        except ValueError:
+            pass
+
+        with self._sessions_lock:
+            session_id = next(self._session_ids)
+            session = Session(name=f"client {session_id}")
+            self.sessions[session_id] = session
+
+        writer = _SocketWriter(sock)
+        output = Vt100_Output(writer, lambda: size, term="xterm", enable_cpr=False)
+
+        def write(text: str) -> None:
+            writer.write(f"{text}\n")
+            writer.flush()
+
+        with create_pipe_input() as pipe_input:
+            def pump() -> None:
+                try:
+                    while True:
+                        data = sock.recv(4096)
+                        if not data:
+                            break
+                        pipe_input.send_bytes(data)
+                except OSError:
+                    pass
+                finally:
+                    pipe_input.close()
+
+            threading.Thread(target=pump, name=f"{session.name} input", daemon=True).start()
+            try:
+                with create_app_session(input=pipe_input, output=output):
+                    run_session_loop(self.book, session, write)
+            finally:
+                with self._sessions_lock:
+                    self.sessions.pop(session_id, None)
+                self.book.end_session(session)
+
+    def start(self) -> "SessionServer":
+        """
+        Start accepting connections in a background thread.
+
+        Returns:
+            The server itself, to allow chaining.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="session-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop accepting connections and remove the socket file.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_session_server(path: str = DEFAULT_SOCKET_PATH) -> None:
+    """
+    Load the address book and share it over a Unix socket until interrupted, then save it.
+    Birthday reminders are printed on the server's console meanwhile.
+
+    Args:
+        path: Filesystem path of the Unix socket.
+    """
+    book = AddressBook.load_from_file(ask_passphrase())
+    server = SessionServer(book, path).start()
+    book.start_reminders(StdoutSink())
+    print(info_message(f"Sharing the address book on {path}. Press Ctrl+C to stop."))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        book.stop_reminders()
+        server.stop()
+        print(save_book(book, "Server stopped."))
+
+
+def connect_to_session_server(path: str = DEFAULT_SOCKET_PATH) -> None:
+    """
+    Attach the current terminal to a running session server.
+
+    Args:
+        path: Filesystem path of the Unix socket.
+    """
+    if termios is None:
+        raise OSError("Attaching to a session server needs a Unix terminal.")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        columns, rows = os.get_terminal_size()
+        sock.sendall(f"{rows} {columns}\n".encode())
+
+        stdin_fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(stdin_fd)
+        try:
+            tty.setraw(stdin_fd)
+            while True:
+                readable, _, _ = select.select([sock, stdin_fd], [], [])
+                if sock in readable:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    os.write(sys.stdout.fileno(), data)
+                if stdin_fd in readable:
+                    sock.sendall(os.read(stdin_fd, 1024))
+        finally:
+            termios.tcsetattr(stdin_fd, termios.TCSADRAIN, old_settings)
@@ -0,0 +1,416 @@
+import hashlib
+import hmac
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.encryption import BookKey, seal, unseal
+
+# Number of buckets a snapshot is split into; a change only re-hashes its own bucket,
+# and a diff only opens the buckets whose digests differ.
+BUCKET_COUNT = 256
+SNAPSHOT_ID_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def contact_key(name: str) -> str:
+    """
+    Key of a contact in a snapshot: contact names are unique ignoring case.
+    """
+    return name.casefold()
+
+
+def bucket_of(key: str) -> int:
+    """
+    Bucket number of a contact key, stable across runs.
+    """
+    return int(hashlib.blake2b(key.encode("utf-8"), digest_size=4).hexdigest(), 16) % BUCKET_COUNT
+
+
+@dataclass(frozen=True)
+class ContactVersion:
+    """
+    Immutable state of a contact at one point in time, addressed by its content.
+    """
+    key: str
+    data: str
+    digest: str
+
+    @classmethod
+    def of(cls, contact: Contact) -> "ContactVersion":
+        """
+        Capture the current state of a contact.
+        """
+        data = json.dumps(contact.to_dict(), sort_keys=True, ensure_ascii=False)
+        return cls(contact_key(contact.name.value), data, _digest(data))
+
+    def to_contact(self) -> Contact:
+        """
+        Rebuild a detached contact from this version.
+        """
+        return Contact.from_dict(json.loads(self.data))
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """
+    Immutable group of contact versions. Its digest covers the keys and digests
+    of its entries, so equal digests mean equal contents.
+    """
+    entries: Mapping[str, ContactVersion]
+    digest: str
+
+    @classmethod
+    def of(cls, entries: Dict[str, ContactVersion]) -> "Bucket":
+        listing = "\n".join(f"{key}\t{entries[key].digest}" for key in sorted(entries))
+        return cls(MappingProxyType(entries), _digest(listing))
+
+
+EMPTY_BUCKET = Bucket.of({})
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """
+    Contacts added, removed and changed between two snapshots, by key.
+    """
+    added: Tuple[ContactVersion, ...]
+    removed: Tuple[ContactVersion, ...]
+    changed: Tuple[Tuple[ContactVersion, ContactVersion], ...]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        def name(version: ContactVersion) -> str:
+            return json.loads(version.data)["name"]
+        lines = [f"+ {name(v)}" for v in self.added]
+        lines += [f"- {name(v)}" for v in self.removed]
+        lines += [f"~ {name(new)}" for _, new in self.changed]
+        return "\n".join(lines) if lines else "No changes."
+
+
+def diff_buckets(old: Sequence[Bucket], new: Sequence[Bucket]) -> SnapshotDiff:
+    """
+    Compare two bucket lists, skipping the buckets with equal digests.
+    """
+    added: List[ContactVersion] = []
+    removed: List[ContactVersion] = []
+    changed: List[Tuple[ContactVersion, ContactVersion]] = []
+    for old_bucket, new_bucket in zip(old, new):
+        if old_bucket is new_bucket or old_bucket.digest == new_bucket.digest:
+            continue
+        for key, version in new_bucket.entries.items():
+            previous = old_bucket.entries.get(key)
+            if previous is None:
+                added.append(version)
+            elif previous.digest != version.digest:
+                changed.append((previous, version))
+        removed.extend(version for key, version in old_bucket.entries.items()
+                       if key not in new_bucket.entries)
+    return SnapshotDiff(tuple(added), tuple(removed), tuple(changed))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable, point-in-time copy of an address book.
+
+    A snapshot taken from a previous one shares every contact version and every bucket
+    that did not change, so only changed contacts are serialized and hashed, and only
+    changed buckets take new memory. Taking one still checks the version of every
+    contact, a cheap pass over the book; storing and diffing it against a stored
+    snapshot touch only the changed buckets.
+    """
+    snapshot_id: str
+    created: datetime
+    buckets: Tuple[Bucket, ...]
+    # Contact objects and versions the entries were captured from, to reuse them
+    # in the next snapshot; runtime only.
+    _sources: Mapping[int, Tuple[Contact, int, ContactVersion]] = field(
+        default=MappingProxyType({}), repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return sum(len(bucket.entries) for bucket in self.buckets)
+
+    def __iter__(self) -> Iterator[ContactVersion]:
+        for bucket in self.buckets:
+            yield from bucket.entries.values()
+
+    def get(self, name: str) -> Optional[ContactVersion]:
+        """
+        Get the version of a contact by name (case-insensitive), or None.
+        """
+        key = contact_key(name)
+        return self.buckets[bucket_of(key)].entries.get(key)
+
+    def contacts(self) -> List[Contact]:
+        """
+        Rebuild detached contacts from the snapshot, sorted by name.
+        """
+        return [version.to_contact() for version in sorted(self, key=lambda v: v.key)]
+
+    def diff(self, newer: "Snapshot") -> SnapshotDiff:
+        """
+        Compare this snapshot with a newer one.
+        """
+        return diff_buckets(self.buckets, newer.buckets)
+
+
+def take_snapshot(
+        contacts: Sequence[Contact],
+        previous: Optional[Snapshot] = None,
+        created: Optional[datetime] = None,
+) -> Snapshot:
+    """
+    Capture the contacts as a snapshot.
+
+    Contacts whose version did not change since the previous snapshot reuse its
+    entries without being serialized again, and buckets whose entries are all reused
+    are shared as they are.
+
+    Args:
+        contacts: Contacts of the book, e.g. from AddressBook.snapshot_contacts.
+        previous: Optional earlier snapshot of the same book to share with.
+        created: Time of the snapshot (defaults to now).
+
+    Returns:
+        Snapshot instance.
+    """
+    created = created or datetime.now()
+    old_sources = previous._sources if previous is not None else {}
+    old_buckets = previous.buckets if previous is not None else (EMPTY_BUCKET,) * BUCKET_COUNT
+    sources: Dict[int, Tuple[Contact, int, ContactVersion]] = {}
+    grouped: List[Dict[str, ContactVersion]] = [{} for _ in range(BUCKET_COUNT)]
+    for contact in contacts:
+        with contact._lock.read():
+            source = old_sources.get(id(contact))
+            if source is not None and source[0] is contact and source[1] == contact.version:
+                version = source[2]
+            else:
+                version = ContactVersion.of(contact)
+            sources[id(contact)] = (contact, contact.version, version)
+        grouped[bucket_of(version.key)][version.key] = version
+
+    buckets = []
+    for old_bucket, entries in zip(old_buckets, grouped):
+        unchanged = len(entries) == len(old_bucket.entries) and all(
+            old_bucket.entries.get(key) is version for key, version in entries.items())
+        buckets.append(old_bucket if unchanged else Bucket.of(entries))
+    return Snapshot(created.strftime(SNAPSHOT_ID_FORMAT), created, tuple(buckets),
+                    MappingProxyType(sources))
+
+
+class SnapshotStore:
+    """
+    Content-addressed, on-disk store of snapshots.
+
+    Contact versions and buckets are stored once under ``objects/`` by digest, so
+    identical contacts are shared by all the snapshots that contain them; a snapshot
+    itself is a small manifest listing its bucket digests under ``snapshots/``.
+    Saving writes only the buckets (and their contacts) not stored yet, and diffing
+    only reads the listings of the buckets that differ and the contacts that changed.
+
+    With a key, every file is encrypted and objects are named by a keyed hash of
+    their digest, so neither the contents nor the names reveal the contacts.
+    """
+
+    def __init__(self, directory: str, key: Optional[BookKey] = None) -> None:
+        """
+        Args:
+            directory: Directory of the store; created on first save.
+            key: Key to encrypt the files with, e.g. the key of an encrypted book.
+        """
+        self.directory = directory
+        self.key = key
+        self._buckets: Dict[str, Bucket] = {}
+        self._versions: Dict[str, ContactVersion] = {}
+        # Digests of the buckets known to be stored; buckets from diff_with are
+        # cached in memory before they are.
+        self._stored: Set[str] = set()
+
+    def _object_path(self, digest: str) -> str:
+        if self.key is not None:
+            digest = hmac.new(self.key.key, digest.encode("ascii"), hashlib.sha256).hexdigest()
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.directory, "snapshots", f"{snapshot_id}.json")
+
+    def _write(self, path: str, text: str) -> None:
+        """
+        Write a file atomically, so a crash never leaves a partial object behind.
+        """
+        data = text.encode("utf-8")
+        if self.key is not None:
+            data = seal(self.key, data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> str:
+        """
+        Raises:
+            ValueError: If the file is encrypted with another key, or damaged.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        if self.key is not None:
+            data = unseal(self.key, data)
+        return data.decode("utf-8")
+
+    def save(self, snapshot: Snapshot) -> str:
+        """
+        Store a snapshot.
+
+        Returns:
+            The snapshot id.
+        """
+        for bucket in snapshot.buckets:
+            path = self._object_path(bucket.digest)
+            if bucket.digest in self._stored or os.path.exists(path):
+                self._stored.add(bucket.digest)
+                continue
+            for version in bucket.entries.values():
+                version_path = self._object_path(version.digest)
+                if not os.path.exists(version_path):
+                    self._write(version_path, version.data)
+            listing = [[key, bucket.entries[key].digest] for key in sorted(bucket.entries)]
+            self._write(path, json.dumps(listing))
+            self._buckets[bucket.digest] = bucket
+            self._stored.add(bucket.digest)
+        manifest = {
+            "created": snapshot.created.isoformat(),
+            "buckets": [bucket.digest for bucket in snapshot.buckets],
+        }
+        self._write(self._manifest_path(snapshot.snapshot_id), json.dumps(manifest))
+        return snapshot.snapshot_id
+
+    def list_snapshots(self) -> List[str]:
+        """
+        Get the ids of the stored snapshots, oldest first.
+        """
+        directory = os.path.join(self.directory, "snapshots")
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(directory)
+                      if name.endswith(".json"))
+
+    def _load_manifest(self, snapshot_id: str) -> Tuple[datetime, List[str]]:
+        """
+        Raises:
+            KeyError: If there is no snapshot with this id.
+        """
+        try:
+            manifest = json.loads(self._read(self._manifest_path(snapshot_id)))
+        except FileNotFoundError:
+            raise KeyError(f"Snapshot {snapshot_id} not found.") from None
+        return datetime.fromisoformat(manifest["created"]), manifest["buckets"]
+
+    def _load_version(self, key: str, digest: str) -> ContactVersion:
+        version = self._versions.get(digest)
+        if version is None:
+            version = ContactVersion(key, self._read(self._object_path(digest)), digest)
+            self._versions[digest] = version
+        return version
+
+    def _load_listing(self, digest: str) -> Dict[str, str]:
+        """
+        Get the contact version digests of a bucket by key, without reading the contacts.
+        """
+        bucket = self._buckets.get(digest)
+        if bucket is not None:
+            return {key: version.digest for key, version in bucket.entries.items()}
+        if digest == EMPTY_BUCKET.digest:
+            return {}
+        return dict(json.loads(self._read(self._object_path(digest))))
+
+    def _load_bucket(self, digest: str) -> Bucket:
+        bucket = self._buckets.get(digest)
+        if bucket is None:
+            if digest == EMPTY_BUCKET.digest:
+                return EMPTY_BUCKET
+            listing = json.loads(self._read(self._object_path(digest)))
+            bucket = Bucket(
+                MappingProxyType({key: self._load_version(key, version_digest)
+                                  for key, version_digest in listing}),
+                digest,
+            )
+            self._buckets[digest] = bucket
+            self._stored.add(digest)
+        return bucket
+
+    def load(self, snapshot_id: str) -> Snapshot:
+        """
+        Load a stored snapshot. Buckets and contacts shared with snapshots loaded
+        before are shared in memory too.
+
+        Raises:
+            KeyError: If there is no snapshot with this id.
+        """
+        created, digests = self._load_manifest(snapshot_id)
+        return Snapshot(snapshot_id, created, tuple(self._load_bucket(d) for d in digests))
+
+    def diff(self, old_id: str, new_id: str) -> SnapshotDiff:
+        """
+        Compare two stored snapshots, reading only the buckets that differ.
+
+        Raises:
+            KeyError: If a snapshot does not exist.
+        """
+        _, old_digests = self._load_manifest(old_id)
+        _, new_digests = self._load_manifest(new_id)
+        return self._diff_digests(old_digests, new_digests)
+
+    def diff_with(self, snapshot_id: str, snapshot: Snapshot) -> SnapshotDiff:
+        """
+        Compare a stored snapshot with a newer one in memory, e.g. of the current book,
+        reading only the stored buckets that differ from it.
+
+        Raises:
+            KeyError: If the stored snapshot does not exist.
+        """
+        _, old_digests = self._load_manifest(snapshot_id)
+        for old, bucket in zip(old_digests, snapshot.buckets):
+            if old != bucket.digest:
+                self._buckets[bucket.digest] = bucket
+                self._versions.update(
+                    (version.digest, version) for version in bucket.entries.values())
+        return self._diff_digests(old_digests, [bucket.digest for bucket in snapshot.buckets])
+
+    def _diff_digests(
+            self,
+            old_digests: Sequence[str],
+            new_digests: Sequence[str],
+    ) -> SnapshotDiff:
+        """
+        Compare two snapshots by their bucket digests. Only the listings of the
+        buckets that differ are read, and only the contacts that changed.
+        """
+        added: List[ContactVersion] = []
+        removed: List[ContactVersion] = []
+        changed: List[Tuple[ContactVersion, ContactVersion]] = []
+        for old_digest, new_digest in zip(old_digests, new_digests):
+            if old_digest == new_digest:
+                continue
+            old = self._load_listing(old_digest)
+            new = self._load_listing(new_digest)
+            for key, digest in new.items():
+                previous = old.get(key)
+                if previous is None:
+                    added.append(self._load_version(key, digest))
+                elif previous != digest:
+                    changed.append((self._load_version(key, previous),
+                                    self._load_version(key, digest)))
+            removed.extend(self._load_version(key, digest)
+                           for key, digest in old.items() if key not in new)
+        return SnapshotDiff(tuple(added), tuple(removed), tuple(changed))
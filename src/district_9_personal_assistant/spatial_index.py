@@ -0,0 +1,189 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.geocoding import Coordinates, Geocoder, get_geocoder
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Half the Earth's circumference: no two points are farther apart.
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+DEFAULT_CELL_DEGREES = 0.25
+
+Cell = Tuple[int, int]
+
+
+def distance_km(a: Coordinates, b: Coordinates) -> float:
+    """
+    Great-circle distance between two points (haversine formula).
+    """
+    lat1, lat2 = math.radians(a.latitude), math.radians(b.latitude)
+    dlat = lat2 - lat1
+    dlon = math.radians(b.longitude - a.longitude)
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+@dataclass(frozen=True)
+class NearbyContact:
+    """
+    A contact found near a point, with its closest address.
+    """
+    distance_km: float
+    contact: Contact
+    address: Address
+    coordinates: Coordinates
+
+    def __str__(self) -> str:
+        return f"{self.contact.name.value}: {self.address} ({self.distance_km:.1f} km)"
+
+
+class SpatialIndex:
+    """
+    Grid index over the geocoded addresses of contacts, for radius and nearest queries.
+
+    The globe is split into cells of ``cell_degrees`` by ``cell_degrees``; a query only
+    looks at the cells overlapping its search circle, so its cost depends on the number
+    of addresses nearby rather than on the size of the book. Updating a contact only
+    touches the cells of its own addresses. Addresses the geocoder cannot resolve are
+    not indexed.
+    """
+
+    def __init__(
+            self,
+            contacts: Iterable[Contact] = (),
+            geocoder: Optional[Geocoder] = None,
+            cell_degrees: float = DEFAULT_CELL_DEGREES,
+    ) -> None:
+        """
+        Args:
+            contacts: Contacts to index.
+            geocoder: Geocoder resolving addresses (defaults to the shared one).
+            cell_degrees: Size of a grid cell in degrees.
+        """
+        self.geocoder = geocoder or get_geocoder()
+        self.cell_degrees = cell_degrees
+        self._lon_cells = math.ceil(360 / cell_degrees)
+        self._lat_cells = math.ceil(180 / cell_degrees)
+        self._cells: Dict[Cell, Dict[int, Tuple[Contact, Address, Coordinates]]] = {}
+        self._entries: Dict[int, List[Tuple[Cell, int]]] = {}
+        for contact in contacts:
+            self.update(contact)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _cell(self, point: Coordinates) -> Cell:
+        row = min(int((point.latitude + 90) // self.cell_degrees), self._lat_cells - 1)
+        column = int((point.longitude + 180) // self.cell_degrees) % self._lon_cells
+        return row, column
+
+    def update(self, contact: Contact) -> None:
+        """
+        Add a contact, or re-index it after its addresses changed.
+        """
+        self.remove(contact)
+        with contact._lock.read():
+            addresses = list(contact.addresses)
+        entries = []
+        for address in addresses:
+            point = self.geocoder.locate(address)
+            if point is None:
+                continue
+            cell = self._cell(point)
+            self._cells.setdefault(cell, {})[id(address)] = (contact, address, point)
+            entries.append((cell, id(address)))
+        if entries:
+            self._entries[id(contact)] = entries
+
+    def remove(self, contact: Contact) -> None:
+        """
+        Remove a contact from the index. Unknown contacts are ignored.
+        """
+        for cell, address_id in self._entries.pop(id(contact), ()):
+            cell_entries = self._cells[cell]
+            del cell_entries[address_id]
+            if not cell_entries:
+                del self._cells[cell]
+
+    def _cells_within(self, center: Coordinates, radius_km: float) -> Iterator[Cell]:
+        """
+        Yield the non-empty cells overlapping the circle's bounding box.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        low_row = max(0, int((center.latitude - dlat + 90) // self.cell_degrees))
+        high_row = min(
+            self._lat_cells - 1, int((center.latitude + dlat + 90) // self.cell_degrees))
+        max_lat = min(90.0, abs(center.latitude) + dlat)
+        cos_lat = math.cos(math.radians(max_lat))
+        if cos_lat <= 1e-9 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+            columns: Iterable[int] = range(self._lon_cells)
+        else:
+            dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+            first = int((center.longitude - dlon + 180) // self.cell_degrees)
+            last = int((center.longitude + dlon + 180) // self.cell_degrees)
+            columns = dict.fromkeys(column % self._lon_cells for column in range(first, last + 1))
+        for row in range(low_row, high_row + 1):
+            for column in columns:
+                if (row, column) in self._cells:
+                    yield row, column
+
+    def within(
+            self,
+            center: Coordinates,
+            radius_km: float,
+            exclude: Optional[Contact] = None,
+    ) -> List[NearbyContact]:
+        """
+        Find the contacts with an address within a distance of a point.
+
+        Args:
+            center: The point to search around.
+            radius_km: Maximum distance in kilometres.
+            exclude: Optional contact to leave out, e.g. the one at the center.
+
+        Returns:
+            List of NearbyContact entries (one per contact, for its closest address),
+            nearest first.
+        """
+        closest: Dict[int, NearbyContact] = {}
+        for cell in self._cells_within(center, radius_km):
+            for contact, address, point in self._cells[cell].values():
+                if contact is exclude:
+                    continue
+                distance = distance_km(center, point)
+                if distance > radius_km:
+                    continue
+                found = closest.get(id(contact))
+                if found is None or distance < found.distance_km:
+                    closest[id(contact)] = NearbyContact(distance, contact, address, point)
+        return sorted(closest.values(), key=lambda nearby: nearby.distance_km)
+
+    def nearest(
+            self,
+            center: Coordinates,
+            count: int,
+            exclude: Optional[Contact] = None,
+    ) -> List[NearbyContact]:
+        """
+        Find the contacts closest to a point.
+        Searches a growing radius, starting at one cell, until enough contacts are found.
+
+        Args:
+            center: The point to search around.
+            count: Maximum number of contacts to return.
+            exclude: Optional contact to leave out, e.g. the one at the center.
+
+        Returns:
+            List of NearbyContact entries, nearest first.
+        """
+        if count <= 0:
+            return []
+        radius = self.cell_degrees * KM_PER_DEGREE
+        while True:
+            found = self.within(center, radius, exclude)
+            if len(found) >= count or radius >= MAX_DISTANCE_KM:
+                return found[:count]
+            radius *= 2
@@ -0,0 +1,446 @@
+import hashlib
+import io
+import lzma
+import os
+import pickle
+import uuid
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.district_9_personal_assistant.encryption import BookKey, Decryptor, Encryptor
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, saves are not coordinated.
+    fcntl = None
+
+# Header written before the pickled book, so the stamp can be read without the book.
+FORMAT_VERSION = 1
+
+# Compression modes of the pickled book; the header records the one a file uses.
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_LZMA = "lzma"
+COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_LZMA)
+# zlib can use a preset dictionary as large as its window.
+MAX_DICTIONARY_SIZE = 32 * 1024
+CHUNK_SIZE = 64 * 1024
+# Number of shard files of the sharded layout.
+SHARD_COUNT = 64
+MANIFEST_NAME = "manifest.pkl"
+
+
+@dataclass(frozen=True)
+class SaveResult:
+    """
+    Outcome of saving a book file.
+
+    Attributes:
+        merged: Whether changes saved by another process were merged in first.
+        conflicts: Names of contacts changed on both sides; this book's version was kept.
+    """
+    merged: bool = False
+    conflicts: Tuple[str, ...] = ()
+
+
+def new_stamp() -> str:
+    """
+    Create a unique stamp identifying one saved state of a book file.
+    """
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """
+    Hold an advisory lock for a file, shared with every process using this function.
+
+    The lock is taken on a separate ``<path>.lock`` file, so the data file itself can
+    be replaced atomically while the lock is held.
+
+    Args:
+        path: Path of the data file to lock.
+        exclusive: Take an exclusive (write) lock instead of a shared (read) one.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a+b") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def build_dictionary(strings: Iterable[str]) -> bytes:
+    """
+    Build a preset zlib dictionary from strings repeated across a book,
+    e.g. tags and cities, so even their first occurrences compress well.
+
+    zlib finds matches closer to the end of the dictionary more cheaply, so the most
+    frequent strings go last; the least frequent are dropped beyond the size limit.
+    """
+    counts = Counter(string for string in strings if string)
+    dictionary = b""
+    for string, count in counts.most_common():
+        if count < 2:
+            break
+        encoded = string.encode("utf-8")
+        if len(dictionary) + len(encoded) > MAX_DICTIONARY_SIZE:
+            break
+        dictionary = encoded + dictionary
+    return dictionary
+
+
+class _StreamWriter(io.RawIOBase):
+    """
+    Write-only stream compressing or encrypting what is written to it into a file
+    as it goes, so the whole pickle is never held in memory at once.
+    """
+
+    def __init__(self, file: BinaryIO, compressor: Any) -> None:
+        self._file = file
+        self._compressor = compressor
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._file.write(self._compressor.compress(data))
+        return len(data)
+
+    def finish(self) -> None:
+        """
+        Write the end of the compressed stream.
+        """
+        self._file.write(self._compressor.flush())
+
+
+class _StreamReader(io.RawIOBase):
+    """
+    Read-only stream decompressing or decrypting a file chunk by chunk as it is read.
+    """
+
+    def __init__(self, file: BinaryIO, decompressor: Any) -> None:
+        self._file = file
+        self._decompressor = decompressor
+        # Input zlib did not consume yet because of the output limit; the other
+        # decompressors keep it themselves.
+        self._tail = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def _needs_input(self) -> bool:
+        if hasattr(self._decompressor, "needs_input"):
+            return self._decompressor.needs_input
+        return not self._tail
+
+    def _decompress(self, chunk: bytes, size: int) -> bytes:
+        if hasattr(self._decompressor, "needs_input"):
+            return self._decompressor.decompress(chunk, size)
+        data = self._decompressor.decompress(self._tail + chunk, size)
+        self._tail = self._decompressor.unconsumed_tail
+        return data
+
+    def readinto(self, buffer) -> int:
+        while not self._decompressor.eof:
+            chunk = b""
+            if self._needs_input():
+                chunk = self._file.read(CHUNK_SIZE)
+                if not chunk:
+                    raise EOFError("The book file is truncated.")
+            data = self._decompress(chunk, len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                return len(data)
+        return 0
+
+
+def _compressor(compression: str, dictionary: bytes) -> Any:
+    if compression == COMPRESSION_ZLIB:
+        if dictionary:
+            return zlib.compressobj(zlib.Z_BEST_COMPRESSION, zdict=dictionary)
+        return zlib.compressobj(zlib.Z_BEST_COMPRESSION)
+    return lzma.LZMACompressor()
+
+
+def _decompressor(compression: str, dictionary: bytes) -> Any:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return lzma.LZMADecompressor()
+
+
+def _read_header(file) -> Tuple[dict, Any]:
+    """
+    Read the header of an open book file.
+
+    Returns:
+        Tuple (header, book). The book is None for files with a header (it follows it);
+        files saved before headers existed hold only the book and get an empty header.
+    """
+    first = pickle.load(file)
+    if isinstance(first, dict) and first.get("format") == FORMAT_VERSION:
+        return first, None
+    return {}, first
+
+
+def read_header(path: str) -> dict:
+    """
+    Read the header of a book file without loading the book: its stamp, compression
+    and, for encrypted files, the salt and check value of the key.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    with open(path, "rb") as file:
+        return _read_header(file)[0]
+
+
+def read_stamp(path: str) -> Optional[str]:
+    """
+    Read the stamp of a book file without loading the book.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    return read_header(path).get("stamp")
+
+
+def read_book(path: str, key: Optional[BookKey] = None) -> Tuple[Optional[str], Any, str]:
+    """
+    Read a book file. Call with the lock held.
+
+    Args:
+        path: Path of the book file.
+        key: Key of the book, if it is encrypted.
+
+    Returns:
+        Tuple (stamp, book, compression).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is encrypted with another key, or damaged.
+    """
+    with open(path, "rb") as file:
+        header, book = _read_header(file)
+        compression = header.get("compression", COMPRESSION_NONE)
+        if book is not None:
+            return None, book, compression
+        salt = header.get("salt")
+        if salt is not None and (key is None or key.salt != salt):
+            raise ValueError("The book file is encrypted with another passphrase.")
+        stream: BinaryIO = file
+        if salt is not None:
+            stream = io.BufferedReader(_StreamReader(stream, Decryptor(key)), CHUNK_SIZE)
+        if compression != COMPRESSION_NONE:
+            dictionary = header.get("dictionary", b"")
+            stream = io.BufferedReader(
+                _StreamReader(stream, _decompressor(compression, dictionary)), CHUNK_SIZE)
+        return header.get("stamp"), pickle.load(stream), compression
+
+
+def write_book(
+        path: str,
+        book: Any,
+        stamp: str,
+        compression: str = COMPRESSION_NONE,
+        dictionary: bytes = b"",
+        key: Optional[BookKey] = None,
+) -> None:
+    """
+    Write a book file atomically: readers see either the old or the new file.
+    Call with the exclusive lock held.
+
+    Args:
+        path: Path of the book file.
+        book: The book to pickle.
+        stamp: Stamp identifying the saved state.
+        compression: One of COMPRESSIONS.
+        dictionary: Preset dictionary for zlib, e.g. from build_dictionary; stored
+            in the header, since it is needed to read the file back.
+        key: Key to encrypt the book with, after compressing it. Encrypted files get
+            no dictionary, since the header is not encrypted.
+
+    Raises:
+        ValueError: If the compression mode is unknown.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}.")
+    header = {"format": FORMAT_VERSION, "stamp": stamp, "compression": compression}
+    if key is not None:
+        dictionary = b""
+        header["salt"] = key.salt
+        header["check"] = key.check_value()
+    if compression == COMPRESSION_ZLIB and dictionary:
+        header["dictionary"] = dictionary
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        pickle.dump(header, file)
+        writers = []
+        stream: BinaryIO = file
+        if key is not None:
+            stream = _StreamWriter(stream, Encryptor(key))
+            writers.append(stream)
+        if compression != COMPRESSION_NONE:
+            stream = _StreamWriter(stream, _compressor(compression, dictionary))
+            writers.append(stream)
+        pickle.dump(book, stream)
+        for writer in reversed(writers):
+            writer.finish()
+    os.replace(tmp_path, path)
+
+
+def shard_of(name: str, shard_count: int = SHARD_COUNT) -> int:
+    """
+    Shard number of a contact name (case-insensitive), stable across runs.
+    """
+    digest = hashlib.blake2b(name.casefold().encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+@dataclass
+class ShardManifest:
+    """
+    Contents of the manifest of a sharded book.
+
+    Attributes:
+        state: The book's own state, without its contacts.
+        order: Keys of the contacts in book order.
+        files: Name of the file of each shard, or None for empty shards.
+    """
+    state: Any
+    order: List[str]
+    files: List[Optional[str]]
+
+
+class ShardedStore:
+    """
+    Sharded on-disk layout of a book: the records (contacts) are split into
+    ``shard_count`` files by a hash of their name, next to a small manifest.
+
+    Saving rewrites only the shards that changed, loading reads the shards in parallel,
+    and a single record can be read from its shard alone. Shard files are never
+    overwritten: each save writes new files named after its stamp and then replaces
+    the manifest, so a crash leaves the previous state readable.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            shard_count: int = SHARD_COUNT,
+            key: Optional[BookKey] = None,
+    ) -> None:
+        """
+        Args:
+            directory: Directory of the shards; created on first save.
+            shard_count: Number of shards of a new book.
+            key: Key of the book, to encrypt every shard and the manifest with.
+        """
+        self.directory = directory
+        self.shard_count = shard_count
+        self.key = key
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def exists(self) -> bool:
+        """
+        Whether a book was saved in this store.
+        """
+        return os.path.exists(self.manifest_path)
+
+    def read_header(self) -> dict:
+        """
+        Raises:
+            FileNotFoundError: If no book was saved in this store.
+        """
+        return read_header(self.manifest_path)
+
+    def read_manifest(self) -> Tuple[Optional[str], ShardManifest, str]:
+        """
+        Returns:
+            Tuple (stamp, manifest, compression).
+
+        Raises:
+            FileNotFoundError: If no book was saved in this store.
+        """
+        return read_book(self.manifest_path, self.key)
+
+    def read_shard(self, manifest: ShardManifest, shard: int) -> list:
+        """
+        Read the records of one shard.
+        """
+        name = manifest.files[shard]
+        if name is None:
+            return []
+        return read_book(os.path.join(self.directory, name), self.key)[1]
+
+    def read_shards(self, manifest: ShardManifest, workers: Optional[int] = None) -> List[list]:
+        """
+        Read the records of every shard in a thread pool; reading files and
+        decompressing them do not hold the GIL.
+
+        Returns:
+            The records of each shard, by shard number.
+        """
+        workers = workers or min(len(manifest.files), (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda shard: self.read_shard(manifest, shard),
+                                 range(len(manifest.files))))
+
+    def write(
+            self,
+            manifest: ShardManifest,
+            shards: Dict[int, list],
+            stamp: str,
+            compression: str = COMPRESSION_NONE,
+            dictionary: Callable[[list], bytes] = lambda records: b"",
+    ) -> None:
+        """
+        Write the changed shards and then the manifest. Call with the exclusive lock held.
+
+        Args:
+            manifest: New manifest; its files are updated with the written shards.
+            shards: Records of each changed shard, by shard number.
+            stamp: Stamp of the saved state.
+            compression: One of COMPRESSIONS.
+            dictionary: Builds the zlib dictionary of a shard from its records.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for shard, records in shards.items():
+            name = None
+            if records:
+                name = f"shard-{shard:03d}-{stamp}.pkl"
+                write_book(os.path.join(self.directory, name), records, stamp, compression,
+                           dictionary(records) if compression == COMPRESSION_ZLIB else b"",
+                           self.key)
+            manifest.files[shard] = name
+        write_book(self.manifest_path, manifest, stamp, compression, key=self.key)
+        self._remove_shards(keep=set(manifest.files))
+
+    def _remove_shards(self, keep: set) -> None:
+        """
+        Remove the shard files not listed in the manifest: those of the previous state,
+        and any left behind by an interrupted save.
+        """
+        for name in os.listdir(self.directory):
+            if name.startswith("shard-") and name not in keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def clear(self) -> None:
+        """
+        Remove the saved book from this store, e.g. after switching to a single file.
+        Call with the exclusive lock held.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        if self.exists():
+            os.remove(self.manifest_path)
+        self._remove_shards(keep=set())
@@ -0,0 +1,127 @@
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.encryption import BookKey, encryption_available
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.storage import (
+    COMPRESSION_ZLIB,
+    COMPRESSIONS,
+    build_dictionary,
+    new_stamp,
+    read_book,
+    write_book,
+)
+
+CITIES = [("Ukraine", "Kyiv"), ("Ukraine", "Lviv"), ("Ukraine", "Odesa"),
+          ("Germany", "Berlin"), ("Germany", "Munich"), ("Poland", "Warsaw")]
+TAGS = ["work", "family", "friends", "gym", "school", "neighbours", "doctor", "travel"]
+NOTE_TEXTS = [
+    "Call back about the meeting next week",
+    "Send the documents before the end of the month",
+    "Birthday present ideas: books, board games, concert tickets",
+    "Ask about the apartment and the moving date",
+]
+DOMAINS = ["gmail.com", "ukr.net", "example.com", "outlook.com"]
+
+
+@dataclass(frozen=True)
+class StorageBenchmarkResult:
+    """
+    Size and timings of a book file saved with one compression mode,
+    with or without encryption.
+    """
+    compression: str
+    encrypted: bool
+    size: int
+    save_seconds: float
+    load_seconds: float
+
+    @property
+    def total_seconds(self) -> float:
+        return self.save_seconds + self.load_seconds
+
+
+def build_sample_book(contacts: int, seed: int = 0) -> AddressBook:
+    """
+    Build a book with realistic, repetitive contents: notes, tags, cities and emails
+    drawn from small vocabularies, like real address books.
+    """
+    rng = random.Random(seed)
+    contacts_list = []
+    for i in range(contacts):
+        country, city = rng.choice(CITIES)
+        contacts_list.append(Contact(
+            name=Name(f"Contact {i:07d}"),
+            phones=[Phone(number=f"+380{i:09d}", is_main=True)],
+            emails=[Email(f"contact{i}@{rng.choice(DOMAINS)}")],
+            addresses=[Address(country, city, f"Street {rng.randint(1, 200)}",
+                               f"{rng.randint(10000, 99999)}")],
+            notes=[Note(rng.choice(NOTE_TEXTS), rng.choice(TAGS).title(),
+                        ",".join(rng.sample(TAGS, 2)))
+                   for _ in range(rng.randint(1, 3))],
+        ))
+    return AddressBook(contacts=contacts_list)
+
+
+def run_storage_benchmark(contacts: int = 20000) -> List[StorageBenchmarkResult]:
+    """
+    Write and read the same sample book with every compression mode, unencrypted
+    and (if available) encrypted, the way AddressBook.save_to_file and load_from_file do.
+    The key is derived before timing, as it is once per session.
+
+    Args:
+        contacts: Number of contacts in the sample book.
+
+    Returns:
+        One StorageBenchmarkResult per compression mode and encryption.
+    """
+    book = build_sample_book(contacts)
+    key = BookKey.derive("benchmark") if encryption_available() else None
+    keys = [None, key] if key is not None else [None]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for compression in COMPRESSIONS:
+            for book_key in keys:
+                path = os.path.join(directory, f"address_book_{compression}.pkl")
+                started = time.perf_counter()
+                dictionary = b""
+                if compression == COMPRESSION_ZLIB:
+                    dictionary = build_dictionary(AddressBook._storage_strings(book.contacts))
+                write_book(path, book, new_stamp(), compression, dictionary, book_key)
+                saved = time.perf_counter()
+                read_book(path, book_key)
+                loaded = time.perf_counter()
+                results.append(StorageBenchmarkResult(
+                    compression, book_key is not None, os.path.getsize(path),
+                    saved - started, loaded - saved))
+    return results
+
+
+def print_storage_benchmark(contacts: int = 20000) -> None:
+    """
+    Run the storage benchmark and print its results as a table.
+    """
+    print(f"Book with {contacts} contacts:")
+    print(f"{'compression':<12}{'encrypted':<10}{'size, KB':>10}{'save, s':>10}{'load, s':>10}"
+          f"{'overhead':>10}")
+    plain = {}
+    for result in run_storage_benchmark(contacts):
+        overhead = ""
+        if result.encrypted:
+            base = plain[result.compression]
+            overhead = f"{(result.total_seconds / base.total_seconds - 1) * 100:+.0f}%"
+        else:
+            plain[result.compression] = result
+        print(f"{result.compression:<12}{'yes' if result.encrypted else 'no':<10}"
+              f"{result.size / 1024:>10.0f}{result.save_seconds:>10.2f}"
+              f"{result.load_seconds:>10.2f}{overhead:>10}")
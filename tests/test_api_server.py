@@ -0,0 +1,134 @@
+import asyncio
+import http.client
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.api_server import ApiServer
+from src.district_9_personal_assistant.contact import Contact
+
+
+class TestApiServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.book = AddressBook()
+        self.server = ApiServer(self.book, port=0)
+        await self.server.start()
+        # Clients get their own threads, leaving the default executor to the handlers.
+        self.clients = ThreadPoolExecutor(max_workers=32)
+
+    async def asyncTearDown(self):
+        self.clients.shutdown()
+        await self.server.stop()
+
+    def _requests(self, *calls):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+        results = []
+        try:
+            for method, path, body in calls:
+                payload = json.dumps(body) if body is not None else None
+                connection.request(method, path, body=payload)
+                response = connection.getresponse()
+                results.append((response.status, json.loads(response.read())))
+        finally:
+            connection.close()
+        return results
+
+    async def call(self, *calls):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.clients, self._requests, *calls)
+
+    async def test_contact_lifecycle_on_one_connection(self):
+        results = await self.call(
+            ("POST", "/contacts", {"name": "John Doe"}),
+            ("POST", "/contacts/John%20Doe/phones", {"number": "+4912345678901"}),
+            ("POST", "/contacts/john%20doe/emails", {"address": "John@Example.com"}),
+            ("PUT", "/contacts/John%20Doe/birthday", {"value": "01.01.2000"}),
+            ("GET", "/contacts/John%20Doe", None),
+            ("DELETE", "/contacts/John%20Doe/phones/%2B4912345678901", None),
+            ("DELETE", "/contacts/John%20Doe", None),
+            ("GET", "/contacts", None),
+        )
+        statuses = [status for status, _ in results]
+        self.assertEqual(statuses, [201, 201, 201, 200, 200, 200, 200, 200])
+        contact = results[4][1]
+        self.assertEqual(contact["phones"][0]["number"], "+4912345678901")
+        self.assertEqual(contact["emails"][0]["address"], "john@example.com")
+        self.assertEqual(contact["birthday"], "01.01.2000")
+        self.assertEqual(results[-1][1]["contacts"], [])
+        self.assertEqual(self.book.contacts, [])
+
+    async def test_errors(self):
+        results = await self.call(
+            ("POST", "/contacts", {"name": "John"}),
+            ("POST", "/contacts", {"name": "john"}),
+            ("GET", "/contacts/Nobody", None),
+            ("POST", "/contacts/John/phones", {"number": "123"}),
+            ("PUT", "/contacts", {}),
+            ("GET", "/nowhere", None),
+            ("POST", "/contacts/John/phones", {"number": "+4912345678901"}),
+            ("POST", "/contacts/John/phones", {"number": "+49 1234 5678901"}),
+        )
+        self.assertEqual([status for status, _ in results],
+                         [201, 409, 404, 400, 405, 404, 201, 409])
+        self.assertIn("Invalid phone number", results[3][1]["error"])
+
+    async def test_contacts_are_paginated(self):
+        for i in range(5):
+            self.book.create_contact(f"Contact {i}")
+        results = await self.call(
+            ("GET", "/contacts?offset=1&limit=2", None),
+            ("GET", "/contacts?offset=4", None),
+            ("GET", "/contacts?limit=0", None),
+        )
+        self.assertEqual([status for status, _ in results], [200, 200, 400])
+        page = results[0][1]
+        self.assertEqual([c["name"] for c in page["contacts"]], ["Contact 1", "Contact 2"])
+        self.assertEqual((page["offset"], page["limit"], page["total"]), (1, 2, 5))
+        self.assertEqual([c["name"] for c in results[1][1]["contacts"]], ["Contact 4"])
+
+    async def test_rejected_field_is_a_bad_request(self):
+        self.book.create_contact("John")
+        with patch.object(Contact, "_claim", side_effect=ValueError("Already exists.")):
+            [(status, body)] = await self.call(
+                ("POST", "/contacts/John/emails", {"address": "john@example.com"}))
+        self.assertEqual((status, body["error"]), (400, "Already exists."))
+        self.assertEqual(self.book.get_contact("John").emails, [])
+
+    async def test_slow_handler_does_not_block_other_connections(self):
+        started, release = threading.Event(), threading.Event()
+        rename = AddressBook.rename_contact
+
+        def slow_rename(book, contact, name):
+            started.set()
+            release.wait(5)
+            return rename(book, contact, name)
+
+        self.book.create_contact("John")
+        with patch.object(AddressBook, "rename_contact", autospec=True, side_effect=slow_rename):
+            write = asyncio.ensure_future(
+                self.call(("PATCH", "/contacts/John", {"name": "Johnny"})))
+            await asyncio.to_thread(started.wait, 5)
+            [(status, _)] = await self.call(("GET", "/metrics", None))
+            self.assertEqual(status, 200)
+            release.set()
+            [(status, contact)] = await write
+        self.assertEqual((status, contact["name"]), (200, "Johnny"))
+
+    async def test_concurrent_writes_are_serialized(self):
+        names = [f"Contact {i}" for i in range(20)]
+        await asyncio.gather(*(
+            self.call(("POST", "/contacts", {"name": name})) for name in names
+        ))
+        self.assertEqual(sorted(c.name.value for c in self.book.contacts), sorted(names))
+
+        [(status, metrics)] = await self.call(("GET", "/metrics", None))
+        self.assertEqual(status, 200)
+        self.assertEqual(metrics["POST /contacts"]["count"], 20)
+        self.assertIn("p95_ms", metrics["POST /contacts"])
+
+
+if __name__ == "__main__":
+    unittest.main()
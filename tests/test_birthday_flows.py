@@ -1,8 +1,12 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from datetime import date
 
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.birthday import Birthday, ages_for
+from src.district_9_personal_assistant.note import Note
 
 
 class TestBirthdayBookFlows(unittest.TestCase):
@@ -48,6 +52,67 @@ class TestBirthdayBookFlows(unittest.TestCase):
         result = AddressBook.find_birthdays_this_day(self.book.contacts)
         self.assertIn(self.book._active_contact.name.value, result)
         self.assertEqual(result[self.book._active_contact.name.value], today)
+        mock_confirm.assert_not_called()
+
+    @patch("questionary.confirm")
+    def test_offer_greetings(self, mock_confirm):
+        mock_confirm.return_value.ask.side_effect = [True, False]
+        jane = self.book.create_contact("Jane")
+        with patch("builtins.print") as mock_print:
+            AddressBook.offer_greetings([self.book._active_contact, jane])
+        self.assertEqual(mock_confirm.call_count, 2)
+        self.assertEqual(mock_print.call_count, 3)
+        self.assertIn("John Doe", mock_print.call_args_list[0].args[0])
+
+    @patch("questionary.confirm")
+    def test_offer_greetings_by_tag_or_locale(self, mock_confirm):
+        mock_confirm.return_value.ask.return_value = True
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".txt", delete=False, encoding="utf-8") as file:
+            file.write("Happy birthday, {name}!\n[formal]\nDear {name}, congratulations.\n"
+                       "[uk]\nЗ днем народження, {name}!\n")
+        self.addCleanup(os.remove, file.name)
+        john = self.book._active_contact
+        john.add_field(Note("Met at the conference", tags_string="work,formal"))
+        jane = self.book.create_contact("Jane")
+        with patch("builtins.print") as mock_print:
+            AddressBook.offer_greetings([john, jane], file.name, locale="uk")
+        self.assertEqual(
+            [call.args[0] for call in mock_print.call_args_list],
+            ["1. Dear John Doe, congratulations.", "1. З днем народження, Jane!"])
+
+
+class TestBirthdayStats(unittest.TestCase):
+    def test_stats_are_cached_per_day(self):
+        bday = Birthday("29.02.2000")
+        stats = bday.stats(date(2025, 3, 1))
+        self.assertEqual(stats.age, 25)
+        self.assertEqual(stats.next_occurrence, date(2026, 2, 28))
+        self.assertEqual(stats.days_until, 364)
+        self.assertTrue(stats.had_birthday_this_year)
+        self.assertIs(bday.stats(date(2025, 3, 1)), stats)
+
+        rolled_over = bday.stats(date(2025, 3, 2))
+        self.assertIsNot(rolled_over, stats)
+        self.assertEqual(rolled_over.days_until, 363)
+
+    def test_stats_before_birthday(self):
+        stats = Birthday("10.06.1990").stats(date(2025, 6, 9))
+        self.assertEqual(stats.age, 34)
+        self.assertEqual(stats.days_until, 1)
+        self.assertFalse(stats.had_birthday_this_year)
+
+    def test_ages_for_skips_contacts_without_birthday(self):
+        book = AddressBook()
+        for name in ("John", "Jane"):
+            with patch("questionary.text") as mock_text:
+                mock_text.return_value.ask.return_value = name
+                book.add_contact()
+        book.contacts[1].birthday = Birthday("01.01.2000")
+        result = ages_for(book.contacts, date(2025, 1, 1))
+        self.assertEqual(len(result), 1)
+        self.assertIs(result[0][0], book.contacts[1])
+        self.assertEqual(result[0][1].age, 25)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import pickle
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.birthday import Birthday
+from src.district_9_personal_assistant.birthday_index import BirthdayIndex
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.name import Name
+
+
+def make_contact(name: str, birthday: str = "") -> Contact:
+    contact = Contact(name=Name(name))
+    if birthday:
+        contact.birthday = Birthday(birthday)
+    return contact
+
+
+class TestBirthdayIndex(unittest.TestCase):
+    def setUp(self):
+        self.ann = make_contact("Ann", "30.12.1990")
+        self.ann_too = make_contact("Ann", "02.01.1980")
+        self.leap = make_contact("Leap", "29.02.2000")
+        self.march = make_contact("March", "01.03.1995")
+        self.index = BirthdayIndex(
+            [self.march, self.ann, make_contact("None"), self.leap, self.ann_too])
+
+    def test_range_is_sorted_and_wraps_year(self):
+        result = self.index.in_range(date(2024, 12, 25), date(2025, 1, 5))
+        self.assertEqual([r.contact for r in result], [self.ann, self.ann_too])
+        self.assertEqual([r.age for r in result], [34, 45])
+        self.assertEqual(result[1].when, date(2025, 1, 2))
+
+    def test_leap_day_birthdays(self):
+        result = self.index.in_range(date(2025, 2, 28), date(2025, 3, 1))
+        self.assertEqual([(r.contact, r.when) for r in result], [
+            (self.leap, date(2025, 2, 28)), (self.march, date(2025, 3, 1))])
+        result = self.index.in_range(date(2024, 2, 28), date(2024, 2, 28))
+        self.assertEqual(result, [])
+
+    def test_count_range(self):
+        self.assertEqual(self.index.count_range(date(2024, 12, 25), date(2025, 1, 5)), 2)
+        self.assertEqual(self.index.count_range(date(2025, 2, 28), date(2025, 2, 28)), 1)
+        self.assertEqual(self.index.count_range(date(2024, 2, 28), date(2024, 2, 28)), 0)
+        self.assertEqual(self.index.count_range(date(2025, 3, 2), date(2025, 3, 1)), 0)
+
+    def test_next_n_lists_each_contact_once(self):
+        result = self.index.next_n(10, date(2024, 3, 1))
+        self.assertEqual([r.contact for r in result],
+                         [self.march, self.ann, self.ann_too, self.leap])
+        self.assertEqual(len(self.index.next_n(2, date(2024, 3, 1))), 2)
+
+    def test_incremental_updates(self):
+        self.index.remove(self.march)
+        self.leap.birthday = Birthday("05.01.2000")
+        self.index.update(self.leap)
+        result = self.index.in_range(date(2025, 1, 1), date(2025, 12, 31))
+        self.assertEqual([r.contact for r in result], [self.ann_too, self.leap, self.ann])
+
+
+class TestAddressBookBirthdayQueries(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        for name in ("John", "Jane"):
+            with patch("questionary.text") as mock_text:
+                mock_text.return_value.ask.return_value = name
+                self.book.add_contact()
+
+    def test_index_follows_book_mutations(self):
+        self.assertEqual(self.book.next_n_birthdays(5), [])
+        self.book._active_contact = self.book.contacts[1]
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = date.today().strftime("%d.%m.%Y")
+            self.book.add_birthday()
+        result = self.book.next_n_birthdays(5)
+        self.assertEqual([r.contact.name.value for r in result], ["Jane"])
+        self.assertIn("Jane", self.book.show_birthdays_this_week())
+
+        restored = pickle.loads(pickle.dumps(self.book))
+        self.assertIsNone(restored._birthday_index)
+        self.assertEqual(len(restored.next_n_birthdays(5)), 1)
+
+    @patch("questionary.text")
+    def test_show_upcoming_birthdays_validates_input(self, mock_text):
+        mock_text.return_value.ask.return_value = "soon"
+        self.assertIn("whole number", self.book.show_upcoming_birthdays())
+        mock_text.return_value.ask.return_value = "30"
+        self.assertIn("No birthdays", self.book.show_upcoming_birthdays())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import threading
+import unittest
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.book_loader import BookLoader
+
+
+class TestBookLoader(unittest.TestCase):
+    def test_book_is_none_until_loaded(self):
+        release = threading.Event()
+        loaded_book = AddressBook()
+
+        def slow_load():
+            release.wait()
+            return loaded_book
+
+        loader = BookLoader(slow_load).start()
+        self.assertFalse(loader.is_ready())
+        self.assertIsNone(loader.book)
+        release.set()
+        self.assertIs(loader.wait(timeout=5), loaded_book)
+        self.assertTrue(loader.is_ready())
+        self.assertIs(loader.book, loaded_book)
+
+    def test_wait_times_out(self):
+        release = threading.Event()
+        loader = BookLoader(lambda: release.wait() and AddressBook()).start()
+        with self.assertRaises(TimeoutError):
+            loader.wait(timeout=0.01)
+        release.set()
+        loader.wait(timeout=5)
+
+    def test_load_error_is_raised_on_wait(self):
+        def broken_load():
+            raise EOFError("corrupted file")
+
+        loader = BookLoader(broken_load).start()
+        with self.assertRaises(EOFError):
+            loader.wait(timeout=5)
+        self.assertIsNone(loader.book)
+
+
+if __name__ == "__main__":
+    unittest.main()
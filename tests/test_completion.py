@@ -0,0 +1,159 @@
+import unittest
+from unittest.mock import patch
+
+from prompt_toolkit.document import Document
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.completion import (
+    CommandCompleter,
+    CompletionIndex,
+    PrefixTrie,
+)
+from src.district_9_personal_assistant.constants.commands import book_commands_list
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.helpers.core_utils import (
+    get_command_handler,
+    parse_arguments,
+)
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.note import Note
+
+
+def completions(completer, text):
+    return [c.text for c in completer.get_completions(Document(text), None)]
+
+
+class TestPrefixTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = PrefixTrie()
+        for key, value in (("john", "John Smith"), ("smith", "John Smith"),
+                           ("joan", "Joan"), ("work", "work"), ("work", "work")):
+            self.trie.add(key, value)
+
+    def test_complete_prefix(self):
+        self.assertEqual(self.trie.complete("JO"), ["Joan", "John Smith"])
+        self.assertEqual(self.trie.complete("sm"), ["John Smith"])
+        self.assertEqual(self.trie.complete(""), ["Joan", "John Smith", "work"])
+        self.assertEqual(self.trie.complete("x"), [])
+
+    def test_limit(self):
+        self.assertEqual(self.trie.complete("j", limit=1), ["Joan"])
+
+    def test_discard_counts_and_prunes(self):
+        self.trie.discard("work", "work")
+        self.assertEqual(self.trie.complete("wo"), ["work"])
+        self.trie.discard("work", "work")
+        self.assertEqual(self.trie.complete("wo"), [])
+        self.trie.discard("work", "work")
+        self.trie.discard("joan", "Joan")
+        self.assertEqual(self.trie.complete("jo"), ["John Smith"])
+        self.assertEqual(len(self.trie), 2)
+        self.assertNotIn("w", self.trie._root.children)
+
+    def test_lookup_reads_only_the_prefix_node(self):
+        trie = PrefixTrie()
+        names = [f"John {i:04}" for i in range(5000)]
+        for name in names:
+            trie.add(name, name)
+        prefix_node = trie._find("jo")
+        # Cut off the subtree under the prefix: a lookup must not need to walk it.
+        saved_children, prefix_node.children = prefix_node.children, {}
+        self.assertEqual(trie.complete("jo"), names[:20])
+        prefix_node.children = saved_children
+        trie.discard(names[0], names[0])
+        self.assertEqual(trie.complete("jo"), names[1:21])
+        self.assertEqual(trie.complete("john 00"), names[1:21])
+
+
+class TestCompletionIndex(unittest.TestCase):
+    def setUp(self):
+        self.john = Contact(
+            name=Name("John Smith"),
+            emails=[Email("john@example.com")],
+            addresses=[Address("Germany", "Berlin", "Main St", "10115")],
+            notes=[Note("Call back", "Work", "work,client")],
+        )
+        self.book = AddressBook(contacts=[self.john])
+        self.index = self.book.get_completion_index()
+
+    def test_built_from_contacts(self):
+        self.assertEqual(self.index.names.complete("smi"), ["John Smith"])
+        self.assertEqual(self.index.tags.complete("cl"), ["client"])
+        self.assertEqual(self.index.cities.complete("be"), ["Berlin"])
+        self.assertEqual(self.index.domains.complete("ex"), ["example.com"])
+
+    def test_updated_on_changes(self):
+        self.book.rename_contact(self.john, "Johnny Smith")
+        self.assertEqual(self.index.names.complete("jo"), ["Johnny Smith"])
+        self.john.add_field(Address("Ukraine", "Kyiv", "Khreshchatyk 1", "01001"))
+        self.assertEqual(self.index.cities.complete("k"), ["Kyiv"])
+        jane = self.book.create_contact("Jane")
+        self.assertEqual(self.index.names.complete("j"), ["Jane", "Johnny Smith"])
+        self.book.remove_contact(self.john)
+        self.assertEqual(self.index.names.complete("j"), ["Jane"])
+        self.assertEqual(self.index.cities.complete(""), [])
+        self.assertEqual(self.index.tags.complete(""), [])
+        self.assertIs(self.book.get_completion_index(), self.index)
+        self.assertEqual(CompletionIndex(self.book.contacts).names.complete(""), [jane.name.value])
+
+
+class TestCommandCompleter(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        for name, city, domain in (("John", "Berlin", "gmail.com"),
+                                   ("Jane Doe", "New York", "example.com")):
+            contact = self.book.create_contact(name)
+            contact.add_field(Address("Country", city, "Street 1", "12345"))
+            contact.add_field(Email(f"{name.split()[0].lower()}@{domain}"))
+        self.completer = CommandCompleter(book_commands_list, self.book.get_completion_index)
+
+    def test_commands(self):
+        self.assertEqual(completions(self.completer, "select_act"), ["select_active_contact"])
+        self.assertIn("find_contact", completions(self.completer, "contact"))
+
+    def test_contact_names(self):
+        self.assertEqual(completions(self.completer, "select_active_contact J"),
+                         ["Jane Doe", "John"])
+        self.assertEqual(completions(self.completer, "select_active_contact do"), ["Jane Doe"])
+        self.assertEqual(completions(self.completer, "edit_contact J"), [])
+
+    def test_query_terms(self):
+        self.assertEqual(completions(self.completer, "query city:ber"), ["Berlin"])
+        self.assertEqual(completions(self.completer, "query has:email email:gm"), ["gmail.com"])
+        self.assertEqual(completions(self.completer, 'query city:"new'), ['"New York"'])
+        self.assertEqual(completions(self.completer, "query ja"), ['"Jane Doe"'])
+        self.assertEqual(completions(self.completer, "query phone:1"), [])
+
+    def test_book_not_loaded(self):
+        completer = CommandCompleter(book_commands_list, lambda: None)
+        self.assertEqual(completions(completer, "select_active_contact J"), [])
+
+
+class TestCommandArguments(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.book.create_contact("John")
+
+    def test_parse_arguments(self):
+        self.assertEqual(parse_arguments("select_active_contact  Jane Doe "), "Jane Doe")
+        self.assertEqual(parse_arguments("query"), "")
+        self.assertEqual(parse_arguments(None), "")
+
+    def test_select_by_typed_name(self):
+        with patch("src.district_9_personal_assistant.selection.questionary.select") as select:
+            handler = get_command_handler(self.book, "john")["select_active_contact"]
+            self.assertIn("Active contact set to John", handler())
+        select.assert_not_called()
+        self.assertEqual(self.book.get_active_contact().name.value, "John")
+
+    def test_query_typed_after_command(self):
+        with patch("src.district_9_personal_assistant.address_book.questionary.text") as text:
+            result = get_command_handler(self.book, "name:jo")["query"]()
+        text.assert_not_called()
+        self.assertIn("1. John", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
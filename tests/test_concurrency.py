@@ -0,0 +1,103 @@
+import pickle
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.concurrency import ReadWriteLock
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.session import Session
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers_share_the_lock(self):
+        lock = ReadWriteLock()
+        both_inside = threading.Barrier(2, timeout=5)
+
+        def reader():
+            with lock.read():
+                both_inside.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def test_writer_excludes_readers(self):
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_write()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read")))
+        reader.start()
+        reader.join(0.05)
+        self.assertEqual(events, [])
+        lock.release_write()
+        reader.join(5)
+        self.assertEqual(events, ["read"])
+
+    def test_reentrancy_and_upgrade(self):
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.read(), lock.write():
+                pass
+        with lock.read():
+            with lock.read():
+                pass
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        with lock.write():
+            pass
+
+
+class TestSharedAddressBook(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.john = self.book.create_contact("John")
+        self.jane = self.book.create_contact("Jane")
+
+    def test_sessions_have_their_own_active_contact(self):
+        first, second = Session("first"), Session("second")
+        with first.activate():
+            self.book._active_contact = self.john
+        with second.activate():
+            self.book._active_contact = self.jane
+        with first.activate():
+            self.assertIs(self.book.get_active_contact(), self.john)
+        self.assertIsNone(self.book.get_active_contact())
+
+    def test_removed_contact_is_cleared_in_other_sessions(self):
+        other = Session()
+        with other.activate():
+            self.book._active_contact = self.john
+        self.book.remove_contact(self.john)
+        with other.activate():
+            self.assertIsNone(self.book.get_active_contact())
+
+    def test_parallel_mutations(self):
+        def work(i):
+            with Session(str(i)).activate():
+                contact = self.book.create_contact(f"Contact {i}")
+                self.book._active_contact = self.john
+                self.john.add_field(Phone(number=f"+49123456{i:04d}"))
+                return contact
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            created = list(pool.map(work, range(200)))
+        self.assertEqual(len(self.book.contacts), 202)
+        self.assertEqual(len(created), 200)
+        self.assertEqual(len(self.john.phones), 200)
+        with self.assertRaises(ValueError):
+            self.book.create_contact("contact 7")
+
+    def test_pickle_drops_lock_and_session(self):
+        self.book._active_contact = self.john
+        restored = pickle.loads(pickle.dumps(self.book))
+        self.assertIsNone(restored.get_active_contact())
+        self.assertEqual([c.name.value for c in restored.contacts], ["John", "Jane"])
+        restored.create_contact("Ann")
+        restored.contacts[0].add_field(Phone(number="+4912345678901"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,12 @@ import unittest
 import re
 from unittest.mock import patch
 
+from src.district_9_personal_assistant.address import Address
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.phone import Phone
 
 
 def strip_ansi(text):
@@ -61,5 +66,43 @@ class TestContactBookFlows(unittest.TestCase):
         self.assertEqual(contact.name.value, "John Doe")
 
 
+class TestMainItems(unittest.TestCase):
+    def setUp(self):
+        self.contact = Contact(name=Name("John Doe"))
+        self.first = Phone(number="+4912345678901")
+        self.second = Phone(number="+4912345678902", is_main=True)
+        self.contact.add_field(self.first)
+        self.contact.add_field(self.second)
+
+    def test_main_pointer_follows_changes(self):
+        self.assertIs(self.contact.main_phone, self.second)
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "0: +4912345678901"
+            self.contact.set_main_phone()
+        self.assertIs(self.contact.main_phone, self.first)
+        self.assertFalse(self.second.is_main)
+        self.contact.remove_field(self.first)
+        self.assertIsNone(self.contact.main_phone)
+        self.assertIsNone(self.contact.main_email)
+
+    def test_main_email_and_address(self):
+        email = Email(address="john@example.com", is_main=True)
+        address = Address("Germany", "Berlin", "Main St", "10115", is_main=True)
+        self.contact.add_field(Email(address="old@example.com"))
+        self.contact.add_field(email)
+        self.contact.add_field(address)
+        self.assertIs(self.contact.main_email, email)
+        self.assertIs(self.contact.main_address, address)
+        self.assertTrue(self.contact.to_dict()["emails"][1]["is_main"])
+
+    def test_old_pickles_get_main_items_from_flags(self):
+        state = self.contact.__getstate__()
+        del state["_main_phone"]
+        restored = Contact.__new__(Contact)
+        restored.__setstate__(state)
+        self.assertIs(restored.main_phone, restored.phones[1])
+        self.assertIsNone(restored.main_address)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,25 @@
+import asyncio
+import io
+import os
+import pickle
+import tempfile
 import unittest
 import re
-from unittest.mock import patch
+from datetime import date
+from unittest.mock import AsyncMock, patch
 
+from src.district_9_personal_assistant.address import Address
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.core import (
+    autosave_book,
+    run_personal_assistant,
+    run_personal_assistant_async,
+    start_background_tasks,
+)
+from src.district_9_personal_assistant.helpers.core_utils import handle_exit
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.reminders import StdoutSink
 
 
 def strip_ansi(text):
@@ -80,5 +97,215 @@ class TestCoreFlows(unittest.TestCase):
         self.assertIsNone(self.book.get_active_contact())
 
 
+class TestChangeTracking(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        self.path = path
+        self.book = AddressBook()
+        self.john = self.book.create_contact("John")
+        self.jane = self.book.create_contact("Jane")
+        self.book.save_to_file()
+
+    def test_fields_count_their_updates(self):
+        phone = Phone(number="+4912345678901")
+        phone.update({"number": "+4912345678902"})
+        with self.assertRaises(ValueError):
+            phone.update({"number": "invalid"})
+        self.assertEqual(phone.version, 1)
+        address = Address("Ukraine", "Kyiv", "Main St", "01001")
+        address.update({"city": "Lviv"})
+        note = Note("Call back")
+        note.update_note("Call back tomorrow")
+        self.assertEqual((address.version, note.version), (1, 1))
+        self.assertNotIn("_version", phone.to_dict())
+
+    def test_only_changed_contacts_are_dirty(self):
+        self.assertFalse(self.book.dirty)
+        self.assertFalse(self.book.save_if_changed())
+        self.book.show_contacts()
+        self.assertFalse(self.book.dirty)
+
+        version = self.john.version
+        self.john.add_field(Phone(number="+4912345678901"))
+        self.book.rename_contact(self.john, "Johnny")
+        self.book.set_birthday(self.john, "01.01.1990")
+        self.assertEqual(self.john.version, version + 3)
+        self.assertTrue(self.book.dirty)
+        self.assertEqual(self.book.dirty_contacts(), [self.john])
+
+        self.assertTrue(self.book.save_if_changed())
+        self.assertEqual(self.book.dirty_contacts(), [])
+        self.book.remove_contact(self.jane)
+        self.assertTrue(self.book.dirty)
+        self.assertEqual(self.book.dirty_contacts(), [])
+
+    def test_loaded_book_is_clean(self):
+        self.john.add_field(Phone(number="+4912345678901"))
+        self.book.save_to_file()
+        restored = AddressBook.load_from_file()
+        self.assertFalse(restored.dirty)
+        self.assertEqual(restored.version, self.book.version)
+        self.assertEqual(restored.contacts[0].version, self.john.version)
+        self.assertTrue(AddressBook(contacts=restored.contacts).dirty)
+        restored.contacts[1].add_field(Phone(number="+4912345678902"))
+        self.assertEqual([c.name.value for c in restored.dirty_contacts()], ["Jane"])
+        self.assertFalse(pickle.loads(pickle.dumps(restored)).dirty)
+
+    def test_exit_skips_saving_unchanged_book(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with patch("builtins.print") as mock_print:
+            handle_exit(self.book)
+        self.assertIn("No changes to save", mock_print.call_args[0][0])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+        self.book.create_contact("Bob")
+        with patch("builtins.print") as mock_print:
+            handle_exit(self.book)
+        self.assertIn("Data saved", mock_print.call_args[0][0])
+        self.assertFalse(self.book.dirty)
+
+
+class TestLoadErrors(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        book = AddressBook()
+        book.create_contact("John")
+        book.save_to_file()
+        with open(self.path, "rb") as file:
+            self.data = file.read()
+
+    def run_assistant(self, content, background_load):
+        with open(self.path, "wb") as file:
+            file.write(content)
+        with patch("questionary.autocomplete") as mock_autocomplete, \
+                patch("builtins.print") as mock_print:
+            mock_autocomplete.return_value.ask.side_effect = ["show_contacts", "exit"]
+            run_personal_assistant(background_load=background_load)
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), content)
+        return [strip_ansi(str(call.args[0])) for call in mock_print.call_args_list]
+
+    def test_corrupt_book_is_reported_at_first_command(self):
+        output = self.run_assistant(self.data[:-20], background_load=True)
+        self.assertTrue(any(line.startswith("Could not load the address book") for line in output))
+
+    def test_unreadable_book_is_reported_at_startup(self):
+        output = self.run_assistant(b"not a pickle", background_load=False)
+        self.assertTrue(output[-1].startswith("Could not load the address book"))
+
+
+class TestSyncAssistant(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        book = AddressBook()
+        john = book.create_contact("John")
+        book.set_birthday(john, date.today().replace(year=1992).strftime("%d.%m.%Y"))
+        book.save_to_file()
+
+    def test_greets_once_then_runs_reminders(self):
+        with patch("src.district_9_personal_assistant.core.ask_passphrase", return_value=None), \
+                patch("questionary.autocomplete") as mock_autocomplete, \
+                patch("questionary.confirm") as mock_confirm, \
+                patch.object(AddressBook, "start_reminders", autospec=True,
+                             side_effect=AddressBook.start_reminders) as start, \
+                patch.object(AddressBook, "stop_reminders", autospec=True,
+                             side_effect=AddressBook.stop_reminders) as stop, \
+                patch.object(StdoutSink, "emit") as emit, \
+                patch("builtins.print") as mock_print:
+            mock_autocomplete.return_value.ask.side_effect = ["show_contacts", "exit"]
+            mock_confirm.return_value.ask.return_value = False
+            run_personal_assistant()
+        mock_confirm.assert_called_once()
+        self.assertIn("Today's birthdays: John", strip_ansi(str(mock_print.call_args_list)))
+        book = start.call_args.args[0]
+        stop.assert_called_once_with(book)
+        self.assertIsNone(book._reminders)
+        # Today's birthday was greeted, so the scheduler does not announce it again.
+        emit.assert_not_called()
+
+
+class TestAsyncAssistant(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        self.book = AddressBook()
+
+    async def test_commands_run_while_background_tasks_run(self):
+        with patch("questionary.autocomplete") as mock_autocomplete, \
+                patch("questionary.text") as mock_text, \
+                patch("builtins.print"):
+            mock_autocomplete.return_value.ask_async = AsyncMock(
+                side_effect=["add_contact", "exit"])
+            mock_text.return_value.ask.return_value = "John Doe"
+            await run_personal_assistant_async(autosave_interval=0.01)
+        loaded = AddressBook.load_from_file()
+        self.assertEqual([c.name.value for c in loaded.contacts], ["John Doe"])
+
+    async def test_autosave_saves_changed_book(self):
+        task = asyncio.create_task(autosave_book(self.book, interval=0.01))
+        self.book.create_contact("John")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not self.book.dirty:
+                break
+        task.cancel()
+        self.assertFalse(self.book.dirty)
+        self.assertEqual(len(AddressBook.load_from_file().contacts), 1)
+
+    def add_birthday_today(self):
+        john = self.book.create_contact("John")
+        self.book.set_birthday(john, date.today().replace(year=1992).strftime("%d.%m.%Y"))
+
+    async def test_background_tasks_start_and_remind_without_prompting(self):
+        self.add_birthday_today()
+        book_task = asyncio.get_running_loop().create_future()
+        book_task.set_result(self.book)
+        tasks = []
+        with patch("questionary.confirm") as mock_confirm, \
+                patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            await start_background_tasks(book_task, tasks, autosave_interval=0.01)
+            for _ in range(100):
+                if "John's birthday" in stdout.getvalue():
+                    break
+                await asyncio.sleep(0.01)
+            self.book.stop_reminders()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(len(tasks), 2)
+        mock_confirm.assert_not_called()
+        self.assertIn("John's birthday", stdout.getvalue())
+
+    async def test_load_error_is_reported(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a pickle")
+        with patch("src.district_9_personal_assistant.core.ask_passphrase", return_value=None), \
+                patch("questionary.autocomplete") as mock_autocomplete, \
+                patch("builtins.print") as mock_print:
+            mock_autocomplete.return_value.ask_async = AsyncMock(
+                side_effect=["show_contacts", "exit"])
+            await run_personal_assistant_async(autosave_interval=0.01)
+        self.assertEqual(mock_autocomplete.return_value.ask_async.call_count, 1)
+        self.assertIn("Could not load the address book", str(mock_print.call_args_list))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import random
+import string
+import unittest
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.dedup import find_duplicates, name_trigrams
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+
+
+def contact(name, phone=None, email=None):
+    result = Contact(name=Name(name))
+    if phone:
+        result.add_field(Phone(number=phone))
+    if email:
+        result.add_field(Email(address=email))
+    return result
+
+
+class TestFindDuplicates(unittest.TestCase):
+    def test_name_trigrams_ignore_case_and_word_order(self):
+        self.assertEqual(name_trigrams("John Doe"), name_trigrams("doe  JOHN"))
+
+    def test_finds_pairs_by_phone_email_and_name(self):
+        contacts = [
+            contact("John Doe", "+4912345678901"),
+            contact("Johnny D.", "+49 123 456 789 01"),
+            contact("Anna Smith", email="anna@example.com"),
+            contact("A. Smith", email="ANNA@example.com"),
+            contact("Alexander Petrenko"),
+            contact("Alexandr Petrenko"),
+            contact("Maria Garcia"),
+        ]
+        pairs = {frozenset((c.first.name.value, c.second.name.value)): c
+                 for c in find_duplicates(contacts)}
+        self.assertEqual(set(pairs), {
+            frozenset(("John Doe", "Johnny D.")),
+            frozenset(("Anna Smith", "A. Smith")),
+            frozenset(("Alexander Petrenko", "Alexandr Petrenko")),
+        })
+        self.assertIn("same phone", pairs[frozenset(("John Doe", "Johnny D."))].reasons)
+        self.assertEqual(find_duplicates(contacts, threshold=1.01), [])
+
+    def test_oversized_blocks_are_skipped(self):
+        rng = random.Random(1)
+        contacts = [contact("".join(rng.choices(string.ascii_lowercase, k=12)), "+4900000000000")
+                    for _ in range(60)]
+        self.assertEqual(len(find_duplicates(contacts[:10], threshold=0.6)), 45)
+        self.assertLess(len(find_duplicates(contacts, threshold=0.6)), 60 * 59 // 2 // 3)
+
+
+class TestMergeContacts(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.john = self.book.create_contact("John Doe")
+        self.john.add_field(Phone(number="+4912345678901", is_main=True))
+        self.john.add_field(Email(address="john@example.com"))
+        self.dupe = self.book.create_contact("Johnny Doe")
+        self.dupe.add_field(Phone(number="+4912345678901"))
+        self.dupe.add_field(Phone(number="+4912345678902", is_main=True))
+        self.dupe.add_field(Email(address="JOHN@example.com", is_main=True))
+        self.dupe.add_field(Address("Germany", "Berlin", "Main St", "10115"))
+        self.dupe.add_field(Note(content="Met at the conference"))
+        self.book.set_birthday(self.dupe, "01.02.1990")
+
+    def test_merge_into(self):
+        self.book.merge_into(self.john, self.dupe)
+        self.assertIsNone(self.book.get_contact("Johnny Doe"))
+        self.assertEqual([p.number for p in self.john.phones],
+                         ["+4912345678901", "+4912345678902"])
+        self.assertEqual(self.john.main_phone.number, "+4912345678901")
+        self.assertFalse(self.john.phones[1].is_main)
+        self.assertEqual(len(self.john.emails), 1)
+        self.assertEqual(self.john.main_email, None)
+        self.assertEqual(len(self.john.addresses), 1)
+        self.assertEqual(self.john.notes[0].content, "Met at the conference")
+        self.assertEqual(self.john.birthday.value, "01.02.1990")
+        self.assertEqual([c.name.value for c, _ in self.book.find_by_locality(city="Berlin")],
+                         ["John Doe"])
+        self.assertEqual(self.book.find_duplicates(), [])
+        with self.assertRaises(ValueError):
+            self.book.merge_into(self.john, self.john)
+
+    def test_merge_contacts_command(self):
+        with patch("questionary.select") as mock_select:
+            mock_select.return_value.ask.return_value = "Johnny Doe"
+            result = self.book.merge_contacts()
+        self.assertIn("Contact John Doe merged into Johnny Doe", result)
+        merged = self.book.get_contact("Johnny Doe")
+        self.assertEqual(merged.main_phone.number, "+4912345678902")
+        self.assertEqual(len(merged.phones), 2)
+        self.assertIn("No duplicate contacts found", self.book.merge_contacts())
+
+
+if __name__ == "__main__":
+    unittest.main()
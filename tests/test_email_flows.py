@@ -68,6 +68,27 @@ class TestEmailBookFlows(unittest.TestCase):
         self.assertTrue(emails[1].is_main)
         self.assertFalse(getattr(emails[0], "is_main", False))
 
+    @patch("src.district_9_personal_assistant.selection.questionary.select")
+    def test_duplicate_emails_are_rejected(self, mock_select):
+        contact = self.book.get_active_contact()
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "john.doe@example.com"
+            self.book.add_email()
+            mock_text.return_value.ask.return_value = "John.Doe@Example.com"
+            self.assertIn("already exists", self.book.add_email())
+            mock_text.return_value.ask.return_value = "jane.doe@example.com"
+            self.book.add_email()
+        mock_select.return_value.ask.return_value = "1: jane.doe@example.com"
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "JOHN.DOE@example.com"
+            self.assertIn("already exists", self.book.edit_email())
+        self.assertEqual([e.address for e in contact.emails],
+                         ["john.doe@example.com", "jane.doe@example.com"])
+        mock_select.return_value.ask.return_value = "0: john.doe@example.com"
+        self.book.delete_email()
+        self.assertFalse(contact.has_email("john.doe@example.com"))
+        self.assertTrue(contact.has_email("Jane.Doe@example.com"))
+
 
 if __name__ == "__main__":
     unittest.main()
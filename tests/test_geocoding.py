@@ -0,0 +1,111 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.geocoding import (
+    Coordinates,
+    Geocoder,
+    get_geocoder,
+    map_links,
+    write_geojson,
+)
+
+
+class TestGeocoder(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "gazetteer.csv")
+        self.write("country,city,zip_code,latitude,longitude\n"
+                   "Ukraine,kyiv,,50.45,30.52\n"
+                   "UKRAINE,Kyiv,01001,50.4504,30.5245\n"
+                   "UKRAINE,Broken,,north,east\n")
+        self.geocoder = Geocoder(self.path)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_zip_code_then_city(self):
+        self.assertEqual(len(self.geocoder), 2)
+        center = self.geocoder.locate(Address("Ukraine", "Kyiv", "Street 1", "02000"))
+        self.assertEqual(center, Coordinates(50.45, 30.52))
+        exact = self.geocoder.locate(Address("Ukraine", "Kyiv", "Street 1", "01001"))
+        self.assertEqual(exact, Coordinates(50.4504, 30.5245))
+        self.assertIsNone(self.geocoder.locate(Address("Ukraine", "Lviv", "Street 1", "79000")))
+
+    def test_results_are_cached_until_the_file_changes(self):
+        address = Address("Ukraine", "Lviv", "Street 1", "79000")
+        self.assertIsNone(self.geocoder.locate(address))
+        self.assertEqual(self.geocoder.cache_size(), 1)
+        self.write("country,city,zip_code,latitude,longitude\nUkraine,Lviv,,49.84,24.03\n")
+        self.assertEqual(self.geocoder.locate(address), Coordinates(49.84, 24.03))
+
+    def test_default_gazetteer_is_shared(self):
+        self.assertIs(get_geocoder(), get_geocoder())
+        located = get_geocoder().locate(Address("Germany", "Berlin", "Main St", "10115"))
+        self.assertIsNotNone(located)
+
+
+class TestMapExport(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.john = self.book.create_contact("John")
+        self.john.add_field(Address("Atlantis", "Poseidonia", "Main St", "00001"))
+        main = Address("Germany", "Berlin", "Main St", "10115")
+        main.is_main = True
+        self.john.add_field(main)
+        self.jane = self.book.create_contact("Jane")
+        self.jane.add_field(Address("Atlantis", "Poseidonia", "Sea St", "00002"))
+        self.book.create_contact("Nobody")
+
+    def test_map_links_use_main_address(self):
+        links = map_links(self.book.contacts)
+        self.assertEqual([(c.name.value, str(a)) for c, a, _ in links], [
+            ("John", "Main St, Berlin, 10115, GERMANY"),
+            ("Jane", "Sea St, Poseidonia, 00002, ATLANTIS"),
+        ])
+        self.assertTrue(links[0][2].endswith("query=52.5323%2C13.3846"))
+        self.assertIn("query=Sea%20St%2C%20Poseidonia", links[1][2])
+
+    def test_geojson_export(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_geojson(self.book.contacts, buffer), (1, 1))
+        data = json.loads(buffer.getvalue())
+        self.assertEqual(data["type"], "FeatureCollection")
+        feature, = data["features"]
+        self.assertEqual(feature["geometry"]["coordinates"], [13.3846, 52.5323])
+        self.assertEqual(feature["properties"]["name"], "John")
+        empty = io.StringIO()
+        self.assertEqual(write_geojson([], empty), (0, 0))
+        self.assertEqual(json.loads(empty.getvalue())["features"], [])
+
+    def test_export_map_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "links.csv")
+            with patch("questionary.select") as mock_select, \
+                    patch("questionary.text") as mock_text:
+                mock_select.return_value.ask.return_value = "Map links (CSV)"
+                mock_text.return_value.ask.return_value = path
+                result = self.book.export_map()
+            self.assertIn("Exported 2 address(es)", result)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(len(file.readlines()), 3)
+            with patch("questionary.select") as mock_select, \
+                    patch("questionary.text") as mock_text:
+                mock_select.return_value.ask.return_value = "GeoJSON"
+                mock_text.return_value.ask.return_value = os.path.join(tmp, "map.geojson")
+                result = self.book.export_map()
+            self.assertIn("Exported 1 address(es)", result)
+            self.assertIn("1 address(es) not found", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
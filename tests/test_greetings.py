@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.greetings import (
+    DEFAULT_GREETINGS_FILE,
+    GreetingsProvider,
+    GreetingTemplate,
+    get_greetings_provider,
+    system_locale,
+)
+
+
+class TestGreetingsProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False, encoding="utf-8")
+        self.tmp.write(
+            "Happy birthday, {name}!\n"
+            "\n"
+            "[formal]\n"
+            "Dear {name}, congratulations on your birthday.\n"
+            "[uk]\n"
+            "З днем народження, {name}!\n"
+        )
+        self.tmp.close()
+
+    def tearDown(self):
+        os.remove(self.tmp.name)
+
+    def test_template_formats_every_placeholder(self):
+        template = GreetingTemplate.parse("{name}, hi {name}!")
+        self.assertEqual(template.format("Ann"), "Ann, hi Ann!")
+
+    def test_sections_are_indexed_by_tag(self):
+        provider = GreetingsProvider(self.tmp.name)
+        self.assertEqual(provider.tags(), ["default", "formal", "uk"])
+        self.assertEqual(len(provider.templates()), 3)
+        self.assertEqual(
+            provider.suggest("Ann", tag="formal"),
+            ["Dear Ann, congratulations on your birthday."])
+        self.assertEqual(len(provider.templates("unknown")), 3)
+
+    def test_select_tag(self):
+        provider = GreetingsProvider(self.tmp.name)
+        self.assertEqual(provider.select_tag(["client", "Formal"], "uk"), "formal")
+        self.assertEqual(provider.select_tag(["client"], "uk"), "uk")
+        self.assertIsNone(provider.select_tag(["client"], "en"))
+
+    def test_system_locale(self):
+        with patch("locale.getlocale", return_value=("uk_UA", "UTF-8")):
+            self.assertEqual(system_locale(), "uk")
+        with patch("locale.getlocale", return_value=(None, None)):
+            self.assertIsNone(system_locale())
+
+    def test_file_is_read_once(self):
+        provider = GreetingsProvider(self.tmp.name)
+        with patch("builtins.open", wraps=open) as mock_open:
+            for _ in range(10):
+                provider.suggest("Ann")
+        self.assertEqual(mock_open.call_count, 1)
+
+    def test_reloads_when_file_changes(self):
+        provider = GreetingsProvider(self.tmp.name)
+        self.assertEqual(len(provider.templates()), 3)
+        with open(self.tmp.name, "a", encoding="utf-8") as file:
+            file.write("Another one for {name}!\n")
+        stat = os.stat(self.tmp.name)
+        os.utime(self.tmp.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(len(provider.templates("uk")), 2)
+
+    def test_default_file_is_shared(self):
+        provider = get_greetings_provider()
+        self.assertIs(provider, get_greetings_provider(DEFAULT_GREETINGS_FILE))
+        self.assertIn("uk", provider.tags())
+
+
+if __name__ == "__main__":
+    unittest.main()
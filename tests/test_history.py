@@ -0,0 +1,170 @@
+import pickle
+import unittest
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import ContactChange
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.history import History, Operation
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.session import Session
+
+questionary_select_path = "src.district_9_personal_assistant.selection.questionary.select"
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.values = []
+        self.history = History(limit=3)
+
+    def push(self, value):
+        self.values.append(value)
+        self.history.record(Operation(
+            f"push {value}", self.values.pop, lambda: self.push(value)))
+
+    def test_ring_buffer_drops_oldest(self):
+        for value in range(5):
+            self.push(value)
+        self.assertEqual(len(self.history), 3)
+        for _ in range(3):
+            self.history.undo()
+        self.assertEqual(self.values, [0, 1])
+        with self.assertRaises(IndexError):
+            self.history.undo()
+
+    def test_redo_and_new_operation_clears_redo(self):
+        self.push(1)
+        self.push(2)
+        self.assertEqual(self.history.undo(), "push 2")
+        self.assertEqual(self.history.redo(), "push 2")
+        self.assertEqual(self.values, [1, 2])
+        self.assertEqual(len(self.history), 2)
+        self.history.undo()
+        self.push(3)
+        self.assertFalse(self.history.can_redo())
+
+    def test_group_is_one_operation(self):
+        with self.history.group("push many"):
+            self.push(1)
+            with self.history.group("inner"):
+                self.push(2)
+        self.assertEqual(len(self.history), 1)
+        self.history.undo()
+        self.assertEqual(self.values, [])
+        self.history.redo()
+        self.assertEqual(self.values, [1, 2])
+
+
+class TestBookUndo(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.john = self.book.create_contact("John")
+        self.jane = self.book.create_contact("Jane")
+        self.john.add_field(Address("Ukraine", "Kyiv", "Main St", "01001"))
+        self.john.add_field(Note("Call back", "Todo", "work"))
+        self.book._active_contact = self.john
+
+    def test_undo_delete_contact_restores_it_in_place(self):
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "0: John"
+            with patch("questionary.text") as mock_text:
+                mock_text.return_value.ask.return_value = "John"
+                self.book.delete_contact()
+        self.assertIsNone(self.book.get_contact("John"))
+        self.assertIn("Undone: delete contact John", self.book.undo())
+        self.assertEqual(self.book.contacts, [self.john, self.jane])
+        self.assertFalse(self.john.removed)
+        self.assertEqual([c for c, _ in self.book.find_by_locality(city="Kyiv")], [self.john])
+        self.assertEqual(list(self.book.query("tag:work")), [self.john])
+        self.assertIn("Redone", self.book.redo())
+        self.assertEqual(self.book.contacts, [self.jane])
+        self.assertIn("Nothing to redo", self.book.redo())
+
+    def test_undo_note_and_address_changes(self):
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "0: Todo"
+            self.book.delete_note()
+        self.book.undo()
+        self.assertEqual(self.john.notes[0].tags_list, ["work"])
+
+        address = self.john.addresses[0]
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.side_effect = ["Ukraine", "Lviv", "Main St", "79000"]
+            self.assertIn("updated", self.book.edit_address())
+        self.assertEqual(self.book.count_by_locality(city="Lviv").contacts, 1)
+        self.book.undo()
+        self.assertEqual((address.city, address.zip_code), ("Kyiv", "01001"))
+        self.assertEqual(self.book.count_by_locality(city="Lviv").contacts, 0)
+        self.assertEqual(self.book.count_by_locality(city="Kyiv").contacts, 1)
+        self.book.redo()
+        self.assertEqual(address.city, "Lviv")
+
+    def test_undo_main_items_and_birthday(self):
+        first = Phone(number="+4912345678901", is_main=True)
+        second = Phone(number="+4912345678902", is_main=True)
+        self.john.add_field(first)
+        self.john.add_field(second)
+        self.assertIs(self.john.main_phone, second)
+        self.book.undo()
+        self.assertIs(self.john.main_phone, first)
+        self.assertTrue(first.is_main)
+        self.assertFalse(self.john.has_phone(second.number))
+        self.john.add_field(Email("john@example.com"))
+        self.book.set_birthday(self.john, "01.01.1990")
+        self.book.set_birthday(self.john, "02.02.1990")
+        self.book.undo()
+        self.assertEqual(self.john.birthday.value, "01.01.1990")
+        self.book.undo()
+        self.assertIsNone(self.john.birthday)
+        self.assertEqual(self.book.next_n_birthdays(5), [])
+
+    def test_undo_merge_in_one_step(self):
+        self.jane.add_field(Phone(number="+4912345678901"))
+        self.book.merge_into(self.john, self.jane)
+        self.assertEqual(len(self.john.phones), 1)
+        self.assertIn("merge contact Jane into John", self.book.undo())
+        self.assertEqual(self.john.phones, [])
+        self.assertEqual(self.book.get_contact("Jane").phones[0].number, "+4912345678901")
+
+    def test_failed_undo_stays_in_log(self):
+        self.book.rename_contact(self.jane, "Janet")
+        self.john.name.value = "Jane"
+        self.john.notify(ContactChange.NAME)
+        self.assertIn("Cannot undo", self.book.undo())
+        self.john.name.value = "John"
+        self.john.notify(ContactChange.NAME)
+        self.assertIn("Undone: rename contact Jane to Janet", self.book.undo())
+
+    def test_each_session_undoes_its_own_changes(self):
+        first, second = Session("first"), Session("second")
+        with first.activate():
+            self.book.rename_contact(self.jane, "Janet")
+        with second.activate():
+            self.john.add_field(Phone(number="+4912345678901"))
+            self.book.create_contact("Bob")
+        with first.activate():
+            self.assertIn("Undone: rename contact Jane to Janet", self.book.undo())
+            self.assertIn("Nothing to undo", self.book.undo())
+        self.assertIsNotNone(self.book.get_contact("Bob"))
+        self.assertTrue(self.john.has_phone("+4912345678901"))
+        with second.activate():
+            self.assertIn("Undone: add contact Bob", self.book.undo())
+            self.assertIn("Undone: add phone", self.book.undo())
+            self.assertIn("Redone: add phone", self.book.redo())
+        self.assertEqual(self.jane.name.value, "Jane")
+        self.assertIn("Undone: add note", self.book.undo())
+        self.book.end_session(second)
+        with second.activate():
+            self.assertIn("Nothing to redo", self.book.redo())
+
+    def test_history_is_not_pickled(self):
+        restored = pickle.loads(pickle.dumps(self.book))
+        self.assertIn("Nothing to undo", restored.undo())
+        restored.contacts[0].add_field(Phone(number="+4912345678901"))
+        self.assertIn("Undone: add phone +4912345678901", restored.undo())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.locality_index import LocalityIndex, RegionCount
+from src.district_9_personal_assistant.name import Name
+
+
+def answers(*values):
+    return [Mock(ask=lambda value=value: value) for value in values]
+
+
+class TestLocalityIndex(unittest.TestCase):
+    def setUp(self):
+        self.ann = Contact(name=Name("Ann"))
+        self.ann.addresses = [
+            Address("Ukraine", "Kyiv", "Khreshchatyk 1", "01001"),
+            Address("Ukraine", "Kyiv", "Sahaidachnoho 5", "04070"),
+        ]
+        self.bob = Contact(name=Name("Bob"))
+        self.bob.addresses = [
+            Address("Germany", "Berlin", "Main St", "10115"),
+            Address("Ukraine", "Lviv", "Rynok 1", "79000"),
+        ]
+        self.index = LocalityIndex([self.ann, self.bob])
+
+    def test_find_by_any_level(self):
+        self.assertEqual(self.index.contacts(city="kyiv"), [self.ann])
+        self.assertEqual(self.index.contacts(zip_code="10115"), [self.bob])
+        self.assertEqual(self.index.contacts(country="ukraine"), [self.ann, self.bob])
+        self.assertEqual(len(self.index.find(country="UKRAINE", city="Kyiv")), 2)
+        self.assertEqual(self.index.find(country="Germany", city="Kyiv"), [])
+
+    def test_counts_per_region(self):
+        self.assertEqual(self.index.count(), RegionCount(2, 4))
+        self.assertEqual(self.index.count(country="Ukraine"), RegionCount(2, 3))
+        self.assertEqual(self.index.regions(), {
+            "GERMANY": RegionCount(1, 1), "UKRAINE": RegionCount(2, 3)})
+        self.assertEqual(self.index.regions("Ukraine"), {
+            "Kyiv": RegionCount(1, 2), "Lviv": RegionCount(1, 1)})
+        self.assertEqual(list(self.index.regions(city="Kyiv")), ["01001", "04070"])
+
+    def test_update_and_remove(self):
+        self.bob.addresses[1].update({"city": "Kyiv", "zip_code": "01001"})
+        self.index.update(self.bob)
+        self.assertEqual(self.index.regions("Ukraine"), {"Kyiv": RegionCount(2, 3)})
+        self.index.remove(self.ann)
+        self.assertEqual(self.index.count(city="Kyiv"), RegionCount(1, 1))
+        self.index.remove(self.bob)
+        self.assertEqual(self.index.regions(), {})
+        self.assertEqual(self.index.count(), RegionCount(0, 0))
+
+
+class TestFindByLocation(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        for name, city, zip_code in (("John", "Berlin", "10115"), ("Jane", "Hamburg", "20095")):
+            self.book._active_contact = self.book.create_contact(name)
+            with patch("questionary.text") as mock_text:
+                mock_text.side_effect = answers("Germany", city, "Main St", zip_code)
+                self.book.add_address()
+        self.book._active_contact = None
+
+    def test_index_follows_address_commands(self):
+        self.assertEqual(self.book.count_by_locality(city="Berlin"), RegionCount(1, 1))
+        john = self.book.get_contact("John")
+        self.book._active_contact = john
+        with patch("src.district_9_personal_assistant.selection.questionary.select"), \
+                patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("Germany", "Hamburg", "Main St", "20095")
+            self.assertIn("updated", self.book.edit_address())
+            mock_text.side_effect = answers("Germany", "Berlin", "Main St", "!")
+            self.assertIn("Error", self.book.edit_address())
+        self.assertEqual(john.addresses[0].city, "Hamburg")
+        self.assertEqual(self.book.region_counts("Germany"), {"Hamburg": RegionCount(2, 2)})
+        with patch("src.district_9_personal_assistant.selection.questionary.select"):
+            self.book.delete_address()
+        self.assertEqual(self.book.count_by_locality(zip_code="20095"), RegionCount(1, 1))
+
+    def test_find_by_location_command(self):
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("germany", "", "")
+            result = self.book.find_by_location()
+        self.assertIn("2 contact(s), 2 address(es) in germany", result)
+        self.assertIn("John: Main St, Berlin, 10115, GERMANY", result)
+        self.assertIn("Hamburg: 1 contact(s), 1 address(es)", result)
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("", "", "")
+            self.assertIn("GERMANY: 2 contact(s)", self.book.find_by_location())
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("", "", "99999")
+            self.assertIn("No contacts found in 99999", self.book.find_by_location())
+
+
+if __name__ == "__main__":
+    unittest.main()
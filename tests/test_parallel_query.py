@@ -0,0 +1,54 @@
+import unittest
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.parallel_query import (
+    AddressContains,
+    EmailContains,
+    HasTag,
+    NameContains,
+    NoteContains,
+    ParallelQueryExecutor,
+    PhoneContains,
+)
+from src.district_9_personal_assistant.phone import Phone
+
+
+class TestParallelQueryExecutor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.book = AddressBook()
+        for i in range(300):
+            contact = cls.book.create_contact(f"Contact {i}")
+            contact.add_field(Phone(number=f"+4912345{i:05d}"))
+            contact.add_field(Email(address=f"c{i}@{'corp' if i % 3 == 0 else 'home'}.com"))
+            if i % 5 == 0:
+                contact.add_field(Note("Quarterly review", "Review", "client, vip"))
+            if i % 7 == 0:
+                contact.add_field(Address("Germany", "Berlin", "Main St", "10115"))
+
+    def serial(self, predicate):
+        return [c for c in self.book.contacts if predicate(c)]
+
+    def test_parallel_results_match_serial_scan(self):
+        predicates = [
+            HasTag("VIP"),
+            NoteContains("review") & EmailContains("@corp.com"),
+            AddressContains("berlin") | PhoneContains("+49 12345 00001"),
+            NameContains("contact 29"),
+        ]
+        with ParallelQueryExecutor(self.book.contacts, workers=2, threshold=0) as executor:
+            for predicate in predicates:
+                self.assertEqual(executor.search(predicate), self.serial(predicate))
+            self.assertEqual(executor.count(HasTag("client")), 60)
+
+    def test_small_books_are_scanned_in_process(self):
+        with self.book.parallel_executor(workers=4) as executor:
+            self.assertEqual(len(executor.search(AddressContains("10115"))), 43)
+            self.assertIsNone(executor._pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 
 from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.phone import Phone
 
 
 class TestPhoneBookFlows(unittest.TestCase):
@@ -79,6 +80,36 @@ class TestPhoneBookFlows(unittest.TestCase):
         self.assertTrue(phones[1].is_main)
         self.assertFalse(phones[0].is_main)
 
+    @patch("src.district_9_personal_assistant.selection.questionary.select")
+    def test_duplicate_phones_are_rejected(self, mock_select):
+        contact = self.book._active_contact
+        with patch("questionary.text") as mock_text, patch("questionary.confirm") as mock_confirm:
+            mock_confirm.return_value.ask.return_value = False
+            mock_text.return_value.ask.return_value = "+4912345678901"
+            self.book.add_phone()
+            mock_text.return_value.ask.return_value = "+49 123 456 789 01"
+            self.assertIn("already exists", self.book.add_phone())
+            mock_text.return_value.ask.return_value = "+4912345678902"
+            self.book.add_phone()
+        self.assertEqual(len(contact.phones), 2)
+
+        mock_select.return_value.ask.return_value = "1: +4912345678902"
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "+4912345678901"
+            self.assertIn("already exists", self.book.edit_phone())
+            self.assertEqual(contact.phones[1].number, "+4912345678902")
+            mock_text.return_value.ask.return_value = "invalid"
+            self.assertIn("Invalid phone number", self.book.edit_phone())
+            self.assertTrue(contact.has_phone("+4912345678902"))
+            mock_text.return_value.ask.return_value = "+4912345678903"
+            self.book.edit_phone()
+        self.assertFalse(contact.has_phone("+4912345678902"))
+
+        mock_select.return_value.ask.return_value = "0: +4912345678901"
+        self.book.delete_phone()
+        self.assertIn("added", contact.add_field(Phone(number="+4912345678901")))
+        self.assertIn("already exists", contact.add_field(Phone(number="+4912345678903")))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,163 @@
+import pickle
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.birthday_index import BirthdayIndex
+from src.district_9_personal_assistant.email import Email
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.query import (
+    BirthdayWithin,
+    CityIs,
+    HasField,
+    NamePrefix,
+    parse_query,
+)
+
+
+class TestParseQuery(unittest.TestCase):
+    def test_terms(self):
+        query = parse_query('jo city:"New York" tag:Client birthday:next30d HAS:Email',
+                            today=date(2025, 1, 1))
+        self.assertEqual([t.field for t in query.terms],
+                         ["name", "city", "tag", "birthday", "has"])
+        self.assertEqual(query.terms[0].predicate, NamePrefix("jo"))
+        self.assertEqual(query.terms[1].predicate, CityIs("New York"))
+        self.assertEqual(query.terms[3].predicate, BirthdayWithin(date(2025, 1, 1), 30))
+        self.assertEqual(query.terms[4].predicate, HasField("email"))
+        self.assertEqual(str(query), "name:jo city:New York tag:Client birthday:next30d has:email")
+
+    def test_invalid_queries(self):
+        invalid = ("", "colour:red", "city:", "birthday:soon", "has:fax", "phone:abc", 'city:"x')
+        for text in invalid:
+            with self.assertRaises(ValueError, msg=text):
+                parse_query(text)
+
+
+class TestAddressBookQuery(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        soon = date.today() + timedelta(days=5)
+        for i in range(60):
+            contact = self.book.create_contact(f"Contact {i}")
+            contact.add_field(Phone(number=f"+4930{i:07d}"))
+            if i % 2 == 0:
+                contact.add_field(Email(address=f"c{i}@example.com"))
+            if i % 3 == 0:
+                contact.add_field(Address("Germany", "Berlin", "Main St", "10115"))
+            else:
+                contact.add_field(Address("Germany", "Hamburg", "Port St", "20095"))
+            if i % 10 == 0:
+                contact.add_field(Note("Quarterly review", "Review", "client"))
+        self.book.set_birthday(self.book.contacts[6], soon.replace(year=1996).strftime("%d.%m.%Y"))
+
+    def names(self, text):
+        return [c.name.value for c in self.book.query(text)]
+
+    def serial(self, text):
+        predicate = parse_query(text).predicate
+        return [c.name.value for c in self.book.contacts if predicate(c)]
+
+    def test_results_match_a_full_scan(self):
+        for text in ("city:berlin tag:client", "has:email city:hamburg", "contact 1",
+                     "phone:+49300000001", "birthday:next10d has:address", "email:c4@"):
+            self.assertEqual(sorted(self.names(text)), sorted(self.serial(text)), text)
+        self.assertEqual(self.names("city:berlin tag:client has:email"),
+                         ["Contact 0", "Contact 30"])
+
+    def test_planner_picks_the_most_selective_index(self):
+        plan = self.book.explain_query("city:berlin tag:client has:email")
+        self.assertEqual(plan.driver.field, "tag")
+        self.assertEqual(plan.estimate, 6)
+        self.assertEqual([t.field for t in plan.filters], ["city", "has"])
+        with patch.object(BirthdayIndex, "iter_range") as iter_range:
+            plan = self.book.explain_query("city:berlin birthday:next10d")
+        # Only fetching the candidates walks the range; the estimate counts it.
+        self.assertEqual(iter_range.call_count, 1)
+        self.assertEqual((plan.driver.field, plan.estimate), ("birthday", 1))
+        plan = self.book.explain_query("has:email note:review")
+        self.assertIsNone(plan.driver)
+        self.assertTrue(str(plan).startswith("full scan"))
+
+    def test_indexed_queries_only_check_candidates(self):
+        checked = []
+        original = CityIs.__call__
+
+        def spy(predicate, contact):
+            checked.append(contact)
+            return original(predicate, contact)
+
+        with patch.object(CityIs, "__call__", spy):
+            self.assertEqual(len(self.names("tag:client city:berlin")), 2)
+        self.assertEqual(len(checked), 6)
+
+    def test_indexes_follow_changes(self):
+        self.assertEqual(self.names("city:paris"), [])
+        contact = self.book.contacts[1]
+        contact.add_field(Address("France", "Paris", "Rue Lepic", "75018"))
+        self.book.rename_contact(contact, "Zoe Smith")
+        self.assertEqual(self.names("city:paris"), ["Zoe Smith"])
+        self.assertEqual(self.names("smi"), ["Zoe Smith"])
+        self.assertEqual(self.names("contact 1"), [f"Contact {i}" for i in range(10, 20)])
+        self.book.remove_contact(contact)
+        self.assertEqual(self.names("city:paris"), [])
+        self.assertEqual(self.names("birthday:next10d"), ["Contact 6"])
+        self.book.set_birthday(self.book.contacts[6], "01.01.1990")
+        self.assertEqual(self.names("birthday:next10d"), self.serial("birthday:next10d"))
+
+    def test_prefix_keys_are_kept_sorted_without_resorting(self):
+        self.assertEqual(len(self.names("contact")), 60)
+        with patch("src.district_9_personal_assistant.contact_index.sorted",
+                   side_effect=AssertionError("re-sorted"), create=True):
+            zoe = self.book.create_contact("Zoe Adams")
+            self.book.rename_contact(self.book.contacts[1], "Adam Smith")
+            self.book.remove_contact(self.book.contacts[2])
+            zoe.add_field(Phone(number="+4930999999"))
+            self.assertEqual(sorted(self.names("ada")), ["Adam Smith", "Zoe Adams"])
+            self.assertEqual(self.names("phone:+4930999"), ["Zoe Adams"])
+            self.assertEqual(len(self.names("contact")), 58)
+            self.book.remove_contact(zoe)
+            self.assertEqual(self.names("ada"), ["Adam Smith"])
+            self.assertEqual(self.names("zoe"), [])
+
+    def test_get_contact_uses_name_index(self):
+        contact = self.book.contacts[1]
+        with patch.object(self.book, "contacts", []):
+            self.assertIs(self.book.get_contact("CONTACT 1"), contact)
+            self.assertIsNone(self.book.get_contact("Contact"))
+        self.book.rename_contact(contact, "Zoe Smith")
+        self.assertIsNone(self.book.get_contact("Contact 1"))
+        self.assertIs(self.book.get_contact("zoe smith"), contact)
+        with self.assertRaises(ValueError):
+            self.book.create_contact("ZOE SMITH")
+        self.book.remove_contact(contact)
+        self.assertIsNone(self.book.get_contact("Zoe Smith"))
+        self.assertEqual(self.book.create_contact("Zoe Smith").name.value, "Zoe Smith")
+
+    def test_pickle_drops_indexes_and_keeps_them_updated(self):
+        self.names("city:berlin")
+        restored = pickle.loads(pickle.dumps(self.book))
+        self.assertIsNone(restored._indexes)
+        self.assertEqual(len(list(restored.query("city:berlin"))), 20)
+        restored.contacts[1].add_field(Address("Germany", "Berlin", "New St", "10117"))
+        self.assertIn("Contact 1", [c.name.value for c in restored.query("city:berlin")])
+
+    def test_query_command(self):
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "tag:client city:berlin"
+            result = self.book.query_contacts()
+        self.assertIn("1. Contact 0", result)
+        self.assertIn("2. Contact 30", result)
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "colour:red"
+            self.assertIn("Invalid query", self.book.query_contacts())
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "city:paris"
+            self.assertIn("No contacts match", self.book.query_contacts())
+
+
+if __name__ == "__main__":
+    unittest.main()
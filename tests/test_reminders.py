@@ -0,0 +1,168 @@
+import io
+import threading
+import unittest
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.birthday import Birthday
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.reminders import BirthdayScheduler, StdoutSink
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FailingSink(StdoutSink):
+    """
+    Writes reminders to a stream, but fails to deliver those of one contact.
+    """
+
+    def __init__(self, stream, fail_for: str):
+        super().__init__(stream)
+        self.fail_for = fail_for
+        self.attempts = threading.Event()
+
+    def emit(self, event):
+        self.attempts.set()
+        if event.contact.name.value == self.fail_for:
+            raise OSError("Connection refused")
+        super().emit(event)
+
+
+def make_contact(name: str, birthday: str = "") -> Contact:
+    contact = Contact(name=Name(name))
+    if birthday:
+        contact.birthday = Birthday(birthday)
+    return contact
+
+
+class TestBirthdayOccurrence(unittest.TestCase):
+    def test_leap_day_birthday_in_non_leap_year(self):
+        bday = Birthday("29.02.2000")
+        self.assertEqual(bday.next_occurrence(date(2023, 1, 1)), date(2023, 2, 28))
+        self.assertEqual(bday.next_occurrence(date(2024, 1, 1)), date(2024, 2, 29))
+
+    def test_next_occurrence_wraps_to_next_year(self):
+        bday = Birthday("15.03.1990")
+        self.assertEqual(bday.next_occurrence(date(2025, 3, 16)), date(2026, 3, 15))
+        self.assertEqual(bday.next_occurrence(date(2025, 3, 15)), date(2025, 3, 15))
+
+
+class TestBirthdayScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(datetime(2025, 6, 1, 8, 0))
+        self.stream = io.StringIO()
+        self.ann = make_contact("Ann", "02.06.1990")
+        self.bob = make_contact("Bob", "10.06.1985")
+        self.scheduler = BirthdayScheduler(
+            [self.bob, make_contact("NoBday"), self.ann],
+            StdoutSink(self.stream),
+            remind_at=time(9, 0),
+            now=self.clock,
+        )
+
+    def test_next_event_is_earliest(self):
+        self.assertIs(self.scheduler.peek().contact, self.ann)
+        self.assertEqual(self.scheduler.seconds_until_next(), 25 * 3600)
+
+    def test_emits_due_events_and_reschedules(self):
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.clock.now = datetime(2025, 6, 2, 9, 0)
+        fired = self.scheduler.run_pending()
+        self.assertEqual([e.contact for e in fired], [self.ann])
+        self.assertIn("Ann's birthday (turns 35)", self.stream.getvalue())
+        self.assertIs(self.scheduler.peek().contact, self.bob)
+
+    def test_reschedule_and_unschedule(self):
+        self.ann.birthday = Birthday("20.06.1990")
+        self.scheduler.schedule(self.ann)
+        self.scheduler.unschedule(self.bob)
+        self.clock.now = datetime(2025, 6, 30)
+        fired = self.scheduler.run_pending()
+        self.assertEqual([(e.contact, e.when) for e in fired], [(self.ann, date(2025, 6, 20))])
+
+    def test_reset_does_not_repeat_emitted_reminders(self):
+        self.clock.now = datetime(2025, 6, 2, 10, 0)
+        self.assertEqual([e.contact for e in self.scheduler.run_pending()], [self.ann])
+        self.scheduler.reset([self.ann, self.bob])
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.assertIs(self.scheduler.peek().contact, self.bob)
+
+    def test_failed_delivery_is_reported_and_skipped(self):
+        sink = FailingSink(self.stream, fail_for="Ann")
+        scheduler = BirthdayScheduler(
+            [self.ann, self.bob], sink, remind_at=time(9, 0), now=self.clock)
+        self.clock.now = datetime(2025, 6, 11)
+        with patch("builtins.print") as mock_print:
+            fired = scheduler.run_pending()
+        self.assertEqual([e.contact for e in fired], [self.bob])
+        self.assertIn("Bob's birthday", self.stream.getvalue())
+        self.assertIn("Ann's birthday", mock_print.call_args.args[0])
+        self.assertEqual(scheduler.peek().when, date(2026, 6, 2))
+
+    def test_thread_keeps_running_after_failed_delivery(self):
+        stream = io.StringIO()
+        sink = FailingSink(stream, fail_for="Ann")
+        today = date.today()
+        ann = make_contact("Ann", today.replace(year=1992).strftime("%d.%m.%Y"))
+        scheduler = BirthdayScheduler([ann], sink, remind_at=time(0, 0))
+        with patch("builtins.print"):
+            scheduler.start()
+            sink.attempts.wait(1)
+            bob = make_contact("Bob", today.replace(year=1990).strftime("%d.%m.%Y"))
+            scheduler.schedule(bob)
+            for _ in range(100):
+                if "Bob's birthday" in stream.getvalue():
+                    break
+                threading.Event().wait(0.01)
+            scheduler.stop()
+        self.assertIn("Bob's birthday", stream.getvalue())
+
+    def test_since_skips_reminders_already_shown(self):
+        self.clock.now = datetime(2025, 6, 2, 10, 0)
+        scheduler = BirthdayScheduler(
+            [self.ann, self.bob], StdoutSink(self.stream), remind_at=time(0, 0),
+            now=self.clock, since=self.clock.now)
+        self.assertEqual(scheduler.run_pending(), [])
+        self.assertIs(scheduler.peek().contact, self.bob)
+
+
+def birthday_in(days: int) -> str:
+    return (date.today() + timedelta(days=days)).replace(year=1992).strftime("%d.%m.%Y")
+
+
+class TestBookReminders(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.ann = self.book.create_contact("Ann")
+        self.book.set_birthday(self.ann, birthday_in(10))
+        self.scheduler = self.book.start_reminders(StdoutSink(io.StringIO()))
+        self.addCleanup(self.book.stop_reminders)
+
+    def test_scheduler_follows_book_changes(self):
+        self.assertIs(self.scheduler.peek().contact, self.ann)
+        bob = self.book.create_contact("Bob")
+        self.book.set_birthday(bob, birthday_in(5))
+        self.assertIs(self.scheduler.peek().contact, bob)
+        self.book.remove_contact(bob)
+        self.assertIs(self.scheduler.peek().contact, self.ann)
+        self.book.set_birthday(self.ann, birthday_in(3))
+        self.assertEqual(self.scheduler.peek().when, date.today() + timedelta(days=3))
+        self.assertIs(self.book.start_reminders(StdoutSink()), self.scheduler)
+
+    def test_stop_detaches_scheduler(self):
+        self.book.stop_reminders()
+        self.assertIsNone(self.book._reminders)
+        self.book.create_contact("Bob")
+        self.assertIs(self.scheduler.peek().contact, self.ann)
+
+
+if __name__ == "__main__":
+    unittest.main()
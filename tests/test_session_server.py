@@ -0,0 +1,83 @@
+import os
+import re
+import socket
+import tempfile
+import time
+import unittest
+
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.session_server import SessionServer
+
+
+def strip_ansi(text):
+    return re.sub(r"\x1b\[[0-9;?]*[a-zA-Z]", "", text)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+class TestSessionServer(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        self.book.create_contact("John Doe")
+        self.book.create_contact("Jane Roe")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.server = SessionServer(self.book, os.path.join(self.tmp_dir.name, "book.sock"))
+        self.server.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def connect(self):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.clients.append(client)
+        client.connect(self.server.path)
+        client.settimeout(0.2)
+        client.sendall(b"24 80\n")
+        self.read_until(client, "Enter a command")
+        return client
+
+    def read_until(self, client, text, timeout=5.0):
+        output = ""
+        deadline = time.monotonic() + timeout
+        while text not in output and time.monotonic() < deadline:
+            try:
+                data = client.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            output += strip_ansi(data.decode("utf-8", "replace"))
+        self.assertIn(text, output)
+        return output
+
+    def test_sessions_share_book_with_own_active_contact(self):
+        first, second = self.connect(), self.connect()
+        self.assertEqual(len(self.server.sessions), 2)
+
+        first.sendall(b"select_active_contact\r")
+        self.read_until(first, "Select contact")
+        first.sendall(b"\x1b[B\r")
+        self.read_until(first, "Working on the contact: Jane Roe")
+
+        second.sendall(b"show_contacts\r")
+        output = self.read_until(second, "2. Jane Roe")
+        self.assertNotIn("Working on the contact", output)
+
+        active = {s.name: s.active_contact for s in self.server.sessions.values()}
+        self.assertIs(active["client 1"], self.book.contacts[1])
+        self.assertIsNone(active["client 2"])
+        self.assertIsNone(self.book.get_active_contact())
+
+    def test_disconnect_ends_session(self):
+        self.connect().close()
+        deadline = time.monotonic() + 5
+        while self.server.sessions and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.server.sessions, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
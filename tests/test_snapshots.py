@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.encryption import BookKey
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.snapshots import SnapshotStore, take_snapshot
+
+questionary_select_path = "src.district_9_personal_assistant.selection.questionary.select"
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        for i in range(50):
+            self.book.create_contact(f"Contact {i}")
+        self.john = self.book.create_contact("John")
+        self.john.add_field(Phone(number="+4912345678901", is_main=True))
+        self.john.add_field(Address("Ukraine", "Kyiv", "Main St", "01001"))
+        self.john.add_field(Note("Call back", "Todo", "work"))
+        self.book.set_birthday(self.john, "01.01.1990")
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def count_objects(self):
+        return sum(len(files) for _, _, files in os.walk(os.path.join(self.dir.name, "objects")))
+
+    def test_unchanged_contacts_and_buckets_are_shared(self):
+        first = self.book.snapshot()
+        self.book.get_contact("Contact 1").add_field(Phone(number="+4912345678902"))
+        self.book.remove_contact(self.book.get_contact("Contact 2"))
+        self.book.create_contact("Jane")
+        second = self.book.snapshot()
+        self.assertIs(first.get("john"), second.get("JOHN"))
+        shared = sum(old is new for old, new in zip(first.buckets, second.buckets))
+        self.assertGreaterEqual(shared, len(first.buckets) - 3)
+        changes = first.diff(second)
+        self.assertEqual([v.key for v in changes.added], ["jane"])
+        self.assertEqual([v.key for v in changes.removed], ["contact 2"])
+        self.assertEqual([new.key for _, new in changes.changed], ["contact 1"])
+        self.assertFalse(second.diff(self.book.snapshot()))
+
+    def test_snapshot_is_immutable_copy(self):
+        snapshot = self.book.snapshot()
+        self.book.rename_contact(self.john, "Johnny")
+        restored = snapshot.get("John").to_contact()
+        self.assertEqual(restored.name.value, "John")
+        self.assertIs(restored.main_phone, restored.phones[0])
+        self.assertEqual(restored.notes[0].tags_list, ["work"])
+        self.assertEqual(restored.birthday.value, "01.01.1990")
+        self.assertEqual(restored.to_dict(), snapshot.get("John").to_contact().to_dict())
+        self.assertIsNone(snapshot.get("Johnny"))
+
+    def test_store_deduplicates_and_diffs(self):
+        store = SnapshotStore(self.dir.name)
+        contacts = self.book.snapshot_contacts()
+        first = take_snapshot(contacts, created=datetime(2026, 1, 1))
+        store.save(first)
+        objects = self.count_objects()
+        self.john.add_field(Phone(number="+4912345678902"))
+        second = take_snapshot(contacts, first, created=datetime(2026, 1, 2))
+        store.save(second)
+        self.assertEqual(self.count_objects(), objects + 2)
+        self.assertEqual(store.list_snapshots(), [first.snapshot_id, second.snapshot_id])
+
+        changes = SnapshotStore(self.dir.name).diff(first.snapshot_id, second.snapshot_id)
+        self.assertEqual(str(changes), "~ John")
+        loaded = store.load(first.snapshot_id)
+        self.assertEqual(len(loaded), len(first))
+        self.assertIs(loaded.get("Contact 0"), store.load(second.snapshot_id).get("Contact 0"))
+        with self.assertRaises(KeyError):
+            store.load("19990101T000000000000")
+
+    def test_diff_with_stored_reads_only_changes(self):
+        store = SnapshotStore(self.dir.name)
+        store.save(self.book.snapshot())
+        stored = store.list_snapshots()[-1]
+        self.john.add_field(Phone(number="+4912345678902"))
+        self.book.remove_contact(self.book.get_contact("Contact 3"))
+        store = SnapshotStore(self.dir.name)
+        with patch.object(SnapshotStore, "_read", autospec=True,
+                          side_effect=SnapshotStore._read) as mock_read:
+            changes = store.diff_with(stored, self.book.snapshot())
+        self.assertEqual(str(changes), "- Contact 3\n~ John")
+        # The manifest, two bucket listings and the old versions of John and Contact 3.
+        self.assertEqual(mock_read.call_count, 5)
+
+    def test_snapshot_commands(self):
+        with patch.object(AddressBook, "_get_snapshot_dir", return_value=self.dir.name):
+            self.assertIn("No snapshots found", self.book.diff_snapshots())
+            self.assertIn("with 51 contact(s)", self.book.take_snapshot())
+            self.book.create_contact("Jane")
+            result = self.book.take_snapshot()
+            self.assertIn("1 added, 0 removed, 0 changed", result)
+            self.book.remove_contact(self.john)
+            stored = SnapshotStore(self.dir.name).list_snapshots()
+            with patch(questionary_select_path) as mock_select:
+                mock_select.return_value.ask.side_effect = [f"0: {stored[0]}", "1: Current book"]
+                self.assertEqual(self.book.diff_snapshots(), "+ Jane\n- John")
+
+    def test_diffed_snapshot_is_stored_in_full(self):
+        store = SnapshotStore(self.dir.name)
+        first = store.save(self.book.snapshot())
+        self.book.create_contact("Jane")
+        snapshot = self.book.snapshot()
+        store.diff_with(first, snapshot)
+        second = store.save(snapshot)
+        self.assertEqual(str(SnapshotStore(self.dir.name).diff(first, second)), "+ Jane")
+
+    def test_snapshots_of_encrypted_book_are_encrypted(self):
+        self.book._key = BookKey.derive("secret")
+        with patch.object(AddressBook, "_get_snapshot_dir", return_value=self.dir.name):
+            self.book.take_snapshot()
+            self.book.create_contact("Jane")
+            self.assertIn("1 added", self.book.take_snapshot())
+            directory = self.book._get_snapshot_store().directory
+            stored = SnapshotStore(directory, self.book._key).list_snapshots()
+            with patch(questionary_select_path) as mock_select:
+                mock_select.return_value.ask.side_effect = [f"0: {stored[0]}", f"0: {stored[1]}"]
+                self.assertEqual(self.book.diff_snapshots(), "+ Jane")
+        self.assertEqual(SnapshotStore(self.dir.name).list_snapshots(), [])
+        data = b""
+        for root, _, files in os.walk(self.dir.name):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as file:
+                    data += file.read()
+        self.assertNotIn(b"4912345678901", data)
+        self.assertNotIn(b"Jane", data)
+        with self.assertRaises(ValueError):
+            SnapshotStore(directory, BookKey.derive("other")).load(stored[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
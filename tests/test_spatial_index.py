@@ -0,0 +1,123 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.district_9_personal_assistant.address import Address
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.contact import Contact
+from src.district_9_personal_assistant.geocoding import Coordinates, Geocoder
+from src.district_9_personal_assistant.name import Name
+from src.district_9_personal_assistant.spatial_index import SpatialIndex, distance_km
+
+
+def answers(*values):
+    return [Mock(ask=lambda value=value: value) for value in values]
+
+
+class TestSpatialIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(7)
+        cls.dir = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.dir.name, "gazetteer.csv")
+        points = [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(300)]
+        points += [(0.0, 179.99), (0.0, -179.99), (89.9, 0.0), (89.9, 180.0)]
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("country,city,zip_code,latitude,longitude\n")
+            for i, (lat, lon) in enumerate(points):
+                file.write(f"LAND,City {i},,{lat},{lon}\n")
+        cls.geocoder = Geocoder(path)
+        cls.contacts = []
+        for i in range(len(points)):
+            contact = Contact(name=Name(f"Contact {i}"))
+            contact.addresses = [Address("Land", f"City {i}", "Street 1", "00001")]
+            cls.contacts.append(contact)
+        cls.contacts[0].addresses.append(Address("Nowhere", "Unknown", "Street 1", "00001"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def setUp(self):
+        self.index = SpatialIndex(self.contacts, self.geocoder, cell_degrees=2)
+
+    def brute_force(self, center):
+        return sorted(
+            (distance_km(center, self.geocoder.locate(c.addresses[0])), c.name.value)
+            for c in self.contacts
+        )
+
+    def test_matches_brute_force(self):
+        self.assertEqual(len(self.index), len(self.contacts))
+        for center in (Coordinates(50.45, 30.52), Coordinates(0, 180), Coordinates(89, 90)):
+            expected = self.brute_force(center)
+            within = self.index.within(center, 1500)
+            self.assertEqual(sorted((n.distance_km, n.contact.name.value) for n in within),
+                             [entry for entry in expected if entry[0] <= 1500])
+            nearest = self.index.nearest(center, 5)
+            self.assertEqual(sorted((n.distance_km, n.contact.name.value) for n in nearest),
+                             expected[:5])
+
+    def test_dateline_and_pole_neighbours(self):
+        found = self.index.within(Coordinates(0.0, 179.99), 10)
+        self.assertEqual(len(found), 2)
+        found = self.index.within(Coordinates(89.9, 90.0), 30)
+        self.assertEqual(len(found), 2)
+
+    def test_updates_and_exclusion(self):
+        moved = self.contacts[1]
+        center = self.geocoder.locate(self.contacts[2].addresses[0])
+        index = SpatialIndex(self.contacts[1:3], self.geocoder)
+        self.assertEqual(index.nearest(center, 1, exclude=self.contacts[2])[0].contact, moved)
+        index.remove(moved)
+        self.assertEqual(index.nearest(center, 5, exclude=self.contacts[2]), [])
+        self.assertEqual(index.nearest(center, 0), [])
+
+
+class TestFindNearby(unittest.TestCase):
+    def setUp(self):
+        self.book = AddressBook()
+        for name, city, zip_code in (("Kyiv", "Kyiv", "01001"), ("Lviv", "Lviv", "79000"),
+                                     ("Berlin", "Berlin", "10115")):
+            contact = self.book.create_contact(name)
+            contact.add_field(Address("Ukraine" if name != "Berlin" else "Germany",
+                                      city, "Main St", zip_code))
+
+    def test_find_nearby_follows_changes(self):
+        kyiv = Coordinates(50.45, 30.52)
+        self.assertEqual([n.contact.name.value for n in self.book.find_nearby(kyiv, count=2)],
+                         ["Kyiv", "Lviv"])
+        self.assertEqual(len(self.book.find_nearby(kyiv, radius_km=600)), 2)
+        self.book._active_contact = self.book.get_contact("Berlin")
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("Ukraine", "Odesa", "Main St", "65000")
+            self.book.add_address()
+        self.assertEqual(len(self.book.find_nearby(kyiv, radius_km=600)), 3)
+        self.book.remove_contact(self.book.get_contact("Lviv"))
+        self.assertEqual(len(self.book.find_nearby(kyiv, radius_km=600)), 2)
+        with self.assertRaises(ValueError):
+            self.book.find_nearby(kyiv)
+
+    def test_find_nearby_command(self):
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("kyiv", "")
+            result = self.book.find_nearby_contacts()
+        self.assertIn("Nearest contacts:", result)
+        self.assertNotIn("Kyiv: ", result)
+        self.assertLess(result.index("Lviv"), result.index("Berlin"))
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("52.52,13.40", "5")
+            result = self.book.find_nearby_contacts()
+        self.assertIn("Berlin: Main St, Berlin, 10115, GERMANY", result)
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("nobody")
+            self.assertIn("Enter a contact name", self.book.find_nearby_contacts())
+        with patch("questionary.text") as mock_text:
+            mock_text.side_effect = answers("kyiv", "-1")
+            self.assertIn("non-negative", self.book.find_nearby_contacts())
+
+
+if __name__ == "__main__":
+    unittest.main()
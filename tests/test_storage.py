@@ -0,0 +1,341 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.district_9_personal_assistant import encryption
+from src.district_9_personal_assistant.address_book import AddressBook
+from src.district_9_personal_assistant.helpers.core_utils import save_book
+from src.district_9_personal_assistant.phone import Phone
+from src.district_9_personal_assistant.note import Note
+from src.district_9_personal_assistant.storage import build_dictionary, read_stamp, shard_of
+from src.district_9_personal_assistant.storage_benchmark import run_storage_benchmark
+
+questionary_select_path = "src.district_9_personal_assistant.selection.questionary.select"
+
+
+class TestConcurrentSaves(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        book = AddressBook()
+        for name in ("John", "Jane", "Bob"):
+            book.create_contact(name)
+        book.save_to_file()
+        # Two terminals working on the same file.
+        self.first = AddressBook.load_from_file()
+        self.second = AddressBook.load_from_file()
+
+    def test_unrelated_changes_are_merged(self):
+        self.first.get_contact("John").add_field(Phone(number="+4912345678901"))
+        self.first.create_contact("Alice")
+        self.assertFalse(self.first.save_to_file().merged)
+
+        self.second.get_contact("Jane").add_field(Phone(number="+4912345678902"))
+        self.second.remove_contact(self.second.get_contact("Bob"))
+        result = self.second.save_to_file()
+        self.assertTrue(result.merged)
+        self.assertEqual(result.conflicts, ())
+        self.assertEqual([c.name.value for c in self.second.contacts], ["John", "Jane", "Alice"])
+        self.assertEqual(self.second.get_contact("John").phones[0].number, "+4912345678901")
+        self.assertEqual(len(list(self.second.query("phone:+4912345678901"))), 1)
+        self.assertFalse(self.second.dirty)
+
+        loaded = AddressBook.load_from_file()
+        self.assertEqual(len(loaded.get_contact("Jane").phones), 1)
+        self.assertIsNone(loaded.get_contact("Bob"))
+        self.assertFalse(self.second.save_to_file().merged)
+
+    def test_conflicts_keep_own_version(self):
+        self.first.get_contact("John").add_field(Phone(number="+4912345678901"))
+        self.first.create_contact("Alice")
+        self.first.remove_contact(self.first.get_contact("Bob"))
+        self.first.save_to_file()
+
+        self.second.get_contact("John").add_field(Phone(number="+4912345678902"))
+        self.second.get_contact("Bob").add_field(Phone(number="+4912345678903"))
+        self.second.create_contact("Alice")
+        self.assertEqual(self.second.save_to_file().conflicts, ("John", "Bob", "Alice"))
+        names = [c.name.value for c in self.second.contacts]
+        self.assertEqual(names, ["John", "Jane", "Bob", "Alice", "Alice (2)"])
+        self.assertEqual(self.second.get_contact("John").phones[0].number, "+4912345678902")
+
+    def test_renamed_contact_is_the_same_contact(self):
+        self.first.rename_contact(self.first.get_contact("John"), "Johnny")
+        self.first.save_to_file()
+        self.second.get_contact("Jane").add_field(Phone(number="+4912345678902"))
+        self.assertEqual(self.second.save_to_file().conflicts, ())
+        self.assertEqual([c.name.value for c in self.second.contacts], ["Johnny", "Jane", "Bob"])
+
+    def test_save_book_warns_about_conflicts(self):
+        self.first.get_contact("John").add_field(Phone(number="+4912345678901"))
+        self.assertIn("Exit. Data saved.", save_book(self.first, "Exit."))
+        self.second.get_contact("John").add_field(Phone(number="+4912345678902"))
+        message = save_book(self.second, "Exit.")
+        self.assertIn("another terminal, this version was kept: John", message)
+        self.assertIn("No changes to save.", save_book(self.second, "Exit."))
+
+    def test_loads_files_without_header(self):
+        book = AddressBook()
+        book.create_contact("John")
+        with open(self.path, "wb") as file:
+            pickle.dump(book, file)
+        self.assertIsNone(read_stamp(self.path))
+        loaded = AddressBook.load_from_file()
+        again = AddressBook.load_from_file()
+        self.assertEqual(loaded.contacts[0].uid, again.contacts[0].uid)
+        loaded.create_contact("Jane")
+        self.assertFalse(loaded.save_to_file().merged)
+        self.assertIsNotNone(read_stamp(self.path))
+        again.create_contact("Bob")
+        self.assertTrue(again.save_to_file().merged)
+        self.assertEqual([c.name.value for c in again.contacts], ["John", "Bob", "Jane"])
+
+
+class TestCompressedStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        self.book = AddressBook()
+        for i in range(200):
+            contact = self.book.create_contact(f"Contact {i}")
+            contact.add_field(Note("Call back about the meeting", "Todo", "work,family"))
+
+    def test_compressed_round_trip(self):
+        sizes = {}
+        for compression in ("none", "zlib", "lzma"):
+            self.book._compression = compression
+            self.book.save_to_file()
+            sizes[compression] = os.path.getsize(self.path)
+            loaded = AddressBook.load_from_file()
+            self.assertEqual(loaded._compression, compression)
+            self.assertEqual(len(loaded.contacts), 200)
+            self.assertEqual(loaded.contacts[-1].notes[0].tags_list, ["work", "family"])
+            self.assertFalse(loaded.dirty)
+        self.assertLess(sizes["zlib"], sizes["none"] / 3)
+        self.assertLess(sizes["lzma"], sizes["none"] / 3)
+
+    def test_set_compression_marks_book_unsaved(self):
+        self.book.save_to_file()
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "2: lzma (smallest file, slowest)"
+            self.assertIn("saved with lzma compression", self.book.set_compression())
+        self.assertTrue(self.book.dirty)
+        self.book.save_if_changed()
+        self.assertEqual(AddressBook.load_from_file()._compression, "lzma")
+
+    def test_dictionary_keeps_most_frequent_strings_last(self):
+        dictionary = build_dictionary(["Kyiv", "work", "work", "Kyiv", "work", "", "Lviv"])
+        self.assertEqual(dictionary, b"Kyivwork")
+
+    def test_benchmark_reports_every_mode(self):
+        results = run_storage_benchmark(contacts=50)
+        plain = [r.compression for r in results if not r.encrypted]
+        self.assertEqual(plain, ["none", "zlib", "lzma"])
+        self.assertTrue(all(r.size > 0 for r in results))
+
+
+class TestShardedStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        self.shard_dir = os.path.join(self.dir.name, "address_book_shards")
+        self.book = AddressBook()
+        for i in range(100):
+            self.book.create_contact(f"Contact {i}")
+        self.book.save_to_file()
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "1: shards"
+            self.assertIn("saved as shards", self.book.set_storage_layout())
+        self.book.save_to_file()
+
+    def shard_files(self):
+        return {name for name in os.listdir(self.shard_dir) if name.startswith("shard-")}
+
+    def test_switching_layout_moves_the_book(self):
+        self.assertFalse(os.path.exists(self.path))
+        loaded = AddressBook.load_from_file()
+        self.assertTrue(loaded._sharded)
+        self.assertEqual([c.name.value for c in loaded.contacts],
+                         [c.name.value for c in self.book.contacts])
+        self.assertFalse(loaded.dirty)
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "0: a single file"
+            loaded.set_storage_layout()
+        loaded.save_to_file()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(os.listdir(self.shard_dir), [])
+        self.assertEqual(len(AddressBook.load_from_file().contacts), 100)
+
+    def test_save_rewrites_only_changed_shards(self):
+        before = self.shard_files()
+        john = self.book.get_contact("Contact 1")
+        old_shard = shard_of("Contact 1")
+        self.book.rename_contact(john, "Johnny")
+        self.book.remove_contact(self.book.get_contact("Contact 2"))
+        self.book.save_to_file()
+        after = self.shard_files()
+        changed = {shard_of("Johnny"), old_shard, shard_of("Contact 2")}
+        self.assertEqual(len(after - before), len(changed))
+        self.assertEqual({int(name.split("-")[1]) for name in after - before}, changed)
+
+        loaded = AddressBook.load_from_file()
+        self.assertEqual(len(loaded.contacts), 99)
+        self.assertIsNone(loaded.get_contact("Contact 1"))
+        self.assertEqual(loaded.contacts[1].name.value, "Johnny")
+
+    def test_load_single_contact(self):
+        self.book.get_contact("Contact 5").add_field(Phone(number="+4912345678901"))
+        self.book.save_to_file()
+        contact = AddressBook.load_contact("contact 5")
+        self.assertEqual(contact.phones[0].number, "+4912345678901")
+        self.assertIsNone(AddressBook.load_contact("Nobody"))
+
+    def test_concurrent_sharded_saves_merge(self):
+        other = AddressBook.load_from_file()
+        other.get_contact("Contact 3").add_field(Phone(number="+4912345678901"))
+        other.save_to_file()
+        self.book.create_contact("Jane")
+        self.assertTrue(self.book.save_to_file().merged)
+        loaded = AddressBook.load_from_file()
+        self.assertEqual(len(loaded.get_contact("Contact 3").phones), 1)
+        self.assertIsNotNone(loaded.get_contact("Jane"))
+
+
+@unittest.skipUnless(encryption.encryption_available(), "cryptography is not installed")
+class TestEncryptedStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "address_book.pkl")
+        patcher = patch.object(AddressBook, "_get_file_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+        self.book = AddressBook()
+        for i in range(100):
+            self.book.create_contact(f"Contact {i}").add_field(
+                Phone(number=f"+49123456{i:05d}"))
+        self.encrypt("secret")
+
+    def encrypt(self, passphrase, repeated=None, book=None):
+        with patch(questionary_select_path) as mock_select, \
+                patch("questionary.password") as mock_password:
+            mock_select.return_value.ask.return_value = "0: Encrypt with a new passphrase"
+            mock_password.return_value.ask.side_effect = [passphrase, repeated or passphrase]
+            return (book or self.book).set_encryption()
+
+    def read_files(self):
+        data = b""
+        for root, _, files in os.walk(self.dir.name):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as file:
+                    data += file.read()
+        return data
+
+    def test_encrypted_round_trip(self):
+        self.assertIn("do not match", self.encrypt("secret", "other"))
+        self.book.save_to_file()
+        self.assertTrue(AddressBook.is_encrypted())
+        self.assertNotIn(b"4912345600042", self.read_files())
+        with self.assertRaises(ValueError):
+            AddressBook.load_from_file()
+        with self.assertRaises(ValueError):
+            AddressBook.load_from_file("wrong")
+        self.assertFalse(AddressBook.check_passphrase("wrong"))
+
+        misses = encryption._derive.cache_info().misses
+        self.assertTrue(AddressBook.check_passphrase("secret"))
+        loaded = AddressBook.load_from_file("secret")
+        self.assertEqual(encryption._derive.cache_info().misses, misses)
+        self.assertEqual(loaded.contacts[42].phones[0].number, "+4912345600042")
+        loaded.create_contact("Jane")
+        loaded.save_to_file()
+        self.assertEqual(len(AddressBook.load_from_file("secret").contacts), 101)
+
+    def test_sharded_encrypted_contact_lookup(self):
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "1: shards"
+            self.book.set_storage_layout()
+        self.book.save_to_file()
+        self.assertNotIn(b"4912345600042", self.read_files())
+        contact = AddressBook.load_contact("Contact 42", "secret")
+        self.assertEqual(contact.phones[0].number, "+4912345600042")
+        with self.assertRaises(ValueError):
+            AddressBook.load_contact("Contact 42", "wrong")
+
+    def test_truncated_file_fails_to_load(self):
+        self.book.save_to_file()
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 100)
+        with self.assertRaises((ValueError, EOFError)):
+            AddressBook.load_from_file("secret")
+
+    def save_after_passphrase_changed(self, entered):
+        self.book.save_to_file()
+        # Two terminals; the first one changes the passphrase and saves.
+        first = AddressBook.load_from_file("secret")
+        second = AddressBook.load_from_file("secret")
+        self.encrypt("new", book=first)
+        first.save_to_file()
+        second.create_contact("Jane")
+        self.assertTrue(second.needs_passphrase_to_save())
+        with patch("questionary.password") as mock_password:
+            mock_password.return_value.ask.side_effect = entered
+            return save_book(second, "Exit.")
+
+    def test_save_asks_for_passphrase_changed_in_another_terminal(self):
+        message = self.save_after_passphrase_changed(["wrong", "new"])
+        self.assertIn("Exit. Data saved.", message)
+        self.assertEqual(len(AddressBook.load_from_file("new").contacts), 101)
+        with self.assertRaises(ValueError):
+            AddressBook.load_from_file("secret")
+
+    def test_save_without_passphrase_writes_recovery_copy(self):
+        message = self.save_after_passphrase_changed([""])
+        self.assertIn("Could not save the book", message)
+        self.assertEqual(len(AddressBook.load_from_file("new").contacts), 100)
+        recovered = f"{self.path}.recovered"
+        self.assertIn(recovered, message)
+        self.assertNotIn(b"4912345600042", self.read_files())
+        with patch.object(AddressBook, "_get_file_path", return_value=recovered):
+            self.assertEqual(len(AddressBook.load_from_file("secret").contacts), 101)
+
+    def test_turn_encryption_off_in_another_terminal(self):
+        self.book.save_to_file()
+        first = AddressBook.load_from_file("secret")
+        second = AddressBook.load_from_file("secret")
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "1: Turn encryption off"
+            first.set_encryption()
+        first.save_to_file()
+        second.create_contact("Jane")
+        self.assertFalse(second.needs_passphrase_to_save())
+        second.save_to_file()
+        self.assertEqual(len(AddressBook.load_from_file().contacts), 101)
+
+    def test_turn_encryption_off(self):
+        self.book.save_to_file()
+        book = AddressBook.load_from_file("secret")
+        with patch(questionary_select_path) as mock_select:
+            mock_select.return_value.ask.return_value = "1: Turn encryption off"
+            self.assertIn("without encryption", book.set_encryption())
+        book.save_to_file()
+        self.assertFalse(AddressBook.is_encrypted())
+        self.assertEqual(len(AddressBook.load_from_file().contacts), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()